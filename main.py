@@ -1,13 +1,16 @@
 # Dragon Ball Z Fighting Game
 # Punto de entrada principal del juego
+import argparse
 import pygame
 import sys
-from src.utils.config import ANCHO, ALTO, Paths
+from src.utils.config import ANCHO, ALTO, Paths, GeminiConfig, MatchLogConfig, NetplayConfig
 from src.managers.resource_manager import ResourceManager
 from src.managers.audio_manager import AudioManager
 from src.managers.tower_manager import TowerManager
 from src.ui.menus import MenuManager
 from src.core.game import GameEngine
+from src.core.netplay import NetplaySession, TransporteUDP
+from src.utils.clock import tiempo_juego
 
 
 def inicializar_pygame() :
@@ -28,8 +31,106 @@ def inicializar_pygame() :
     return pantalla, reloj
 
 
+def parsear_argumentos() -> argparse.Namespace :
+    """Lee las opciones de linea de comandos"""
+    parser = argparse.ArgumentParser(description="Dragon Ball Z - Fighting Game")
+    parser.add_argument("--netplay", type=int, choices=(1, 2), help="Pelea Rapida en red jugando como J1 o J2")
+    parser.add_argument("--puerto", type=int, default=NetplayConfig.PUERTO, help="Puerto UDP local")
+    parser.add_argument("--rival", default=f"127.0.0.1:{NetplayConfig.PUERTO + 1}", help="Direccion host:puerto del rival")
+    parser.add_argument("--personajes", nargs=2, default=("goku", "vegeta"), metavar=("J1", "J2"))
+    parser.add_argument("--mapa", type=int, default=0, help="Indice del mapa")
+    parser.add_argument("--latencia", type=int, default=0, help="Latencia simulada en ms (pruebas)")
+    parser.add_argument("--perdida", type=float, default=0.0, help="Perdida de paquetes simulada, 0 a 1 (pruebas)")
+    parser.add_argument("--registrar-dataset", action="store_true", help=f"Guarda las decisiones de Gemini en {Paths.DATASET_IA} (python -m src.systems.policy_model)")
+    parser.add_argument("--registrar-partidas", action="store_true", help=f"Guarda cada pelea en {Paths.PARTIDAS} (python -m src.systems.match_analytics)")
+    return parser.parse_args()
+
+
+def jugar_netplay(argumentos : argparse.Namespace, pantalla, reloj, sprites_personajes, mapas_data, audio_manager) :
+    """Ejecuta una Pelea Rapida en red contra otra instancia del juego"""
+    host, puerto = argumentos.rival.rsplit(":", 1)
+    transporte = TransporteUDP(argumentos.puerto, (host, int(puerto)), argumentos.latencia, argumentos.perdida)
+    
+    personaje_j1, personaje_j2 = argumentos.personajes
+    juego = GameEngine(
+        pantalla,
+        reloj,
+        sprites_personajes,
+        mapas_data[argumentos.mapa]["ruta"],
+        personaje_j1,
+        personaje_j2,
+        es_modo_torre=False,
+        audio_manager=audio_manager,
+        usar_ia=False
+    )
+    
+    NetplaySession(juego, transporte, argumentos.netplay).ejecutar(personaje_j1, personaje_j2)
+
+
+def jugar_torre(torre_manager : TowerManager, pantalla, reloj, sprites_personajes, audio_manager, menu_manager) :
+    """Juega la torre desde la pelea actual; el progreso se guarda despues de cada pelea ganada"""
+    if not torre_manager.mostrar_pantalla_torre():
+        return
+    
+    personaje_j1 = torre_manager.personaje_jugador
+    while not torre_manager.esta_completada():
+        # Obtener oponente actual
+        personaje_j2 = torre_manager.obtener_oponente_actual()
+        
+        # Crear el juego para esta pelea
+        juego = GameEngine(
+            pantalla, 
+            reloj, 
+            sprites_personajes,
+            torre_manager.mapa, 
+            personaje_j1,  
+            personaje_j2,  
+            es_modo_torre=True,
+            audio_manager=audio_manager,
+            menu_manager=menu_manager  
+        )
+        
+        juego.nivel_torre = torre_manager.pelea_actual
+        juego.dificultad_torre = torre_manager.dificultad
+        juego.semilla_partida = torre_manager.semilla_pelea()
+        juego.ejecutar(personaje_j1, personaje_j2, torre_manager.pelea_actual)
+        
+        if juego.abandonada:
+            # Salir desde la pausa no es una derrota : la torre queda guardada en esta pelea
+            torre_manager.guardar_progreso()
+            return
+        
+        if juego.rounds_manager.rounds_jugador1 >= 2:
+            # Jugador ganó la pelea
+            tiempo_pelea = (tiempo_juego() - juego.rounds_manager.tiempo_inicio_pelea_total) // 1000
+            stats = juego.rounds_manager.obtener_estadisticas()
+            torre_manager.agregar_stats_pelea(stats["jugador1"], tiempo_pelea)
+            torre_manager.avanzar_pelea()
+            
+            if not torre_manager.esta_completada():
+                # ESC deja la torre guardada para Continuar Torre
+                torre_manager.guardar_progreso()
+                if not torre_manager.mostrar_pantalla_torre():
+                    return
+            else:
+                # Torre completada
+                torre_manager.borrar_progreso()
+                torre_manager.mostrar_pantalla_victoria_torre()
+        else:
+            # Jugador perdió por KO
+            torre_manager.borrar_progreso()
+            torre_manager.mostrar_pantalla_game_over()
+            return
+
+
 def main() :
     """Funcion principal del juego"""
+    argumentos = parsear_argumentos()
+    if argumentos.registrar_dataset :
+        GeminiConfig.REGISTRAR_DATASET = True
+    if argumentos.registrar_partidas :
+        MatchLogConfig.REGISTRAR = True
+    
     # Inicializar
     pantalla, reloj = inicializar_pygame()
     
@@ -41,6 +142,12 @@ def main() :
     
     # Inicializar gestores
     audio_manager = AudioManager()
+    
+    if argumentos.netplay :
+        jugar_netplay(argumentos, pantalla, reloj, sprites_personajes, mapas_data, audio_manager)
+        pygame.quit()
+        return
+    
     audio_manager.reproducir_musica_menu()
     
     menu_manager = MenuManager(pantalla, reloj, personajes_data, mapas_data, audio_manager)
@@ -112,50 +219,17 @@ def main() :
                 
                 # Iniciar torre
                 torre_manager = TowerManager(pantalla, reloj, personajes_data)
-                torre_manager.iniciar_torre(personaje_j1)
-                
-                if not torre_manager.mostrar_pantalla_torre():
-                    continue
-                
-                # Loop de la torre
-                torre_abandonada = False
-                while not torre_manager.esta_completada() and not torre_abandonada:
-                    # Obtener oponente actual
-                    personaje_j2 = torre_manager.obtener_oponente_actual()
-                    
-                    # Crear el juego para esta pelea
-                    juego = GameEngine(
-                        pantalla, 
-                        reloj, 
-                        sprites_personajes,
-                        mapa_seleccionado, 
-                        personaje_j1,  
-                        personaje_j2,  
-                        es_modo_torre=True,
-                        audio_manager=audio_manager,
-                        menu_manager=menu_manager  
-                    )
-                    
-                    juego.nivel_torre = torre_manager.pelea_actual
-                    juego.ejecutar(personaje_j1, personaje_j2, torre_manager.pelea_actual)
-                    
-                    if juego.rounds_manager.rounds_jugador1 >= 2:
-                        # Jugador ganó la pelea
-                        tiempo_pelea = (pygame.time.get_ticks() - juego.rounds_manager.tiempo_inicio_pelea_total) // 1000
-                        stats = juego.collision_system.obtener_estadisticas()
-                        torre_manager.agregar_stats_pelea(stats["jugador1"], tiempo_pelea)
-                        torre_manager.avanzar_pelea()
-                        
-                        if not torre_manager.esta_completada():
-                            if not torre_manager.mostrar_pantalla_torre():
-                                torre_abandonada = True
-                        else:
-                            # Torre completada
-                            torre_manager.mostrar_pantalla_victoria_torre()
-                    else:
-                        # Jugador perdió
-                        torre_manager.mostrar_pantalla_game_over()
-                        break
+                torre_manager.iniciar_torre(personaje_j1, mapa_seleccionado, dificultad)
+                jugar_torre(torre_manager, pantalla, reloj, sprites_personajes, audio_manager, menu_manager)
+            
+            # CONTINUAR TORRE : sin menus de seleccion, solo se crea el motor de la pelea pendiente
+            elif modo == "Continuar Torre":
+                torre_manager = TowerManager(pantalla, reloj, personajes_data)
+                if torre_manager.continuar_torre():
+                    jugar_torre(torre_manager, pantalla, reloj, sprites_personajes, audio_manager, menu_manager)
+                else:
+                    print("No se pudo restaurar la torre guardada")
+                    torre_manager.borrar_progreso()
         
         elif opcion == "Personajes" :
             menu_manager.menu_personajes()
@@ -2,5 +2,6 @@
 # Exporta el motor principal
 
 from src.core.game import GameEngine
+from src.core.netplay import NetplaySession, TransporteUDP
 
-__all__ = ["GameEngine"]
\ No newline at end of file
+__all__ = ["GameEngine", "NetplaySession", "TransporteUDP"]
\ No newline at end of file
@@ -0,0 +1,286 @@
+# Entorno de entrenamiento estilo Gym
+# GameEngine sin ventana como reset/step, y un wrapper vectorizado con procesos y memoria compartida
+
+import multiprocessing as mp
+import os
+import signal
+import weakref
+import numpy as np
+import pygame
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.core.game import GameEngine
+from src.core.netplay import TeclasEntrada
+from src.entities.player import Player
+from src.systems.ai import AIController
+from src.systems.ai_scheduler import PLANIFICADOR_IA
+from src.systems.plan_interpreter import ACCIONES, ejecutar_accion
+from src.utils.clock import RELOJ
+from src.utils.rng import derivar_semilla, nueva_semilla
+from src.utils.config import ANCHO, ALTO, FPS, CONTROLES_JUGADOR1
+
+# Observacion : por jugador (agente primero) posicion, recursos y flags, luego los proyectiles mas cercanos
+FLAGS_OBSERVACION = (
+    "mirando_derecha", "golpe_animando", "cubriendose", "lanzando_bola",
+    "usando_kamehameha", "usando_movimiento_final", "aturdido", "en_ko",
+)
+VALORES_JUGADOR = 4 + len(FLAGS_OBSERVACION)
+PROYECTILES_OBSERVADOS = 4
+VALORES_PROYECTIL = 4  # dx, dy, direccion, es_propio
+TAMANO_OBSERVACION = 2 * VALORES_JUGADOR + PROYECTILES_OBSERVADOS * VALORES_PROYECTIL + 1
+
+Info = Dict[str, Any]
+
+
+def iniciar_pygame_headless() :
+    """Inicializa pygame sin ventana ni audio (hace falta un display para convertir sprites)"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    if pygame.display.get_surface() is None :
+        pygame.display.set_mode((ANCHO, ALTO))
+
+
+def cargar_sprites() -> Dict :
+    """Carga los sprites de todos los personajes"""
+    from src.managers.resource_manager import ResourceManager
+    sprites, _, _ = ResourceManager().cargar_todos_los_recursos()
+    return sprites
+
+
+class ControladorAgente :
+    """Controlador del jugador del agente : ejecuta la accion del ultimo step"""
+    
+    def __init__(self, jugador : Player, oponente : Player) :
+        """Inicializa el controlador sin accion"""
+        self.jugador = jugador
+        self.oponente = oponente
+        self.accion = "esperar"
+    
+    def actualizar(self) :
+        """Aplica la accion actual (la llama simular_frame)"""
+        if self.accion != "defender" and self.jugador.cubriendose :
+            self.jugador.dejar_de_cubrirse()
+        ejecutar_accion(self.jugador, self.oponente, self.accion)
+
+
+class CombateEnv :
+    """Un round contra la IA tradicional : reset() -> (obs, info), step(a) -> (obs, recompensa, terminado, truncado, info)"""
+    
+    acciones = ACCIONES
+    tamano_observacion = TAMANO_OBSERVACION
+    
+    def __init__(self, personaje_agente : str = "goku", personaje_rival : str = "vegeta", dificultad_rival : str = "normal", frames_por_paso : int = 4, duracion_maxima : int = 60, sprites : Optional[Dict] = None) :
+        """Crea el motor sin ventana (el agente es el J2, como la CPU en el juego)"""
+        iniciar_pygame_headless()
+        self.dificultad_rival = dificultad_rival
+        self.frames_por_paso = frames_por_paso
+        self.frames_maximos = duracion_maxima * FPS
+        
+        self.motor = GameEngine(pygame.display.get_surface(), pygame.time.Clock(), sprites or cargar_sprites(), "", personaje_rival, personaje_agente, usar_ia=False)
+        self.motor.audio_manager.efectos_activos = False
+        self.motor.inicializar_jugadores(personaje_rival, personaje_agente)
+        
+        self.agente = self.motor.jugador2
+        self.rival = self.motor.jugador1
+        self.controlador = ControladorAgente(self.agente, self.rival)
+        self.motor.ai_controller = self.controlador
+        self.ia_rival : Optional[AIController] = None
+        self.sin_teclas = TeclasEntrada(CONTROLES_JUGADOR1)
+        
+        RELOJ.fijar_frame(0)
+        self.motor.rounds_manager.reiniciar()
+        self.snapshot_inicial = self.motor.snapshot()
+        self.frame = 0
+        self.observacion = np.zeros(TAMANO_OBSERVACION, dtype=np.float32)
+    
+    def reset(self, semilla : Optional[int] = None) -> Tuple[np.ndarray, Info] :
+        """Vuelve al inicio del round (con la misma semilla el rival repite sus decisiones)"""
+        self.motor.semilla_partida = nueva_semilla() if semilla is None else semilla
+        self.frame = 0
+        RELOJ.fijar_frame(0)
+        self.motor.restore(self.snapshot_inicial)
+        PLANIFICADOR_IA.reiniciar()
+        self.ia_rival = AIController(self.rival, self.agente, self.dificultad_rival, derivar_semilla(self.motor.semilla_partida, "ia", 1))
+        self.controlador.accion = "esperar"
+        return self.observar(), {"semilla" : self.motor.semilla_partida}
+    
+    def step(self, accion : int) -> Tuple[np.ndarray, float, bool, bool, Info] :
+        """Ejecuta la accion durante frames_por_paso frames"""
+        self.controlador.accion = ACCIONES[accion]
+        vida_agente = self.agente.vida_actual
+        vida_rival = self.rival.vida_actual
+        
+        for _ in range(self.frames_por_paso) :
+            self.frame += 1
+            RELOJ.fijar_frame(self.frame)
+            if not self.motor._jugador_esta_ocupado(self.rival) or self.rival.cubriendose :
+                self.ia_rival.actualizar()
+            self.motor.simular_frame(self.sin_teclas, self.sin_teclas)
+            if self.agente.vida_actual <= 0 or self.rival.vida_actual <= 0 :
+                break
+        
+        # Recompensa : diferencia de daño (en vidas completas) y +-1 por KO
+        recompensa = ((vida_rival - self.rival.vida_actual) - (vida_agente - self.agente.vida_actual)) / self.agente.vida_maxima
+        terminado = self.agente.vida_actual <= 0 or self.rival.vida_actual <= 0
+        if terminado :
+            recompensa += 1.0 if self.rival.vida_actual <= 0 else -1.0
+        truncado = not terminado and self.frame >= self.frames_maximos
+        
+        info = {"frame" : self.frame, "vida_agente" : self.agente.vida_actual, "vida_rival" : self.rival.vida_actual, "semilla" : self.motor.semilla_partida}
+        return self.observar(), recompensa, terminado, truncado, info
+    
+    def observar(self, destino : Optional[np.ndarray] = None) -> np.ndarray :
+        """Escribe el vector de observacion (en destino si se pasa, sin asignar memoria)"""
+        obs = self.observacion if destino is None else destino
+        i = 0
+        for jugador in (self.agente, self.rival) :
+            obs[i] = jugador.x / ANCHO
+            obs[i + 1] = jugador.y / ALTO
+            obs[i + 2] = jugador.vida_actual / jugador.vida_maxima
+            obs[i + 3] = jugador.stamina_actual / jugador.stamina_maxima
+            i += 4
+            for flag in FLAGS_OBSERVACION :
+                obs[i] = getattr(jugador, flag)
+                i += 1
+        
+        # Proyectiles mas cercanos al agente (los slots sobrantes quedan en cero)
+        proyectiles : List[Tuple[float, Any, bool]] = []
+        for jugador in (self.agente, self.rival) :
+            for bola in jugador.bolas_activas :
+                proyectiles.append((abs(bola.x - self.agente.x), bola, jugador is self.agente))
+        proyectiles.sort(key=lambda p : p[0])
+        for slot in range(PROYECTILES_OBSERVADOS) :
+            if slot < len(proyectiles) :
+                _, bola, propio = proyectiles[slot]
+                obs[i] = (bola.x - self.agente.x) / ANCHO
+                obs[i + 1] = (bola.y - self.agente.y) / ALTO
+                obs[i + 2] = 1.0 if bola.direccion else -1.0
+                obs[i + 3] = propio
+            else :
+                obs[i : i + VALORES_PROYECTIL] = 0
+            i += VALORES_PROYECTIL
+        
+        obs[i] = self.frame / self.frames_maximos
+        return obs
+
+
+# ENTORNOS VECTORIZADOS
+
+def _trabajador(conexion, indice : int, nombres_memoria : Tuple[str, str, str], cantidad : int, argumentos : Dict) :
+    """Proceso trabajador : un entorno que escribe en su fila de la memoria compartida"""
+    # SDL convierte SIGTERM / SIGINT en eventos QUIT : sin esto terminate() no detiene al trabajador
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    memorias = [SharedMemory(name=nombre) for nombre in nombres_memoria]
+    observaciones = np.ndarray((cantidad, TAMANO_OBSERVACION), dtype=np.float32, buffer=memorias[0].buf)
+    recompensas = np.ndarray((cantidad,), dtype=np.float32, buffer=memorias[1].buf)
+    fines = np.ndarray((cantidad, 2), dtype=np.bool_, buffer=memorias[2].buf)
+    
+    env = CombateEnv(**argumentos)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    try :
+        while True :
+            comando, dato = conexion.recv()
+            if comando == "step" :
+                _, recompensa, terminado, truncado, info = env.step(dato)
+                recompensas[indice] = recompensa
+                fines[indice] = (terminado, truncado)
+                # Reinicio automatico : la observacion ya es la del episodio nuevo
+                if terminado or truncado :
+                    env.reset()
+                env.observar(observaciones[indice])
+                conexion.send(info)
+            elif comando == "reset" :
+                env.reset(dato)
+                env.observar(observaciones[indice])
+                conexion.send(None)
+            elif comando == "cerrar" :
+                break
+    finally :
+        del observaciones, recompensas, fines
+        for memoria in memorias :
+            memoria.close()
+        conexion.close()
+
+
+def _detener_trabajadores(conexiones : List, procesos : List, memorias : List[SharedMemory]) :
+    """Detiene los procesos (los que no responden se matan) y libera la memoria compartida"""
+    try :
+        for conexion in conexiones :
+            try :
+                conexion.send(("cerrar", None))
+            except (BrokenPipeError, OSError) :
+                pass
+        for proceso in procesos :
+            proceso.join(timeout=5)
+            if proceso.is_alive() :
+                proceso.kill()
+                proceso.join()
+    finally :
+        for memoria in memorias :
+            try :
+                memoria.unlink()
+            except FileNotFoundError :
+                pass
+            try :
+                memoria.close()
+            except BufferError :
+                pass  # Todavia hay vistas NumPy : el mapeo se libera junto con ellas
+
+
+class VectorCombateEnv :
+    """K entornos en procesos separados; observaciones, recompensas y fines en memoria compartida"""
+    
+    def __init__(self, cantidad : int, **argumentos) :
+        """Lanza un proceso por entorno"""
+        self.cantidad = cantidad
+        tamanos = (cantidad * TAMANO_OBSERVACION * 4, cantidad * 4, cantidad * 2)
+        self.memorias = [SharedMemory(create=True, size=tamano) for tamano in tamanos]
+        self.observaciones = np.ndarray((cantidad, TAMANO_OBSERVACION), dtype=np.float32, buffer=self.memorias[0].buf)
+        self.recompensas = np.ndarray((cantidad,), dtype=np.float32, buffer=self.memorias[1].buf)
+        self.fines = np.ndarray((cantidad, 2), dtype=np.bool_, buffer=self.memorias[2].buf)
+        
+        nombres = tuple(memoria.name for memoria in self.memorias)
+        self.conexiones = []
+        self.procesos = []
+        
+        # Limpieza garantizada aunque no se llame a close() (excepcion, recolector o salida del interprete)
+        self._finalizador = weakref.finalize(self, _detener_trabajadores, self.conexiones, self.procesos, self.memorias)
+        for indice in range(cantidad) :
+            propia, remota = mp.Pipe()
+            proceso = mp.Process(target=_trabajador, args=(remota, indice, nombres, cantidad, argumentos), daemon=True)
+            proceso.start()
+            remota.close()
+            self.conexiones.append(propia)
+            self.procesos.append(proceso)
+    
+    def __enter__(self) -> "VectorCombateEnv" :
+        """Uso con with : close() al salir del bloque"""
+        return self
+    
+    def __exit__(self, *excepcion) :
+        """Cierra los entornos"""
+        self.close()
+    
+    def reset(self, semilla : Optional[int] = None) -> np.ndarray :
+        """Reinicia todos los entornos (con semilla, cada entorno recibe un flujo independiente derivado)"""
+        for indice, conexion in enumerate(self.conexiones) :
+            conexion.send(("reset", None if semilla is None else derivar_semilla(semilla, "entorno", indice)))
+        for conexion in self.conexiones :
+            conexion.recv()
+        return self.observaciones
+    
+    def step(self, acciones : Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[Info]] :
+        """Avanza todos los entornos en paralelo; los arreglos son vistas de la memoria compartida"""
+        for conexion, accion in zip(self.conexiones, acciones) :
+            conexion.send(("step", int(accion)))
+        infos = [conexion.recv() for conexion in self.conexiones]
+        return self.observaciones, self.recompensas, self.fines[:, 0], self.fines[:, 1], infos
+    
+    def close(self) :
+        """Detiene los procesos y libera la memoria compartida (se puede llamar mas de una vez)"""
+        if not self._finalizador.alive :
+            return
+        del self.observaciones, self.recompensas, self.fines
+        self._finalizador()
\ No newline at end of file
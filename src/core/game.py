@@ -6,23 +6,30 @@ import sys
 from typing import Dict, Optional
 from src.entities.player import Player
 from src.systems.ai import AIController
+from src.systems.ai_scheduler import PLANIFICADOR_IA
 from src.systems.collision import CollisionSystem
 from src.systems.rounds import RoundsManager
 from src.ui.hud import HUDManager
 from src.systems.gemini_ai import GeminiAIController  
+from src.systems.lookahead_ai import LookaheadAIController
+from src.systems.match_recorder import MatchRecorder
 from config_gemini import obtener_api_key     
 from src.ui.transitions import TransitionManager
 from src.managers.audio_manager import AudioManager
+from src.core.snapshot import serializar_pelea, restaurar_pelea
+from src.utils.events import DatosEvento, EventBus, EventoCombate
+from src.utils.clock import tiempo_juego
+from src.utils.rng import derivar_semilla, nueva_semilla
 from src.utils.config import (
     ANCHO, ALTO, NEGRO, FPS, 
-    CONTROLES_JUGADOR1, CONTROLES_JUGADOR2
+    CONTROLES_JUGADOR1, CONTROLES_JUGADOR2, MatchLogConfig
 )
 
 
 class GameEngine :
     """Motor principal del juego"""
     
-    def __init__(self, pantalla : pygame.Surface, reloj : pygame.time.Clock, sprites_personajes : Dict, fondo_seleccionado : str,personaje1_nombre : str = "goku",personaje2_nombre : str = "freezer",es_modo_torre : bool = False,audio_manager : Optional[AudioManager] = None, menu_manager = None) :
+    def __init__(self, pantalla : pygame.Surface, reloj : pygame.time.Clock, sprites_personajes : Dict, fondo_seleccionado : str,personaje1_nombre : str = "goku",personaje2_nombre : str = "freezer",es_modo_torre : bool = False,audio_manager : Optional[AudioManager] = None, menu_manager = None, usar_ia : bool = True) :
         
         # Parametros principales del juego
         self.pantalla = pantalla
@@ -33,6 +40,7 @@ class GameEngine :
         self.es_modo_torre = es_modo_torre
         self.audio_manager = audio_manager
         self.menu_manager = menu_manager
+        self.usar_ia = usar_ia  # False : el J2 lo controla quien crea el motor (entornos, netplay)
         
         # Gestores
         self.audio_manager = audio_manager or AudioManager()
@@ -40,6 +48,19 @@ class GameEngine :
         self.transition_manager = TransitionManager(pantalla)
         self.rounds_manager = RoundsManager(pantalla, reloj)
         
+        # Bus de eventos del combate
+        self.eventos = EventBus()
+        self.eventos.suscribir(EventoCombate.KO, self._al_producirse_ko)
+        self.rounds_manager.conectar_eventos(self.eventos)
+        self.hud_manager.conectar_eventos(self.eventos)
+        self.audio_manager.conectar_eventos(self.eventos)
+        
+        # Registro de partidas para analisis (opcional : reserva sus arreglos una vez por pelea)
+        self.grabador : Optional[MatchRecorder] = None
+        if MatchLogConfig.REGISTRAR :
+            self.grabador = MatchRecorder()
+            self.grabador.conectar_eventos(self.eventos)
+        
         # Jugadores
         self.jugador1 : Optional[Player] = None
         self.jugador2 : Optional[Player] = None
@@ -50,6 +71,7 @@ class GameEngine :
         
         # Estado
         self.ejecutando = False
+        self.abandonada = False  # Se salio desde el menu de pausa (no hubo KO)
         self.en_introduccion = True
         self.tiempo_inicio = 0
         self.fase_intro = "vs"
@@ -57,6 +79,9 @@ class GameEngine :
         self.tiempo_inicio_combate = 0
         self.nivel_torre = 0
         self.dificultad_1vs1 = "normal"
+        self.dificultad_torre : Optional[str] = None  # "experto" : toda la torre con busqueda hacia adelante
+        self.snapshot_inicial : Optional[bytes] = None
+        self.semilla_partida = nueva_semilla()  # Se guarda con el resultado : la pelea contra la IA es reproducible
 
         self.cheats_activos = {
         "vida_inf_j1" : False,
@@ -68,6 +93,7 @@ class GameEngine :
         } 
 
         # Cargar fondo
+        self.mapa = fondo_seleccionado  # Se guarda con el record (filtro por mapa)
         try :
             self.fondo = pygame.image.load(fondo_seleccionado).convert()
             self.fondo = pygame.transform.scale(self.fondo, (ANCHO, ALTO))
@@ -79,19 +105,39 @@ class GameEngine :
         sprites_j1 = self.sprites_personajes[personaje1]
         sprites_j2 = self.sprites_personajes[personaje2]
         
-        self.jugador1 = Player(100, ALTO - 230, CONTROLES_JUGADOR1, sprites_j1)
-        self.jugador2 = Player(ANCHO - 200, ALTO - 230, CONTROLES_JUGADOR2, sprites_j2)
+        self.jugador1 = Player(100, ALTO - 230, CONTROLES_JUGADOR1, sprites_j1, personaje1)
+        self.jugador2 = Player(ANCHO - 200, ALTO - 230, CONTROLES_JUGADOR2, sprites_j2, personaje2)
+        self.jugador1.conectar_eventos(self.eventos, 1)
+        self.jugador2.conectar_eventos(self.eventos, 2)
         
         # Inicializar sistemas
-        self.collision_system = CollisionSystem(self.jugador1, self.jugador2)
+        self.collision_system = CollisionSystem(self.jugador1, self.jugador2, self.eventos)
+        self.detener_ia()
+        PLANIFICADOR_IA.reiniciar()
         
             # Configurar IA 
         if self.es_modo_torre or hasattr(self, "dificultad_1vs1")  :
             if self.es_modo_torre :
                 dificultades = ["facil", "normal", "dificil"]
                 dificultad = dificultades[min(self.nivel_torre, 2)]
+                if self.dificultad_torre == "experto" :
+                    dificultad = "experto"
             else :
                 dificultad = self.dificultad_1vs1
+            self.rounds_manager.contexto_partida = {
+                "personaje" : personaje1,
+                "rival" : personaje2,
+                "mapa" : self.mapa,
+                "dificultad" : dificultad
+            }
+            semilla_ia = derivar_semilla(self.semilla_partida, "ia", 2)
+            if not self.usar_ia :
+                return
+            
+            # Experto : IA local que simula sus jugadas (no usa Gemini)
+            if dificultad == "experto" :
+                self.ai_controller = LookaheadAIController(self.jugador2, self.jugador1, dificultad, semilla_ia)
+                return
             
             # Obtener API key de Gemini
             api_key = obtener_api_key()
@@ -101,7 +147,8 @@ class GameEngine :
                 self.jugador2, 
                 self.jugador1, 
                 dificultad,
-                api_key=api_key
+                api_key=api_key,
+                semilla=semilla_ia
             )
     
     def ejecutar(self, personaje1 : str, personaje2 : str, nivel_torre  : int = 0)  :
@@ -109,22 +156,29 @@ class GameEngine :
         self.nivel_torre = nivel_torre
         self.inicializar_jugadores(personaje1, personaje2)
         self.ejecutando = True
+        self.abandonada = False
         self.en_introduccion = True
         self.tiempo_inicio = pygame.time.get_ticks()
         self.fase_intro = "vs"
         
         self.rounds_manager.reiniciar()
+        self.rounds_manager.semilla_partida = self.semilla_partida
+        self.snapshot_inicial = self.snapshot()
         self.audio_manager.reproducir_musica_pelea()
+        if self.grabador :
+            self.grabador.iniciar(self.jugador1, self.jugador2)
         
         while self.ejecutando  :
             self._manejar_eventos()
             
             if self.rounds_manager.pelea_terminada  :
+                if self.grabador :
+                    self.grabador.terminar(self.rounds_manager.contexto_partida, self.semilla_partida)
                 resultado = self.rounds_manager.mostrar_pantalla_final(self.es_modo_torre)
                 if resultado == "menu"  :
                     self.ejecutando = False
                 elif resultado == "rematch"  :
-                    return self.ejecutar(personaje1, personaje2)
+                    self._reiniciar_pelea()
             
             elif self.rounds_manager.mostrando_ko  :
                 self.rounds_manager.mostrar_animacion_ko(
@@ -145,12 +199,45 @@ class GameEngine :
             
             else :
                 self._actualizar_juego()
+                if self.grabador :
+                    self.grabador.registrar_frame()
                 self._dibujar_juego()
             
             self.reloj.tick(FPS)
         
+        self.detener_ia()
         self.audio_manager.reproducir_musica_menu()
     
+    def detener_ia(self) :
+        """Libera el hilo de consultas de la IA actual"""
+        if isinstance(self.ai_controller, GeminiAIController) :
+            self.ai_controller.detener()
+    
+    def _reiniciar_pelea(self) :
+        """Revancha instantanea : restaura la instantanea inicial y repite la intro"""
+        self.restore(self.snapshot_inicial)
+        
+        # La revancha es otra partida : semilla nueva para la IA
+        self.semilla_partida = nueva_semilla()
+        self.rounds_manager.semilla_partida = self.semilla_partida
+        if self.ai_controller :
+            self.ai_controller.sembrar(derivar_semilla(self.semilla_partida, "ia", 2))
+        if self.grabador :
+            self.grabador.iniciar(self.jugador1, self.jugador2)
+        self.en_introduccion = True
+        self.tiempo_inicio = pygame.time.get_ticks()
+        self.fase_intro = "vs"
+    
+    # INSTANTANEAS
+    
+    def snapshot(self) -> bytes :
+        """Serializa el estado completo de la pelea en un bloque binario compacto"""
+        return serializar_pelea(self, tiempo_juego())
+    
+    def restore(self, datos : bytes) :
+        """Restaura una instantanea sobre los jugadores y sistemas actuales"""
+        restaurar_pelea(self, datos, tiempo_juego())
+    
     def _manejar_eventos(self) :
         """Maneja los eventos del juego"""
         for evento in pygame.event.get() :
@@ -168,6 +255,7 @@ class GameEngine :
                     if self.menu_manager :
                         continuar = self.menu_manager.menu_pausa(self)
                         if not continuar :
+                            self.abandonada = True
                             self.ejecutando = False
                     return
                 
@@ -228,25 +316,31 @@ class GameEngine :
             )
             if resultado  :
                 self.en_introduccion = False
-                self.tiempo_inicio_combate = pygame.time.get_ticks()
+                self.tiempo_inicio_combate = tiempo_juego()
     
     def _actualizar_juego(self)  :
         """Actualiza la logica del juego"""
         teclas = pygame.key.get_pressed()
-        
+        self.simular_frame(teclas, teclas)
+    
+    def simular_frame(self, teclas_j1, teclas_j2)  :
+        """Avanza la simulacion un frame con las teclas de cada jugador"""
         # Actualizar jugadores
         self.jugador1.actualizar()
         self.jugador2.actualizar()
         
         # Movimiento
         if not self._jugador_esta_ocupado(self.jugador1)  :
-            self.jugador1.mover(teclas)
+            self.jugador1.mover(teclas_j1)
         
         if not self._jugador_esta_ocupado(self.jugador2)  :
             if self.ai_controller  :
                 self.ai_controller.actualizar()
             else :
-                self.jugador2.mover(teclas)
+                self.jugador2.mover(teclas_j2)
+        elif self.ai_controller and self.jugador2.cubriendose  :
+            # La IA decide cuando soltar la guardia (si no quedaria cubierta para siempre)
+            self.ai_controller.actualizar()
         
         # Orientacion
         if self.jugador1.x < self.jugador2.x  :
@@ -267,23 +361,20 @@ class GameEngine :
         if self.cheats_activos["stamina_inf_j2"] :
             self.jugador2.stamina_actual = self.jugador2.stamina_maxima
         
-        teclas = pygame.key.get_pressed()
-
         # Proyectiles
         self.jugador1.actualizar_proyectiles()
         self.jugador2.actualizar_proyectiles()
         
-        # Colisiones
+        # Colisiones (las estadisticas y el KO llegan por el bus de eventos)
         self.collision_system.detectar_todas()
-        self.rounds_manager.actualizar_estadisticas(
-            self.collision_system.obtener_estadisticas()
-        )
+    
+    def _al_producirse_ko(self, evento : DatosEvento)  :
+        """Termina el round cuando un jugador queda KO"""
+        if self.rounds_manager.mostrando_ko or self.rounds_manager.pelea_terminada  :
+            return
         
-        # Verificar KO
-        if self.jugador1.vida_actual <= 0  :
-            self.rounds_manager.terminar_round(2)
-        elif self.jugador2.vida_actual <= 0  :
-            self.rounds_manager.terminar_round(1)
+        ganador = 2 if evento.jugador == 1 else 1
+        self.rounds_manager.terminar_round(ganador)
     
     def _jugador_esta_ocupado(self, jugador : Player) -> bool  :
         """Verifica si un jugador esta ocupado"""
@@ -295,7 +386,12 @@ class GameEngine :
             jugador.usando_movimiento_final
         ])
     
-    def _dibujar_juego(self) :
+    def _tiempo_restante(self) -> int :
+        """Segundos que le quedan al round"""
+        segundos = (tiempo_juego() - self.tiempo_inicio_combate) / 1000
+        return max(0, self.tiempo_combate - int(segundos))
+    
+    def _dibujar_juego(self, comprobar_tiempo : bool = True) :
         """Dibuja todos los elementos del juego"""
         if self.fondo :
             self.pantalla.blit(self.fondo, (0, 0))
@@ -315,12 +411,10 @@ class GameEngine :
         )
         
         if not self.en_introduccion  :
-            tiempo_actual = pygame.time.get_ticks()
-            segundos = (tiempo_actual - self.tiempo_inicio_combate) / 1000
-            tiempo_restante = max(0, self.tiempo_combate - int(segundos))
+            tiempo_restante = self._tiempo_restante()
             self.hud_manager.dibujar_timer(tiempo_restante, False)
             
-            if tiempo_restante <= 0  :
+            if comprobar_tiempo and tiempo_restante <= 0  :
                 self._terminar_por_tiempo()
         else :
             self.hud_manager.dibujar_timer(0, True)
@@ -0,0 +1,387 @@
+# Netplay con rollback sobre UDP
+# Intercambia entradas por frame, predice las del rival y re-simula al corregir
+
+import pygame
+import random
+import socket
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from src.core.game import GameEngine
+from src.entities.player import Player
+from src.utils.clock import RELOJ, tiempo_juego
+from src.utils.config import FPS, CONTROLES_JUGADOR1, NetplayConfig
+
+
+# Entrada por frame : movimientos (teclas mantenidas) y acciones (flancos de pulsacion)
+MOVIMIENTOS = ("izquierda", "derecha", "arriba", "abajo")
+ACCIONES : Tuple[Tuple[str, Callable[[Player], None]], ...] = (
+    ("golpe_ligero", lambda jugador : jugador.iniciar_golpe("golpe_j")),
+    ("patada", lambda jugador : jugador.iniciar_golpe("patada_k")),
+    ("cubrirse", Player.cubrirse),
+    ("bola", Player.iniciar_lanzar_bola),
+    ("kamehameha", Player.iniciar_kamehameha),
+    ("movimiento_final", Player.iniciar_movimiento_final),
+)
+MASCARA_MOVIMIENTOS = (1 << len(MOVIMIENTOS)) - 1
+BIT_SOLTAR_CUBRIRSE = 1 << (len(MOVIMIENTOS) + len(ACCIONES))
+
+# Paquete : proximo frame esperado del rival (ack), primer frame enviado, cantidad de entradas
+FORMATO_PAQUETE = struct.Struct("<IIB")
+
+
+class TeclasEntrada :
+    """Adapta una entrada codificada a la interfaz de pygame.key.get_pressed"""
+    
+    __slots__ = ("bits", "mascara")
+    
+    def __init__(self, controles : Dict) :
+        """Asocia las teclas de movimiento del jugador a los bits de la entrada"""
+        self.bits = {controles[nombre] : 1 << i for i, nombre in enumerate(MOVIMIENTOS)}
+        self.mascara = 0
+    
+    def __getitem__(self, tecla : int) -> bool :
+        """Indica si la tecla esta presionada en la entrada actual"""
+        return bool(self.mascara & self.bits.get(tecla, 0))
+
+
+class TransporteUDP :
+    """Socket UDP no bloqueante con latencia y perdida de paquetes simuladas"""
+    
+    def __init__(self, puerto_local : int, destino : Tuple[str, int], latencia_ms : int = 0, perdida : float = 0.0) :
+        """Abre el socket local y configura las condiciones de red simuladas"""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("0.0.0.0", puerto_local))
+        self.socket.setblocking(False)
+        self.destino = destino
+        
+        # Red simulada (solo afecta a los envios)
+        self.latencia = latencia_ms / 1000
+        self.perdida = perdida
+        self.azar = random.Random()
+        self.pendientes : Deque[Tuple[float, bytes]] = deque()
+    
+    def enviar(self, datos : bytes) :
+        """Encola un paquete (puede descartarse segun la perdida simulada)"""
+        if self.perdida and self.azar.random() < self.perdida :
+            return
+        self.pendientes.append((time.perf_counter() + self.latencia, datos))
+        self._despachar()
+    
+    def _despachar(self) :
+        """Envia los paquetes cuya latencia simulada ya transcurrio"""
+        ahora = time.perf_counter()
+        while self.pendientes and self.pendientes[0][0] <= ahora :
+            _, datos = self.pendientes.popleft()
+            try :
+                self.socket.sendto(datos, self.destino)
+            except OSError :
+                pass
+    
+    def recibir(self) -> List[bytes] :
+        """Retorna todos los paquetes disponibles sin bloquear"""
+        self._despachar()
+        
+        paquetes = []
+        while True :
+            try :
+                datos, _ = self.socket.recvfrom(2048)
+            except BlockingIOError :
+                break
+            except ConnectionResetError :
+                # Windows reporta asi que el rival todavia no escucha
+                continue
+            paquetes.append(datos)
+        return paquetes
+    
+    def cerrar(self) :
+        """Cierra el socket"""
+        self.socket.close()
+
+
+class NetplaySession :
+    """Pelea Rapida en red : entradas con retardo, prediccion y rollback"""
+    
+    def __init__(self, motor : GameEngine, transporte : TransporteUDP, jugador_local : int, retardo : int = NetplayConfig.RETARDO_ENTRADA, max_rollback : int = NetplayConfig.MAX_ROLLBACK, presupuesto_ms : float = NetplayConfig.PRESUPUESTO_RESIMULACION_MS) :
+        """Inicializa la sesion sobre un motor y un transporte ya creados"""
+        self.motor = motor
+        self.transporte = transporte
+        self.jugador_local = jugador_local
+        self.retardo = retardo
+        self.max_rollback = max_rollback
+        self.presupuesto_ms = presupuesto_ms
+        self.costo_frame_ms = 0.0  # Promedio movil de guardar + simular un frame
+        
+        # Historial de entradas (indice = frame)
+        self.entradas_locales = array("H", [0] * retardo)
+        self.entradas_remotas = array("H")  # Confirmadas por el rival
+        self.remotas_usadas = array("H")  # Usadas al simular cada frame (confirmadas o predichas)
+        self.ack_remoto = 0  # Primer frame local que el rival todavia no recibio
+        
+        # Estado de la simulacion
+        self.frame = 0
+        self.instantaneas : List[bytes] = [b""] * (max_rollback + 1)
+        self.pendiente = 0  # Flancos recibidos mientras la simulacion espera
+        self.teclas : Dict[int, TeclasEntrada] = {}
+        self.bits_acciones = [(CONTROLES_JUGADOR1[nombre], 1 << (len(MOVIMIENTOS) + i)) for i, (nombre, _) in enumerate(ACCIONES)]
+        
+        # Metricas de rollback
+        self.rollbacks = 0
+        self.frames_resimulados = 0
+        self.peor_resimulacion_ms = 0.0
+        self.esperas = 0  # Frames en que la entrada local no avanzo (ventana de prediccion llena)
+    
+    # LOOP
+    
+    def ejecutar(self, personaje1 : str, personaje2 : str) :
+        """Ejecuta la pelea en red hasta que termina o el jugador sale"""
+        motor = self.motor
+        motor.inicializar_jugadores(personaje1, personaje2)
+        motor.detener_ia()
+        motor.ai_controller = None
+        motor.en_introduccion = False
+        
+        # Todos los tiempos salen del reloj de simulacion : las instantaneas de ambos lados coinciden byte a byte
+        self.teclas = {1 : TeclasEntrada(motor.jugador1.controles), 2 : TeclasEntrada(motor.jugador2.controles)}
+        RELOJ.fijar_frame(0)
+        motor.rounds_manager.reiniciar()
+        motor.tiempo_inicio_combate = tiempo_juego()
+        motor.audio_manager.reproducir_musica_pelea()
+        
+        try :
+            while not motor.rounds_manager.pelea_terminada :
+                if not self._manejar_eventos() :
+                    break
+                
+                self.avanzar()
+                motor._dibujar_juego(comprobar_tiempo=False)
+                
+                # El fin de round solo se muestra cuando el frame del KO esta confirmado
+                if motor.rounds_manager.mostrando_ko and len(self.entradas_remotas) >= self.frame :
+                    self._fin_de_round()
+                
+                motor.reloj.tick(FPS)
+            
+            if motor.rounds_manager.pelea_terminada :
+                motor.rounds_manager.mostrar_pantalla_final(es_modo_torre=True)
+        finally :
+            RELOJ.usar_tiempo_real()
+            self.transporte.cerrar()
+            print(f"Netplay : {self.rollbacks} rollbacks, {self.frames_resimulados} frames re-simulados, "
+                  f"peor re-simulacion {self.peor_resimulacion_ms:.2f} ms, {self.esperas} frames en espera")
+        
+        motor.audio_manager.reproducir_musica_menu()
+    
+    def avanzar(self) :
+        """Recibe entradas, corrige predicciones y simula el siguiente frame"""
+        rollback = self._recibir()
+        if rollback is not None :
+            self._rollback(rollback)
+        
+        # Se espera al rival si la prediccion iria mas alla de la ventana (un rollback re-simula a lo sumo esos frames)
+        adelanto = self.frame - len(self.entradas_remotas)
+        if not self.motor.rounds_manager.mostrando_ko :
+            if adelanto < self.ventana_prediccion() :
+                inicio = time.perf_counter()
+                self.entradas_locales.append(self._muestrear_entrada_local())
+                self._guardar_instantanea(self.frame)
+                self._simular(self.frame)
+                self.frame += 1
+                self._medir_costo((time.perf_counter() - inicio) * 1000)
+            else :
+                self.esperas += 1
+        
+        self._enviar()
+    
+    def ventana_prediccion(self) -> int :
+        """Frames que se pueden predecir sin que re-simularlos supere el presupuesto"""
+        if self.costo_frame_ms <= 0 :
+            return self.max_rollback
+        return max(1, min(self.max_rollback, int(self.presupuesto_ms / self.costo_frame_ms)))
+    
+    def _medir_costo(self, ms_por_frame : float) :
+        """Actualiza el costo estimado por frame (los picos suben la estimacion enseguida, la baja es gradual)"""
+        if ms_por_frame > self.costo_frame_ms :
+            self.costo_frame_ms = ms_por_frame
+        else :
+            self.costo_frame_ms += (ms_por_frame - self.costo_frame_ms) * 0.05
+    
+    # ENTRADAS
+    
+    def _manejar_eventos(self) -> bool :
+        """Acumula los flancos de las teclas locales (False si el jugador sale)"""
+        for evento in pygame.event.get() :
+            if evento.type == pygame.QUIT :
+                pygame.quit()
+                sys.exit()
+            
+            elif evento.type == pygame.KEYDOWN :
+                if evento.key == pygame.K_ESCAPE :
+                    return False
+                for tecla, bit in self.bits_acciones :
+                    if evento.key == tecla :
+                        self.pendiente |= bit
+            
+            elif evento.type == pygame.KEYUP and evento.key == CONTROLES_JUGADOR1["cubrirse"] :
+                self.pendiente |= BIT_SOLTAR_CUBRIRSE
+        
+        return True
+    
+    def _muestrear_entrada_local(self) -> int :
+        """Codifica la entrada local del frame (el jugador local usa los controles del J1)"""
+        teclas = pygame.key.get_pressed()
+        entrada = self.pendiente
+        for i, nombre in enumerate(MOVIMIENTOS) :
+            if teclas[CONTROLES_JUGADOR1[nombre]] :
+                entrada |= 1 << i
+        
+        self.pendiente = 0
+        return entrada
+    
+    def _entrada_remota(self, frame : int) -> int :
+        """Entrada confirmada del rival o, si falta, la prediccion"""
+        if frame < len(self.entradas_remotas) :
+            return self.entradas_remotas[frame]
+        
+        # Prediccion : mantiene el ultimo movimiento, sin repetir acciones
+        if self.entradas_remotas :
+            return self.entradas_remotas[-1] & MASCARA_MOVIMIENTOS
+        return 0
+    
+    # RED
+    
+    def _enviar(self) :
+        """Envia todas las entradas locales que el rival aun no confirmo"""
+        inicio = self.ack_remoto
+        entradas = self.entradas_locales[inicio : inicio + NetplayConfig.MAX_ENTRADAS_PAQUETE]
+        paquete = FORMATO_PAQUETE.pack(len(self.entradas_remotas), inicio, len(entradas))
+        self.transporte.enviar(paquete + struct.pack(f"<{len(entradas)}H", *entradas))
+    
+    def _recibir(self) -> Optional[int] :
+        """Incorpora las entradas del rival y retorna el primer frame mal predicho"""
+        rollback = None
+        
+        for datos in self.transporte.recibir() :
+            if len(datos) < FORMATO_PAQUETE.size :
+                continue
+            
+            ack, inicio, cantidad = FORMATO_PAQUETE.unpack_from(datos)
+            if len(datos) < FORMATO_PAQUETE.size + 2 * cantidad :
+                continue
+            self.ack_remoto = max(self.ack_remoto, ack)
+            
+            # Solo se agregan entradas contiguas a las ya confirmadas
+            entradas = struct.unpack_from(f"<{cantidad}H", datos, FORMATO_PAQUETE.size)
+            for i in range(max(0, len(self.entradas_remotas) - inicio), cantidad) :
+                frame = inicio + i
+                if frame != len(self.entradas_remotas) :
+                    break
+                
+                self.entradas_remotas.append(entradas[i])
+                if rollback is None and frame < len(self.remotas_usadas) and self.remotas_usadas[frame] != entradas[i] :
+                    rollback = frame
+        
+        return rollback
+    
+    # SIMULACION
+    
+    def _guardar_instantanea(self, frame : int) :
+        """Guarda el estado previo a simular un frame"""
+        RELOJ.fijar_frame(frame)
+        self.instantaneas[frame % len(self.instantaneas)] = self.motor.snapshot()
+    
+    def _simular(self, frame : int) :
+        """Simula un frame con las entradas (confirmadas o predichas) de ambos jugadores"""
+        local = self.entradas_locales[frame]
+        remota = self._entrada_remota(frame)
+        if frame < len(self.remotas_usadas) :
+            self.remotas_usadas[frame] = remota
+        else :
+            self.remotas_usadas.append(remota)
+        
+        entrada1, entrada2 = (local, remota) if self.jugador_local == 1 else (remota, local)
+        motor = self.motor
+        RELOJ.fijar_frame(frame)
+        
+        for jugador, teclas, entrada in ((motor.jugador1, self.teclas[1], entrada1), (motor.jugador2, self.teclas[2], entrada2)) :
+            if entrada & BIT_SOLTAR_CUBRIRSE :
+                jugador.dejar_de_cubrirse()
+            for i, (_, accion) in enumerate(ACCIONES) :
+                if entrada & (1 << (len(MOVIMIENTOS) + i)) :
+                    accion(jugador)
+            teclas.mascara = entrada
+        
+        motor.simular_frame(self.teclas[1], self.teclas[2])
+        
+        if not motor.rounds_manager.mostrando_ko and motor._tiempo_restante() <= 0 :
+            motor._terminar_por_tiempo()
+    
+    def _rollback(self, frame : int) :
+        """Restaura el estado del frame mal predicho y re-simula hasta el presente"""
+        inicio = time.perf_counter()
+        destino = self.frame
+        audio = self.motor.audio_manager
+        
+        RELOJ.fijar_frame(frame)
+        self.motor.restore(self.instantaneas[frame % len(self.instantaneas)])
+        
+        audio.efectos_activos = False
+        self.frame = frame
+        while self.frame < destino :
+            if self.frame > frame :
+                self._guardar_instantanea(self.frame)
+            self._simular(self.frame)
+            self.frame += 1
+            
+            # Un KO corta la simulacion igual que en el loop normal
+            if self.motor.rounds_manager.mostrando_ko :
+                del self.remotas_usadas[self.frame :]
+                break
+        audio.efectos_activos = True
+        
+        self.rollbacks += 1
+        self.frames_resimulados += self.frame - frame
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        self.peor_resimulacion_ms = max(self.peor_resimulacion_ms, duracion_ms)
+        if self.frame > frame :
+            self._medir_costo(duracion_ms / (self.frame - frame))
+    
+    # ROUNDS
+    
+    def _esperar(self, pantalla : Callable[[], bool]) :
+        """Muestra una pantalla por tiempo real sin dejar de atender la red"""
+        while pantalla() :
+            for evento in pygame.event.get() :
+                if evento.type == pygame.QUIT :
+                    pygame.quit()
+                    sys.exit()
+            self._recibir()
+            self._enviar()
+            self.motor.reloj.tick(FPS)
+    
+    def _fin_de_round(self) :
+        """Muestra el KO y la cuenta regresiva sin alterar la simulacion compartida"""
+        motor = self.motor
+        rounds = motor.rounds_manager
+        RELOJ.fijar_frame(self.frame)
+        estado = motor.snapshot()
+        
+        # La animacion de KO avanza a los jugadores segun el tiempo real de cada maquina
+        rounds.tiempo_inicio_ko = pygame.time.get_ticks()
+        self._esperar(lambda : not rounds.mostrar_animacion_ko(motor.fondo, motor.jugador1, motor.jugador2, motor.hud_manager))
+        
+        RELOJ.fijar_frame(self.frame)
+        motor.restore(estado)
+        rounds.mostrando_ko = False
+        if rounds.pelea_terminada :
+            return
+        
+        rounds.reiniciar_jugadores(motor.jugador1, motor.jugador2)
+        rounds.iniciar_cuenta_regresiva()
+        self._esperar(lambda : rounds.mostrar_cuenta_regresiva(motor.fondo, motor.jugador1, motor.jugador2, motor.hud_manager) is None)
+        
+        RELOJ.fijar_frame(self.frame)
+        motor.tiempo_inicio_combate = tiempo_juego()
\ No newline at end of file
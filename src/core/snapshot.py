@@ -0,0 +1,236 @@
+# Instantaneas del estado de la pelea
+# Serializa jugadores, proyectiles, Kamehameha y rounds en un layout binario fijo
+
+import math
+import struct
+from typing import Tuple
+from src.entities.player import Player
+from src.entities.proyectile import Projectile
+from src.entities.special_moves import Kamehameha
+
+
+VERSION_SNAPSHOT = 2
+MAGIA_SNAPSHOT = b"DBZ"
+
+# Tablas de IDs (el orden forma parte del formato)
+ESTADOS = ("inicio", "derecha", "izquierda", "bajar", "subir", "cubrirse", "kamehameha", "aturdido")
+TIPOS_GOLPE = (None, "golpe_j", "patada_k")
+FLAGS_JUGADOR = (
+    "mirando_derecha", "golpe_animando", "hitbox_activa", "cubriendose", "lanzando_bola",
+    "usando_kamehameha", "usando_movimiento_final", "aturdido", "en_ko", "ko_animacion_completada",
+)
+ANIMADORES = ("animador_golpe", "animador_bola", "animador_movimiento_final", "animador_ko")
+SIN_CLIP = 0xFF
+
+# Layouts (little endian, sin padding). Las magnitudes que acumulan decimales van
+# en doble precision : restaurar no debe alterar la simulacion
+# Cabecera : magia, version, ms de combate transcurridos, ms de pelea transcurridos
+FORMATO_CABECERA = struct.Struct("<3sBii")
+# Jugador : x, y, vida, stamina, estado, flags, golpe, contador golpe, mano bola,
+#           segmento hitbox, hitstop, golpes consecutivos, sprite, ms desde ultimo golpe, ms aturdido,
+#           hitbox de ataque (presente, x, y, ancho, alto)
+FORMATO_JUGADOR = struct.Struct("<4dBHBBBbBBHii?4h")
+# Animador : clip, tick, indice, terminado
+FORMATO_ANIMADOR = struct.Struct("<BHB?")
+# Kamehameha : presente, origen x, origen y, distancia maxima, ms transcurridos,
+#              ms de las partes actuales, direccion, impacto, impacto registrado
+FORMATO_KAMEHAMEHA = struct.Struct("<?3dii3?")
+# Proyectil : x, y, velocidad, dano (NaN = sin daño propio), sprite, direccion
+FORMATO_PROYECTIL = struct.Struct("<2dfdH?")
+FORMATO_CANTIDAD = struct.Struct("<B")
+# Rounds : rounds j1, rounds j2, round actual, flags, stats j1 (golpes, causado, recibido), stats j2
+FORMATO_ROUNDS = struct.Struct("<BBBBHddHdd")
+
+FLAGS_ROUNDS = ("en_cuenta_regresiva", "pelea_terminada", "mostrando_ko")
+
+
+def _a_ms_relativos(ahora : int, tiempo : int) -> int :
+    """Convierte un timestamp absoluto en ms transcurridos (acotado a int32)"""
+    return max(-0x80000000, min(0x7FFFFFFF, ahora - tiempo))
+
+
+def _empaquetar_flags(objeto, nombres : Tuple[str, ...]) -> int :
+    """Empaqueta atributos booleanos en una mascara de bits"""
+    mascara = 0
+    for bit, nombre in enumerate(nombres) :
+        if getattr(objeto, nombre) :
+            mascara |= 1 << bit
+    return mascara
+
+
+def _desempaquetar_flags(objeto, nombres : Tuple[str, ...], mascara : int) :
+    """Restaura atributos booleanos desde una mascara de bits"""
+    for bit, nombre in enumerate(nombres) :
+        setattr(objeto, nombre, bool(mascara & (1 << bit)))
+
+
+# SERIALIZACION
+
+def serializar_jugador(jugador : Player, ahora : int) -> bytes :
+    """Serializa el estado de un jugador (los sprites van como IDs)"""
+    estado = ESTADOS.index(jugador.estado) if jugador.estado in ESTADOS else 0
+    hitbox = jugador.hitbox_ataque
+    rect_hitbox = hitbox or jugador.rect_hitbox
+    partes = [FORMATO_JUGADOR.pack(
+        jugador.x, jugador.y, jugador.vida_actual, jugador.stamina_actual,
+        estado,
+        _empaquetar_flags(jugador, FLAGS_JUGADOR),
+        TIPOS_GOLPE.index(jugador.golpe_tipo),
+        jugador.golpe_contador,
+        jugador.bola_contador_mano,
+        jugador.hitbox_segmento,
+        min(jugador.hitstop_restante, 0xFF),
+        min(jugador.golpes_consecutivos, 0xFF),
+        jugador.indice_sprites.get(id(jugador.sprite), 0),
+        _a_ms_relativos(ahora, jugador.tiempo_ultimo_golpe),
+        _a_ms_relativos(ahora, jugador.tiempo_inicio_aturdido),
+        hitbox is not None, rect_hitbox.x, rect_hitbox.y, rect_hitbox.width, rect_hitbox.height,
+    )]
+    
+    # Animadores : nombre de clip (por ID) + tick
+    for nombre in ANIMADORES :
+        animador = getattr(jugador, nombre)
+        clip = SIN_CLIP if animador.clip is None else jugador.nombres_clips.index(animador.clip.nombre)
+        partes.append(FORMATO_ANIMADOR.pack(clip, animador.tick, animador.indice, animador.terminado))
+    
+    # Kamehameha
+    kame = jugador.kamehameha_activo
+    if kame is None :
+        partes.append(FORMATO_KAMEHAMEHA.pack(False, 0.0, 0.0, 0.0, 0, -1, False, False, False))
+    else :
+        partes.append(FORMATO_KAMEHAMEHA.pack(
+            True, kame.origen_x, kame.origen_y, kame.distancia_maxima,
+            _a_ms_relativos(ahora, kame.tiempo_inicio), kame.tiempo_transcurrido,
+            kame.direccion, kame.impacto, kame.impacto_registrado
+        ))
+    
+    # Proyectiles
+    bolas = jugador.bolas_activas[ :0xFF]
+    partes.append(FORMATO_CANTIDAD.pack(len(bolas)))
+    for bola in bolas :
+        partes.append(FORMATO_PROYECTIL.pack(
+            bola.x, bola.y, bola.velocidad,
+            math.nan if bola.dano_custom is None else bola.dano_custom,
+            jugador.indice_sprites.get(id(bola.imagen_original), 0),
+            bola.direccion
+        ))
+    
+    return b"".join(partes)
+
+
+def restaurar_jugador(jugador : Player, datos : memoryview, desplazamiento : int, ahora : int) -> int :
+    """Restaura un jugador en el lugar y retorna el desplazamiento siguiente"""
+    (jugador.x, jugador.y, jugador.vida_actual, jugador.stamina_actual,
+     estado, flags, golpe, jugador.golpe_contador, jugador.bola_contador_mano,
+     jugador.hitbox_segmento, jugador.hitstop_restante, jugador.golpes_consecutivos,
+     sprite, ms_golpe, ms_aturdido,
+     hitbox, hitbox_x, hitbox_y, hitbox_ancho, hitbox_alto) = FORMATO_JUGADOR.unpack_from(datos, desplazamiento)
+    desplazamiento += FORMATO_JUGADOR.size
+    
+    jugador.estado = ESTADOS[estado]
+    jugador.golpe_tipo = TIPOS_GOLPE[golpe]
+    _desempaquetar_flags(jugador, FLAGS_JUGADOR, flags)
+    jugador.sprite = jugador.tabla_sprites[sprite]
+    jugador.tiempo_ultimo_golpe = ahora - ms_golpe
+    jugador.tiempo_inicio_aturdido = ahora - ms_aturdido
+    jugador.rect_hitbox.update(hitbox_x, hitbox_y, hitbox_ancho, hitbox_alto)
+    jugador.hitbox_ataque = jugador.rect_hitbox if hitbox else None
+    
+    for nombre in ANIMADORES :
+        clip, tick, indice, terminado = FORMATO_ANIMADOR.unpack_from(datos, desplazamiento)
+        desplazamiento += FORMATO_ANIMADOR.size
+        
+        animador = getattr(jugador, nombre)
+        animador.clip = None if clip == SIN_CLIP else jugador.clips[jugador.nombres_clips[clip]]
+        animador.tick = tick
+        animador.indice = indice
+        animador.terminado = terminado
+    
+    # Kamehameha (las partes se reconstruyen en el mismo instante en que se calcularon)
+    (presente, origen_x, origen_y, distancia, ms_kame, ms_partes,
+     direccion, impacto, impacto_registrado) = FORMATO_KAMEHAMEHA.unpack_from(datos, desplazamiento)
+    desplazamiento += FORMATO_KAMEHAMEHA.size
+    
+    jugador.kamehameha_activo = None
+    if presente :
+        kame = Kamehameha(origen_x, origen_y, direccion, jugador.sprites["kamehameha"], jugador.imagenes_kamehameha)
+        kame.tiempo_inicio = ahora - ms_kame
+        kame.distancia_maxima = distancia
+        kame.impacto = impacto
+        kame.impacto_registrado = impacto_registrado
+        if ms_partes >= 0 :
+            kame.construir_partes(ms_partes)
+            kame.distancia_maxima = distancia
+        jugador.kamehameha_activo = kame
+    
+    # Proyectiles
+    (cantidad,) = FORMATO_CANTIDAD.unpack_from(datos, desplazamiento)
+    desplazamiento += FORMATO_CANTIDAD.size
+    
+    jugador.bolas_activas = []
+    for _ in range(cantidad) :
+        x, y, velocidad, dano, sprite, direccion = FORMATO_PROYECTIL.unpack_from(datos, desplazamiento)
+        desplazamiento += FORMATO_PROYECTIL.size
+        
+        imagen = jugador.tabla_sprites[sprite]
+        ataque = jugador.movimiento_final_tipo if imagen is jugador.movimiento_final_proyectil else "bola"
+        bola = Projectile(x, y, direccion, imagen, dano=None if math.isnan(dano) else dano, ataque=ataque)
+        bola.velocidad = velocidad
+        jugador.bolas_activas.append(bola)
+    
+    jugador._actualizar_rect()
+    return desplazamiento
+
+
+def serializar_rounds(rounds_manager) -> bytes :
+    """Serializa los contadores y estadisticas de rounds"""
+    stats1 = rounds_manager.stats_jugador1
+    stats2 = rounds_manager.stats_jugador2
+    return FORMATO_ROUNDS.pack(
+        rounds_manager.rounds_jugador1, rounds_manager.rounds_jugador2, rounds_manager.round_actual,
+        _empaquetar_flags(rounds_manager, FLAGS_ROUNDS),
+        stats1["golpes_totales"], stats1["dano_causado"], stats1["dano_recibido"],
+        stats2["golpes_totales"], stats2["dano_causado"], stats2["dano_recibido"],
+    )
+
+
+def restaurar_rounds(rounds_manager, datos : memoryview, desplazamiento : int) -> int :
+    """Restaura los contadores de rounds y retorna el desplazamiento siguiente"""
+    (rounds_manager.rounds_jugador1, rounds_manager.rounds_jugador2, rounds_manager.round_actual,
+     flags, golpes1, causado1, recibido1, golpes2, causado2, recibido2) = FORMATO_ROUNDS.unpack_from(datos, desplazamiento)
+    
+    _desempaquetar_flags(rounds_manager, FLAGS_ROUNDS, flags)
+    rounds_manager.stats_jugador1 = {"golpes_totales" : golpes1, "dano_causado" : causado1, "dano_recibido" : recibido1}
+    rounds_manager.stats_jugador2 = {"golpes_totales" : golpes2, "dano_causado" : causado2, "dano_recibido" : recibido2}
+    return desplazamiento + FORMATO_ROUNDS.size
+
+
+def serializar_pelea(juego, ahora : int) -> bytes :
+    """Serializa la pelea completa : cabecera, jugadores y rounds"""
+    return b"".join((
+        FORMATO_CABECERA.pack(
+            MAGIA_SNAPSHOT, VERSION_SNAPSHOT,
+            _a_ms_relativos(ahora, juego.tiempo_inicio_combate),
+            _a_ms_relativos(ahora, juego.rounds_manager.tiempo_inicio_pelea_total),
+        ),
+        serializar_jugador(juego.jugador1, ahora),
+        serializar_jugador(juego.jugador2, ahora),
+        serializar_rounds(juego.rounds_manager),
+    ))
+
+
+def restaurar_pelea(juego, datos : bytes, ahora : int) :
+    """Restaura la pelea completa sobre los jugadores existentes"""
+    vista = memoryview(datos)
+    magia, version, ms_combate, ms_pelea = FORMATO_CABECERA.unpack_from(vista, 0)
+    
+    if magia != MAGIA_SNAPSHOT or version != VERSION_SNAPSHOT :
+        raise ValueError(f"Instantanea invalida (magia={magia!r}, version={version})")
+    
+    juego.tiempo_inicio_combate = ahora - ms_combate
+    juego.rounds_manager.tiempo_inicio_pelea_total = ahora - ms_pelea
+    
+    desplazamiento = FORMATO_CABECERA.size
+    desplazamiento = restaurar_jugador(juego.jugador1, vista, desplazamiento, ahora)
+    desplazamiento = restaurar_jugador(juego.jugador2, vista, desplazamiento, ahora)
+    restaurar_rounds(juego.rounds_manager, vista, desplazamiento)
\ No newline at end of file
@@ -4,5 +4,6 @@
 from src.entities.player import Player
 from src.entities.proyectile import Projectile
 from src.entities.special_moves import Kamehameha
+from src.entities.animation import AnimationClip, Animator
 
-__all__ = ["Player", "Projectile", "Kamehameha"]
\ No newline at end of file
+__all__ = ["Player", "Projectile", "Kamehameha", "AnimationClip", "Animator"]
\ No newline at end of file
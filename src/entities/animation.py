@@ -0,0 +1,163 @@
+# Sistema de animaciones
+# Clips con tablas de frames precalculadas y un animador que avanza por tick
+
+import pygame
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.entities.frame_data import HitboxFrame, MoveData
+from src.utils.config import FPS, TimeConfig
+
+
+# Movimientos finales : (tipo, clave de frames, clave del proyectil)
+MOVIMIENTOS_FINALES = (
+    ("genkidama", "genki_pose", "genkidama"),
+    ("galick_gun", "galick_gun", "galick_gun_poder"),
+    ("masenko", "masenko", "masenko_poder"),
+    ("bola_maligna", "Ulti", "Ulti_poder"),
+)
+
+
+def ms_a_ticks(ms : float) -> int :
+    """Convierte una duracion en milisegundos a ticks de juego"""
+    return max(1, round(ms * FPS / 1000))
+
+
+class AnimationClip :
+    """Secuencia de frames con duraciones y hitboxes precalculadas"""
+    
+    __slots__ = ("nombre", "frames", "duraciones", "tabla_frames", "duracion_total", "loop", "movimiento")
+    
+    def __init__(self, nombre : str, frames : Sequence[pygame.Surface], duraciones : Sequence[int], loop : bool = False, movimiento : Optional[MoveData] = None) :
+        """Inicializa un clip a partir de sus frames y duraciones en ticks"""
+        self.nombre = nombre
+        self.frames = tuple(frames)
+        self.duraciones = tuple(duraciones)
+        self.loop = loop
+        
+        # Tabla tick -> indice de frame
+        tabla : List[int] = []
+        for indice, duracion in enumerate(self.duraciones) :
+            tabla.extend([indice] * duracion)
+        self.tabla_frames = tuple(tabla)
+        self.duracion_total = len(tabla)
+        
+        # Frame data del ataque (define en que ticks hay hitbox)
+        self.movimiento = movimiento
+
+
+class Animator :
+    """Reproduce un AnimationClip avanzando un tick por frame de juego"""
+    
+    __slots__ = ("clip", "tick", "indice", "terminado")
+    
+    def __init__(self) :
+        """Inicializa un animador sin clip"""
+        self.clip : Optional[AnimationClip] = None
+        self.tick = 0
+        self.indice = 0
+        self.terminado = True
+    
+    def reproducir(self, clip : AnimationClip) :
+        """Comienza a reproducir un clip desde el primer frame"""
+        self.clip = clip
+        self.tick = 0
+        self.indice = clip.tabla_frames[0]
+        self.terminado = False
+    
+    def avanzar(self) -> bool :
+        """Avanza un tick y retorna True si cambio el frame"""
+        clip = self.clip
+        if clip is None or self.terminado :
+            return False
+        
+        self.tick += 1
+        if self.tick >= clip.duracion_total :
+            if not clip.loop :
+                self.terminado = True
+                return False
+            self.tick = 0
+        
+        indice = clip.tabla_frames[self.tick]
+        if indice != self.indice :
+            self.indice = indice
+            return True
+        return False
+    
+    def detener(self) :
+        """Detiene la animacion actual"""
+        self.clip = None
+        self.tick = 0
+        self.indice = 0
+        self.terminado = True
+    
+    @property
+    def sprite(self) -> pygame.Surface :
+        """Retorna el frame actual del clip"""
+        return self.clip.frames[self.indice]
+    
+    def hitbox_actual(self) -> Optional[HitboxFrame] :
+        """Retorna la hitbox del tick actual segun la frame data del clip"""
+        clip = self.clip
+        if clip is None or clip.movimiento is None or self.terminado :
+            return None
+        return clip.movimiento.tabla_hitbox[self.tick]
+
+
+def repartir_ticks(total : int, cantidad : int) -> List[int] :
+    """Reparte una duracion total en ticks entre varios frames"""
+    base, resto = divmod(total, cantidad)
+    return [base + (1 if i < resto else 0) for i in range(cantidad)]
+
+
+def indexar_sprites(sprites : Dict) -> Tuple[Tuple[pygame.Surface, ...], Dict[int, int]] :
+    """Asigna un ID estable a cada superficie del manifiesto del personaje"""
+    tabla : List[pygame.Surface] = []
+    indices : Dict[int, int] = {}
+    
+    for valor in sprites.values() :
+        superficies = valor if isinstance(valor, list) else [valor]
+        for superficie in superficies :
+            if isinstance(superficie, pygame.Surface) and id(superficie) not in indices :
+                indices[id(superficie)] = len(tabla)
+                tabla.append(superficie)
+    
+    return tuple(tabla), indices
+
+
+def construir_clips(sprites : Dict, frame_data : Dict[str, MoveData]) -> Dict[str, AnimationClip] :
+    """Precalcula los clips de animacion a partir del manifiesto del personaje"""
+    clips : Dict[str, AnimationClip] = {}
+    
+    # Golpes alternados (un clip por puño)
+    golpe = frame_data["golpe_j"]
+    for i, frame in enumerate(sprites.get("golpe_j", [])) :
+        clips[f"golpe_j_{i}"] = AnimationClip(f"golpe_j_{i}", [frame], [golpe.total], movimiento=golpe)
+    
+    # Patada (los frames se reparten la duracion total del movimiento)
+    patada = frame_data["patada_k"]
+    frames_patada = sprites.get("patada_k", [])
+    if frames_patada :
+        clips["patada_k"] = AnimationClip("patada_k", frames_patada, repartir_ticks(patada.total, len(frames_patada)), movimiento=patada)
+    
+    # Lanzamiento de bola (alterna manos si hay dos frames)
+    frames_bola = sprites.get("bola_energia", [])
+    if not isinstance(frames_bola, list) or not frames_bola :
+        frames_bola = [sprites["inicio"]]
+    ticks_bola = ms_a_ticks(TimeConfig.TIEMPO_ANIMACION_BOLA)
+    for i, frame in enumerate(frames_bola) :
+        clips[f"bola_energia_{i}"] = AnimationClip(f"bola_energia_{i}", [frame], [ticks_bola])
+    
+    # Movimiento final
+    for _, clave_frames, _ in MOVIMIENTOS_FINALES :
+        if clave_frames in sprites :
+            frames_final = sprites[clave_frames]
+            ticks_final = ms_a_ticks(TimeConfig.TIEMPO_FRAME_MOVIMIENTO_FINAL)
+            clips["movimiento_final"] = AnimationClip("movimiento_final", frames_final, [ticks_final] * len(frames_final))
+            break
+    
+    # KO (en bucle)
+    frames_ko = sprites.get("ko", [])
+    if frames_ko :
+        ticks_ko = ms_a_ticks(TimeConfig.DURACION_KO // len(frames_ko))
+        clips["ko"] = AnimationClip("ko", frames_ko, [ticks_ko] * len(frames_ko), loop=True)
+    
+    return clips
\ No newline at end of file
@@ -0,0 +1,59 @@
+# Frame data de los ataques
+# Compila FrameDataConfig una sola vez en tuplas compactas indexadas por tick
+
+from typing import Dict, NamedTuple, Optional, Tuple
+from src.utils.config import FrameDataConfig
+
+
+# Entrada de hitbox por tick : (segmento, ancho, alto, offset_x, offset_y)
+HitboxFrame = Tuple[int, int, int, int, int]
+
+
+class MoveData(NamedTuple) :
+    """Frame data compilada de un movimiento"""
+    startup : int
+    active : int
+    recovery : int
+    hitstop : int
+    total : int
+    tabla_hitbox : Tuple[Optional[HitboxFrame], ...]
+
+
+def compilar_movimiento(nombre : str, entrada : Tuple) -> MoveData :
+    """Convierte una entrada de FrameDataConfig en un MoveData"""
+    startup, active, recovery, hitstop, hitboxes = entrada
+    
+    if sum(h[0] for h in hitboxes) != active :
+        raise ValueError(f"Frame data de {nombre} : las hitboxes no suman {active} frames activos")
+    
+    # Tabla tick -> hitbox (None fuera de los frames activos)
+    tabla : list = [None] * startup
+    for segmento, (frames, ancho, alto, offset_x, offset_y) in enumerate(hitboxes) :
+        tabla.extend([(segmento, ancho, alto, offset_x, offset_y)] * frames)
+    tabla.extend([None] * recovery)
+    
+    return MoveData(startup, active, recovery, hitstop, len(tabla), tuple(tabla))
+
+
+def _cargar_frame_data() -> Dict[Optional[str], Dict[str, MoveData]] :
+    """Compila la frame data de todos los personajes"""
+    base = {
+        movimiento : compilar_movimiento(movimiento, entrada)
+        for movimiento, entrada in FrameDataConfig.DEFAULT.items()
+    }
+    
+    datos : Dict[Optional[str], Dict[str, MoveData]] = {None : base}
+    for personaje, movimientos in FrameDataConfig.PERSONAJES.items() :
+        datos[personaje] = dict(base)
+        for movimiento, entrada in movimientos.items() :
+            datos[personaje][movimiento] = compilar_movimiento(f"{personaje}.{movimiento}", entrada)
+    
+    return datos
+
+
+FRAME_DATA = _cargar_frame_data()
+
+
+def obtener_frame_data(personaje : Optional[str] = None) -> Dict[str, MoveData] :
+    """Retorna la frame data de un personaje (o la de por defecto)"""
+    return FRAME_DATA.get(personaje, FRAME_DATA[None])
\ No newline at end of file
@@ -5,15 +5,19 @@ import pygame
 from typing import Dict, List, Optional
 from src.entities.proyectile import Projectile
 from src.entities.special_moves import Kamehameha
+from src.entities.animation import Animator, construir_clips, indexar_sprites, MOVIMIENTOS_FINALES
+from src.entities.frame_data import obtener_frame_data
+from src.utils.events import EventBus, EventoCombate
+from src.utils.clock import tiempo_juego
 from src.utils.config import (
-    ANCHO, ALTO, CombatConfig, TimeConfig
+    ANCHO, ALTO, CombatConfig
 )
 
 
 class Player :
     """Representa un peleador en el juego"""
     
-    def __init__(self, x : int, y : int, controles : Dict, sprites : Dict) :
+    def __init__(self, x : int, y : int, controles : Dict, sprites : Dict, personaje : Optional[str] = None) :
         """Inicializa un jugador"""
         # Posicion
         self.x = x
@@ -27,6 +31,15 @@ class Player :
         self.sprite = self.sprites[self.estado]
         self.mirando_derecha = True
         
+        # Frame data y clips de animacion precalculados
+        self.personaje = personaje
+        self.frame_data = obtener_frame_data(personaje)
+        self.clips = construir_clips(sprites, self.frame_data)
+        self.nombres_clips = tuple(sorted(self.clips))
+        
+        # IDs de sprites (las instantaneas referencian frames, no superficies)
+        self.tabla_sprites, self.indice_sprites = indexar_sprites(sprites)
+        
         # Hitbox
         self.rect = pygame.Rect(
             self.x, self.y, 
@@ -37,13 +50,15 @@ class Player :
         # Sistema de golpes
         self.golpe_animando = False
         self.golpe_tipo = None
-        self.golpe_frame = 0
         self.golpe_contador = 0
-        self.golpe_ultimo_tiempo = 0
+        self.animador_golpe = Animator()
         
         # Hitbox de ataque
         self.hitbox_activa = False
         self.hitbox_ataque = None
+        self.hitbox_segmento = -1
+        self.rect_hitbox = pygame.Rect(0, 0, 0, 0)
+        self.hitstop_restante = 0
         self.dano_golpe_j = CombatConfig.DANO_GOLPE
         self.dano_patada_k = CombatConfig.DANO_PATADA
         self.dano_bola = CombatConfig.DANO_BOLA
@@ -59,9 +74,8 @@ class Player :
         
         # Animacion lanzamiento bola
         self.lanzando_bola = False
-        self.bola_energia_frames = self.sprites.get("bola_energia", [])
         self.bola_contador_mano = 0
-        self.bola_energia_inicio_tiempo = 0
+        self.animador_bola = Animator()
         
         # Sistema de vida y energia
         self.vida_maxima = CombatConfig.VIDA_MAXIMA
@@ -82,15 +96,35 @@ class Player :
         
         # Sistema de KO
         self.en_ko = False
-        self.ko_frame = 0
-        self.ko_ultimo_tiempo = 0
         self.ko_animacion_completada = False
+        self.animador_ko = Animator()
+        
+        # Bus de eventos (lo conecta el motor del juego)
+        self.eventos : Optional[EventBus] = None
+        self.numero_jugador = 0
         
         # Sistema de movimiento final
         self.usando_movimiento_final = False
-        self.movimiento_final_frame = 0
-        self.movimiento_final_inicio_tiempo = 0
+        self.animador_movimiento_final = Animator()
         self.movimiento_final_tipo = None
+        self.movimiento_final_proyectil = None
+        for tipo, clave_frames, clave_proyectil in MOVIMIENTOS_FINALES :
+            if clave_frames in self.sprites :
+                self.movimiento_final_tipo = tipo
+                self.movimiento_final_proyectil = self.sprites.get(clave_proyectil)
+                break
+    
+    # EVENTOS
+    
+    def conectar_eventos(self, eventos : EventBus, numero_jugador : int) :
+        """Conecta el jugador al bus de eventos del combate"""
+        self.eventos = eventos
+        self.numero_jugador = numero_jugador
+    
+    def _publicar(self, tipo : EventoCombate, ataque : str = "") :
+        """Publica un evento propio en el bus si esta conectado"""
+        if self.eventos :
+            self.eventos.publicar(tipo, self.numero_jugador, ataque=ataque)
     
     # METODOS DE ACTUALIZACION
     
@@ -102,6 +136,11 @@ class Player :
             self._actualizar_ko()
             return
         
+        # Hit-stop : congelar al jugador unos frames tras un impacto
+        if self.hitstop_restante > 0 :
+            self.hitstop_restante -= 1
+            return
+        
         if self.aturdido :
             self._actualizar_aturdimiento()
             return
@@ -161,59 +200,65 @@ class Player :
             self.consumir_stamina(costo)
             self.golpe_animando = True
             self.golpe_tipo = tipo_golpe
-            self.golpe_frame = 0
-            self.golpe_ultimo_tiempo = pygame.time.get_ticks()
-            
-            self._crear_hitbox_ataque()
             
             if tipo_golpe == "golpe_j" :
                 self.golpe_contador = (self.golpe_contador + 1) % 2
-                self.sprite = self.sprites["golpe_j"][self.golpe_contador]
+                self.animador_golpe.reproducir(self.clips[f"golpe_j_{self.golpe_contador}"])
             elif tipo_golpe == "patada_k" :
-                self.sprite = self.sprites["patada_k"][self.golpe_frame]
+                self.animador_golpe.reproducir(self.clips["patada_k"])
+            
+            self.hitbox_segmento = -1
+            self.sprite = self.animador_golpe.sprite
+            self._actualizar_hitbox_ataque()
+            self._publicar(EventoCombate.ATAQUE, tipo_golpe)
     
     def _actualizar_golpe(self) :
         """Actualiza la animacion de golpe"""
-        ahora = pygame.time.get_ticks()
-        tiempo_frame = TimeConfig.TIEMPO_FRAME_GOLPE
+        cambio_frame = self.animador_golpe.avanzar()
         
-        if self.golpe_tipo == "golpe_j" :
-            if ahora - self.golpe_ultimo_tiempo > tiempo_frame :
-                self._finalizar_golpe()
+        if self.animador_golpe.terminado :
+            self._finalizar_golpe()
+            return
         
-        elif self.golpe_tipo == "patada_k" :
-            if ahora - self.golpe_ultimo_tiempo > tiempo_frame :
-                self.golpe_ultimo_tiempo = ahora
-                self.golpe_frame += 1
-                
-                if self.golpe_frame < len(self.sprites["patada_k"]) :
-                    self.sprite = self.sprites["patada_k"][self.golpe_frame]
-                    self._crear_hitbox_ataque()
-                else :
-                    self._finalizar_golpe()
+        if cambio_frame :
+            self.sprite = self.animador_golpe.sprite
+        self._actualizar_hitbox_ataque()
     
     def _finalizar_golpe(self) :
         """Finaliza la animacion de golpe"""
         self.golpe_animando = False
+        self.animador_golpe.detener()
         self.hitbox_activa = False
         self.hitbox_ataque = None
         self.estado = "inicio"
         self.sprite = self.sprites[self.estado]
     
-    def _crear_hitbox_ataque(self) :
-        """Crea la hitbox del ataque"""
-        ancho_hitbox = 60
-        alto_hitbox = 40
+    def _actualizar_hitbox_ataque(self) :
+        """Actualiza la hitbox del ataque segun la frame data del tick actual"""
+        entrada = self.animador_golpe.hitbox_actual()
+        
+        # Startup o recovery : sin hitbox
+        if entrada is None :
+            self.hitbox_activa = False
+            self.hitbox_ataque = None
+            return
+        
+        segmento, ancho_hitbox, alto_hitbox, offset_x, offset_y = entrada
+        
+        # Cada segmento nuevo puede volver a impactar
+        if segmento != self.hitbox_segmento :
+            self.hitbox_segmento = segmento
+            self.hitbox_activa = True
         
         if self.mirando_derecha :
-            x_hitbox = self.x + self.sprite.get_width()
+            x_hitbox = self.x + self.sprite.get_width() + offset_x
         else :
-            x_hitbox = self.x - ancho_hitbox
+            x_hitbox = self.x - ancho_hitbox - offset_x
         
-        y_hitbox = self.y + self.sprite.get_height() // 2 - alto_hitbox // 2
+        y_hitbox = self.y + self.sprite.get_height() // 2 - alto_hitbox // 2 + offset_y
         
-        self.hitbox_ataque = pygame.Rect(x_hitbox, y_hitbox, ancho_hitbox, alto_hitbox)
-        self.hitbox_activa = True
+        self.rect_hitbox.update(x_hitbox, y_hitbox, ancho_hitbox, alto_hitbox)
+        self.hitbox_ataque = self.rect_hitbox
     
     def obtener_dano_ataque(self) -> float :
         """Retorna el daño del ataque actual"""
@@ -223,6 +268,15 @@ class Player :
             return self.dano_patada_k
         return 0
     
+    def obtener_hitstop_ataque(self) -> int :
+        """Retorna los frames de hit-stop del ataque actual"""
+        movimiento = self.frame_data.get(self.golpe_tipo)
+        return movimiento.hitstop if movimiento else 0
+    
+    def aplicar_hitstop(self, frames : int) :
+        """Congela al jugador durante los frames indicados"""
+        self.hitstop_restante = max(self.hitstop_restante, frames)
+    
     # SISTEMA DE DEFENSA
     
     def cubrirse(self) :
@@ -247,8 +301,12 @@ class Player :
         else :
             dano_real = cantidad * CombatConfig.REDUCCION_DANO_CUBIERTO
         
+        vida_previa = self.vida_actual
         self.vida_actual = max(0, self.vida_actual - dano_real)
         
+        if self.vida_actual <= 0 and vida_previa > 0 :
+            self._publicar(EventoCombate.KO)
+        
         if self.vida_actual <= 0 and not self.en_ko :
             self._iniciar_ko()
         
@@ -264,14 +322,12 @@ class Player :
             
             self.consumir_stamina(CombatConfig.COSTO_BOLA)
             self.lanzando_bola = True
-            self.bola_energia_inicio_tiempo = pygame.time.get_ticks()
             
-            # Seleccionar sprite de animacion
-            if isinstance(self.bola_energia_frames, list) and len(self.bola_energia_frames) >= 2 :
-                self.sprite = self.bola_energia_frames[self.bola_contador_mano]
-                self.bola_contador_mano = (self.bola_contador_mano + 1) % 2
-            elif isinstance(self.bola_energia_frames, list) and len(self.bola_energia_frames) == 1 :
-                self.sprite = self.bola_energia_frames[0]
+            # Seleccionar clip de animacion (alterna manos si hay dos)
+            clip = self.clips.get(f"bola_energia_{self.bola_contador_mano}", self.clips["bola_energia_0"])
+            self.bola_contador_mano = (self.bola_contador_mano + 1) % 2
+            self.animador_bola.reproducir(clip)
+            self.sprite = self.animador_bola.sprite
             
             self._lanzar_bola()
     
@@ -280,8 +336,8 @@ class Player :
         if not self.lanzando_bola :
             return
         
-        ahora = pygame.time.get_ticks()
-        if ahora - self.bola_energia_inicio_tiempo > TimeConfig.TIEMPO_ANIMACION_BOLA :
+        self.animador_bola.avanzar()
+        if self.animador_bola.terminado :
             self.lanzando_bola = False
             self.estado = "inicio"
             self.sprite = self.sprites[self.estado]
@@ -302,6 +358,7 @@ class Player :
         
         nueva_bola = Projectile(inicio_x, centro_y, direccion, self.imagen_bola, dano=self.dano_bola)
         self.bolas_activas.append(nueva_bola)
+        self._publicar(EventoCombate.PROYECTIL, "bola")
     
     # SISTEMA DE KAMEHAMEHA
     
@@ -319,6 +376,7 @@ class Player :
         origen_x = self.x + self.sprite.get_width() if self.mirando_derecha else self.x
         
         self.kamehameha_activo = Kamehameha( origen_x, self.y, self.mirando_derecha, self.sprite, self.imagenes_kamehameha)
+        self._publicar(EventoCombate.ESPECIAL, "kamehameha")
     
     def _actualizar_kamehameha(self) :
         """Actualiza el Kamehameha"""
@@ -335,75 +393,37 @@ class Player :
     
     def iniciar_movimiento_final(self) :
         """Inicia el movimiento final del personaje"""
-        if (self.usando_movimiento_final or 
+        if (self.usando_movimiento_final or "movimiento_final" not in self.clips or
             not self.tiene_stamina(CombatConfig.COSTO_MOVIMIENTO_FINAL)) :
             return
         
-        # Detectar tipo de movimiento final
-        if "genki_pose" in self.sprites :
-            self.movimiento_final_tipo = "genkidama"
-        elif "galick_gun" in self.sprites :
-            self.movimiento_final_tipo = "galick_gun"
-        elif "masenko" in self.sprites :
-            self.movimiento_final_tipo = "masenko"
-        elif "Ulti" in self.sprites :
-            self.movimiento_final_tipo = "bola_maligna"
-        else :
-            return
-        
         self.consumir_stamina(CombatConfig.COSTO_MOVIMIENTO_FINAL)
         self.usando_movimiento_final = True
-        self.movimiento_final_frame = 0
-        self.movimiento_final_inicio_tiempo = pygame.time.get_ticks()
+        self.animador_movimiento_final.reproducir(self.clips["movimiento_final"])
+        self.sprite = self.animador_movimiento_final.sprite
+        self._publicar(EventoCombate.ESPECIAL, self.movimiento_final_tipo)
     
     def _actualizar_movimiento_final(self) :
         """Actualiza la animacion del movimiento final"""
         if not self.usando_movimiento_final :
             return
         
-        ahora = pygame.time.get_ticks()
-        tiempo_transcurrido = ahora - self.movimiento_final_inicio_tiempo
+        cambio_frame = self.animador_movimiento_final.avanzar()
         
-        # Obtener frames segun el tipo
-        frames_map = {
-            "genkidama" : "genki_pose",
-            "galick_gun" : "galick_gun",
-            "masenko" : "masenko",
-            "bola_maligna" : "Ulti"
-        }
-        
-        key = frames_map.get(self.movimiento_final_tipo)
-        if not key or key not in self.sprites :
+        if self.animador_movimiento_final.terminado :
+            self._lanzar_movimiento_final()
             self.usando_movimiento_final = False
-            return
-        
-        frames = self.sprites[key]
-        
-        if tiempo_transcurrido > TimeConfig.TIEMPO_FRAME_MOVIMIENTO_FINAL * self.movimiento_final_frame :
-            self.movimiento_final_frame += 1
-            
-            if self.movimiento_final_frame < len(frames) :
-                self.sprite = frames[self.movimiento_final_frame]
-            else :
-                self._lanzar_movimiento_final()
-                self.usando_movimiento_final = False
-                self.estado = "inicio"
-                self.sprite = self.sprites["inicio"]
+            self.estado = "inicio"
+            self.sprite = self.sprites["inicio"]
+        elif cambio_frame :
+            self.sprite = self.animador_movimiento_final.sprite
     
     def _lanzar_movimiento_final(self) :
         """Lanza el proyectil del movimiento final"""
-        imagen_map = {
-            "genkidama" : "genkidama",
-            "galick_gun" : "galick_gun_poder",
-            "masenko" : "masenko_poder",
-            "bola_maligna" : "Ulti_poder"
-        }
-        
-        key = imagen_map.get(self.movimiento_final_tipo)
-        if not key or key not in self.sprites :
+        imagen_proyectil = self.movimiento_final_proyectil
+        if imagen_proyectil is None :
             return
         
-        imagen_proyectil = self.sprites[key]
         centro_y = self.y + self.sprite.get_height() // 2
         
         if self.mirando_derecha :
@@ -413,14 +433,15 @@ class Player :
             inicio_x = self.x
             direccion = False
         
-        nueva_bola = Projectile(inicio_x, centro_y, direccion, imagen_proyectil, velocidad=8)
+        nueva_bola = Projectile(inicio_x, centro_y, direccion, imagen_proyectil, velocidad=8, ataque=self.movimiento_final_tipo)
         self.bolas_activas.append(nueva_bola)
+        self._publicar(EventoCombate.PROYECTIL, self.movimiento_final_tipo)
     
     # SISTEMA DE COMBOS Y ATURDIMIENTO
 
     def recibir_golpe_combo(self) :
         """Registra un golpe para el sistema de combos"""
-        ahora = pygame.time.get_ticks()
+        ahora = tiempo_juego()
         
         if ahora - self.tiempo_ultimo_golpe > CombatConfig.TIEMPO_RESETEO_COMBO :
             self.golpes_consecutivos = 0
@@ -434,15 +455,16 @@ class Player :
     def _iniciar_aturdimiento(self) :
         """Inicia el estado de aturdimiento"""
         self.aturdido = True
-        self.tiempo_inicio_aturdido = pygame.time.get_ticks()
+        self.tiempo_inicio_aturdido = tiempo_juego()
         self.golpes_consecutivos = 0
         self.estado = "aturdido"
         if "aturdido" in self.sprites :
             self.sprite = self.sprites["aturdido"]
+        self._publicar(EventoCombate.ATURDIMIENTO)
     
     def _actualizar_aturdimiento(self) :
         """Actualiza el estado de aturdimiento"""
-        ahora = pygame.time.get_ticks()
+        ahora = tiempo_juego()
         if ahora - self.tiempo_inicio_aturdido > CombatConfig.DURACION_ATURDIMIENTO :
             self.aturdido = False
             self.estado = "inicio"
@@ -452,31 +474,26 @@ class Player :
     
     def _iniciar_ko(self) :
         """Inicia la animacion de KO"""
-        if "ko" not in self.sprites or len(self.sprites["ko"]) == 0 :
+        if "ko" not in self.clips :
             return
         
         self.en_ko = True
-        self.ko_frame = 0
-        self.ko_ultimo_tiempo = pygame.time.get_ticks()
         self.ko_animacion_completada = False
-        self.sprite = self.sprites["ko"][0]
+        self.animador_ko.reproducir(self.clips["ko"])
+        self.sprite = self.animador_ko.sprite
     
     def _actualizar_ko(self) :
         """Actualiza la animacion de KO"""
-        if not self.en_ko or "ko" not in self.sprites :
+        if not self.en_ko :
             return
         
-        ahora = pygame.time.get_ticks()
-        
-        if ahora - self.ko_ultimo_tiempo > TimeConfig.DURACION_KO // len(self.sprites["ko"]) :
-            self.ko_ultimo_tiempo = ahora
-            self.ko_frame = (self.ko_frame + 1) % len(self.sprites["ko"])
-            self.sprite = self.sprites["ko"][self.ko_frame]
+        if self.animador_ko.avanzar() :
+            self.sprite = self.animador_ko.sprite
     
     def resetear_ko(self) :
         """Resetea el estado de KO para un nuevo round"""
         self.en_ko = False
-        self.ko_frame = 0
+        self.animador_ko.detener()
         self.ko_animacion_completada = False
         self.vida_actual = self.vida_maxima
         self.estado = "inicio"
@@ -486,7 +503,7 @@ class Player :
     
     def mover(self, teclas : pygame.key.ScancodeWrapper) :
         """Mueve el jugador segun las teclas presionadas"""
-        if any([self.golpe_animando, self.lanzando_bola, self.cubriendose, self.usando_kamehameha, self.aturdido, self.en_ko, self.usando_movimiento_final]) :
+        if any([self.golpe_animando, self.lanzando_bola, self.cubriendose, self.usando_kamehameha, self.aturdido, self.en_ko, self.usando_movimiento_final, self.hitstop_restante > 0]) :
             return
         
         mov_x, mov_y = 0, 0
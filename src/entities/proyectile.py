@@ -8,7 +8,7 @@ from src.utils.config import TimeConfig
 class Projectile :
     """Representa un proyectil de energia"""
     
-    def __init__(self, x : float, y : float, direccion : bool, imagen_original : pygame.Surface, velocidad : int = None,dano : float = None) :
+    def __init__(self, x : float, y : float, direccion : bool, imagen_original : pygame.Surface, velocidad : int = None,dano : float = None, ataque : str = "bola") :
 
         """Inicializa un proyectil"""
         self.x = x
@@ -16,12 +16,16 @@ class Projectile :
         self.direccion = direccion
         self.velocidad = velocidad or TimeConfig.VELOCIDAD_PROYECTIL
         self.dano_custom = dano  # Daño personalizado (para movimientos finales)
+        self.ataque = ataque  # Nombre en los eventos de impacto (bola o tipo de movimiento final)
+        
+        # Se guarda la referencia al sprite original (las instantaneas la identifican por ID)
+        self.imagen_original = imagen_original
         
         # Voltea las imagenes si va hacia la izquierda
         if direccion :
-            self.imagen = imagen_original.copy()
+            self.imagen = imagen_original
         else :
-            self.imagen = pygame.transform.flip(imagen_original.copy(), True, False)
+            self.imagen = pygame.transform.flip(imagen_original, True, False)
         
         self.rect = self.imagen.get_rect(center=(self.x, self.y))
         self.activa = True
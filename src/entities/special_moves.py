@@ -3,6 +3,7 @@
 import pygame
 from typing import List
 from src.utils.config import TimeConfig
+from src.utils.clock import tiempo_juego
 
 
 class Kamehameha :
@@ -22,7 +23,7 @@ class Kamehameha :
         self.imagen_final = imagenes_kamehameha[2] if len(imagenes_kamehameha) > 2 else None
         
         # Control de tiempo
-        self.tiempo_inicio = pygame.time.get_ticks()
+        self.tiempo_inicio = tiempo_juego()
         self.duracion = TimeConfig.DURACION_KAMEHAMEHA
         self.velocidad_expansion = 15  # Pixeles por frame
         
@@ -30,11 +31,13 @@ class Kamehameha :
         self.partes = []
         self.activo = True
         self.impacto = False
+        self.impacto_registrado = False
         self.distancia_maxima = 0
+        self.tiempo_transcurrido = -1  # Instante de las partes actuales (-1 : sin calcular)
     
     def actualizar(self) :
         """Actualiza la animacion del Kamehameha"""
-        tiempo_actual = pygame.time.get_ticks()
+        tiempo_actual = tiempo_juego()
         tiempo_transcurrido = tiempo_actual - self.tiempo_inicio
         
         # Verificar si termino
@@ -42,6 +45,12 @@ class Kamehameha :
             self.activo = False
             return
         
+        self.construir_partes(tiempo_transcurrido)
+    
+    def construir_partes(self, tiempo_transcurrido : int) :
+        """Calcula las partes del rayo para un instante de la animacion"""
+        self.tiempo_transcurrido = tiempo_transcurrido
+        
         # Limpiar partes anteriores
         self.partes = []
         
@@ -66,6 +75,8 @@ class Kamehameha :
                 "tipo" : "final",
                 "x" : x_final,
                 "y" : centro_y - self.imagen_final.get_height() // 2,
+                "ancho" : self.imagen_final.get_width(),
+                "alto" : self.imagen_final.get_height(),
                 "imagen" : self.imagen_final
             })
         
@@ -78,16 +89,15 @@ class Kamehameha :
                 ancho_cuerpo = self.origen_x - (self.partes[0]["x"] + self.imagen_final.get_width())
                 x_cuerpo = self.partes[0]["x"] + self.imagen_final.get_width()
             
-            if ancho_cuerpo > 0 :
-                cuerpo_escalado = pygame.transform.scale(
-                    self.imagen_cuerpo,
-                    (int(ancho_cuerpo), self.imagen_cuerpo.get_height()))
-                
+            # El escalado se difiere al dibujado (la simulacion solo necesita el tamaño)
+            if int(ancho_cuerpo) > 0 :
                 self.partes.append({
                     "tipo" : "cuerpo",
                     "x" : x_cuerpo,
-                    "y" : centro_y - cuerpo_escalado.get_height() // 2,
-                    "imagen" : cuerpo_escalado
+                    "y" : centro_y - self.imagen_cuerpo.get_height() // 2,
+                    "ancho" : int(ancho_cuerpo),
+                    "alto" : self.imagen_cuerpo.get_height(),
+                    "imagen" : self.imagen_cuerpo
                 })
         
         # FASE 3 : Inicio del kamehameha
@@ -101,6 +111,8 @@ class Kamehameha :
                 "tipo" : "inicio",
                 "x" : x_inicio,
                 "y" : centro_y - self.imagen_inicio.get_height() // 2,
+                "ancho" : self.imagen_inicio.get_width(),
+                "alto" : self.imagen_inicio.get_height(),
                 "imagen" : self.imagen_inicio
             })
     
@@ -117,6 +129,8 @@ class Kamehameha :
         
         for parte in partes_ordenadas :
             imagen = parte["imagen"]
+            if parte["tipo"] == "cuerpo" :
+                imagen = pygame.transform.scale(imagen, (parte["ancho"], parte["alto"]))
             if not self.direccion :  # Voltear si va a la izquierda
                 imagen = pygame.transform.flip(imagen, True, False)
             pantalla.blit(imagen, (parte["x"], parte["y"]))
@@ -128,8 +142,8 @@ class Kamehameha :
             hitbox = pygame.Rect(
                 parte["x"],
                 parte["y"],
-                parte["imagen"].get_width(),
-                parte["imagen"].get_height()
+                parte["ancho"],
+                parte["alto"]
             )
             hitboxes.append(hitbox)
         return hitboxes
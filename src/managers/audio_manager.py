@@ -4,6 +4,17 @@
 import pygame
 from typing import Optional
 from src.utils.config import Paths
+from src.utils.events import DatosEvento, EventBus, EventoCombate
+
+
+# Sonido asociado a cada evento de combate
+SONIDOS_EVENTOS = {
+    EventoCombate.GOLPE: "golpe",
+    EventoCombate.BLOQUEO: "bloqueo",
+    EventoCombate.ATURDIMIENTO: "aturdir",
+    EventoCombate.PROYECTIL: "poder_ligero",
+    EventoCombate.ESPECIAL: "kamehameha",
+}
 
 
 class AudioManager:
@@ -15,6 +26,9 @@ class AudioManager:
         self.musica_actual: Optional[str] = None
         self.sonidos: dict = {}
         
+        # Se desactiva durante la re-simulacion del netplay
+        self.efectos_activos = True
+        
         # Cargar efectos de sonido
         self._cargar_sonidos()
     
@@ -25,6 +39,32 @@ class AudioManager:
         except:
             print("No se pudo cargar el sonido del cursor")
             self.sonidos["cursor"] = None
+        
+        # Efectos de combate
+        efectos = {
+            "golpe": Paths.SONIDO_GOLPE,
+            "bloqueo": Paths.SONIDO_BLOQUEO,
+            "aturdir": Paths.SONIDO_ATURDIR,
+            "poder_ligero": Paths.SONIDO_PODER_LIGERO,
+            "kamehameha": Paths.SONIDO_KAMEHAMEHA,
+        }
+        for nombre, ruta in efectos.items():
+            try:
+                self.sonidos[nombre] = pygame.mixer.Sound(ruta)
+                self.sonidos[nombre].set_volume(self.volumen)
+            except:
+                print(f"No se pudo cargar el sonido {ruta}")
+                self.sonidos[nombre] = None
+    
+    def conectar_eventos(self, eventos: EventBus):
+        """Suscribe los efectos de sonido a los eventos de combate"""
+        for tipo in SONIDOS_EVENTOS:
+            eventos.suscribir(tipo, self._al_evento_combate)
+    
+    def _al_evento_combate(self, evento: DatosEvento):
+        """Reproduce el sonido asociado a un evento de combate"""
+        if self.efectos_activos:
+            self.reproducir_sonido(SONIDOS_EVENTOS[evento.tipo])
     
     def reproducir_musica_menu(self):
         """Reproduce la musica del menu"""
@@ -62,6 +102,10 @@ class AudioManager:
         """Ajusta el volumen de la musica"""
         self.volumen = max(0.0, min(1.0, self.volumen + delta))
         pygame.mixer.music.set_volume(self.volumen)
+        
+        for nombre in SONIDOS_EVENTOS.values():
+            if self.sonidos.get(nombre):
+                self.sonidos[nombre].set_volume(self.volumen)
     
     def subir_volumen(self):
         """Sube el volumen un 10%"""
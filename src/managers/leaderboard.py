@@ -0,0 +1,50 @@
+# Ranking acotado de records
+# Mantiene solo los K mejores ordenados (insercion por biseccion); el resto queda en el archivo de la base
+
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+
+class Leaderboard :
+    """Los K mejores records por puntaje (en empate queda primero el mas antiguo)"""
+    
+    def __init__(self, capacidad : int) :
+        """Inicializa el ranking vacio"""
+        self.capacidad = capacidad
+        self.claves : List[Tuple[int, int]] = []  # (-puntaje, orden de llegada)
+        self.records : List[Dict] = []
+        self.orden = 0
+    
+    def cargar(self, records : List[Dict]) :
+        """Reemplaza el ranking por records ya ordenados (los primeros K)"""
+        self.claves.clear()
+        self.records.clear()
+        self.orden = 0
+        for record in records[ :self.capacidad] :
+            self.orden += 1
+            self.claves.append((-record["puntaje"], self.orden))
+            self.records.append(record)
+    
+    def califica(self, puntaje : int) -> bool :
+        """Indica si un puntaje nuevo entraria al ranking (un empate con el ultimo no entra)"""
+        return len(self.records) < self.capacidad or -puntaje < self.claves[-1][0]
+    
+    def insertar(self, record : Dict) -> Optional[Dict] :
+        """Inserta en su lugar; retorna el record que queda fuera del ranking (None si no sale ninguno)"""
+        if not self.califica(record["puntaje"]) :
+            return record
+        
+        self.orden += 1
+        clave = (-record["puntaje"], self.orden)
+        indice = bisect.bisect(self.claves, clave)
+        self.claves.insert(indice, clave)
+        self.records.insert(indice, record)
+        
+        if len(self.records) > self.capacidad :
+            self.claves.pop()
+            return self.records.pop()
+        return None
+    
+    def top(self, cantidad : int) -> List[Dict] :
+        """Los primeros records del ranking"""
+        return self.records[ :cantidad]
\ No newline at end of file
@@ -0,0 +1,58 @@
+# Escritor de persistencia en segundo plano
+# Toda escritura a disco (records, estado de la torre, etc.) pasa por un solo hilo con cola acotada
+
+import atexit
+import queue
+import threading
+from typing import Callable, Optional
+from src.utils.config import PersistenceConfig
+
+
+class EscritorPersistencia :
+    """Hilo unico de escritura : las pantallas encolan y siguen dibujando"""
+    
+    def __init__(self, capacidad : int = PersistenceConfig.COLA_MAXIMA) :
+        """Inicia el hilo con una cola de tareas acotada"""
+        # Cola llena : encolar espera (contrapresion) en vez de crecer sin limite
+        self._cola : queue.Queue = queue.Queue(maxsize=capacidad)
+        self._hilo = threading.Thread(target=self._ejecutar, name="escritor-persistencia", daemon=True)
+        self._hilo.start()
+    
+    def encolar(self, tarea : Callable, *args) :
+        """Agrega una escritura (se ejecuta en orden de llegada)"""
+        self._cola.put((tarea, args))
+    
+    def vaciar(self, timeout : float = PersistenceConfig.ESPERA_CIERRE) -> bool :
+        """Espera a que se completen las escrituras encoladas; retorna False si vence el timeout"""
+        terminado = threading.Event()
+        try :
+            self._cola.put((terminado.set, ()), timeout=timeout)
+        except queue.Full :
+            return False
+        return terminado.wait(timeout)
+    
+    @property
+    def pendientes(self) -> int :
+        """Escrituras en cola (aproximado)"""
+        return self._cola.qsize()
+    
+    def _ejecutar(self) :
+        """Loop del hilo : un error en una tarea no detiene a las siguientes"""
+        while True :
+            tarea, args = self._cola.get()
+            try :
+                tarea(*args)
+            except Exception as e :
+                print(f"Error al escribir en segundo plano : {e}")
+
+
+_escritor : Optional[EscritorPersistencia] = None
+
+
+def obtener_escritor() -> EscritorPersistencia :
+    """Escritor compartido por todo el proceso (se crea al primer uso y se vacia al salir)"""
+    global _escritor
+    if _escritor is None :
+        _escritor = EscritorPersistencia()
+        atexit.register(_escritor.vaciar)
+    return _escritor
\ No newline at end of file
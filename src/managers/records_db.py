@@ -0,0 +1,256 @@
+# Almacenamiento de records en SQLite
+# Cada record se agrega al journal (WAL) con fsync; la compactacion al archivo principal corre en otro hilo
+
+import csv
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+from src.utils.config import Paths, RecordsConfig, TowerConfig
+
+# Columnas de cada tabla (el orden es el de los CSV anteriores)
+COLUMNAS = {
+    "records_1vs1" : (
+        "nombre", "puntaje", "rounds_ganados", "rounds_perdidos", "golpes_totales",
+        "dano_causado", "dano_recibido", "tiempo_segundos", "fecha", "semilla",
+        "personaje", "rival", "mapa", "dificultad",
+    ),
+    "records_torre" : (
+        "nombre", "puntaje", "peleas_ganadas", "golpes_totales",
+        "dano_causado", "dano_recibido", "tiempo_segundos", "fecha", "semilla",
+        "personaje", "mapa", "dificultad",
+    ),
+}
+COLUMNAS_TEXTO = ("nombre", "fecha", "personaje", "rival", "mapa", "dificultad")
+
+# Columnas por las que se puede filtrar el ranking (cada una con indice (columna, puntaje))
+COLUMNAS_FILTRO = ("personaje", "rival", "mapa", "dificultad")
+
+# Records que compiten en el ranking : en 1vs1 solo las victorias (las derrotas quedan archivadas sin mostrarse)
+CONDICION_RANKING = {"records_1vs1" : "rounds_ganados > rounds_perdidos"}
+
+# 1 : tablas iniciales; 2 : personajes, mapa y dificultad; 3 : dificultad efectiva de la torre
+VERSION_ESQUEMA = 3
+FORMATO_FECHA = "%Y-%m-%d %H :%M :%S"
+
+
+def convertir_fila(tabla : str, fila : Dict) -> tuple :
+    """Record (CSV o JSON) a valores de la tabla (columnas faltantes en None; ValueError si un numero no lo es)"""
+    valores = []
+    for columna in COLUMNAS[tabla] :
+        valor = fila.get(columna)
+        if columna not in COLUMNAS_TEXTO :
+            valor = int(valor) if valor not in (None, "") else None
+        elif valor is not None :
+            valor = str(valor)
+        valores.append(valor)
+    return tuple(valores)
+
+
+def en_ranking(tabla : str, record : Dict) -> bool :
+    """Indica si un record compite en el ranking de su tabla (la misma condicion que CONDICION_RANKING)"""
+    return tabla != "records_1vs1" or record["rounds_ganados"] > record["rounds_perdidos"]
+
+
+class RecordsDB :
+    """Base de datos de records : una tabla por modo, indexada por puntaje y fecha"""
+    
+    def __init__(self, ruta : str = Paths.RECORDS_DB) :
+        """Abre (o crea) la base y migra los CSV la primera vez"""
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        self.ruta = ruta
+        self.conexion = self._conectar()
+        self.locales = threading.local()
+        self.locales.conexion = self.conexion
+        
+        # WAL : cada guardado agrega una entrada al journal en vez de reescribir la base
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        
+        version = self.conexion.execute("PRAGMA user_version").fetchone()[0]
+        if version < VERSION_ESQUEMA :
+            self._crear_esquema(version)
+        
+        self.pendientes_compactar = 0
+        self.hilo_compactacion = None
+        self.compactar()
+    
+    def _conectar(self) -> sqlite3.Connection :
+        """Conexion nueva (sqlite3 no comparte conexiones entre hilos)"""
+        conexion = sqlite3.connect(self.ruta, timeout=5)
+        conexion.row_factory = sqlite3.Row
+        
+        # FULL hace fsync del journal en cada commit : un corte de luz no pierde el record ya guardado.
+        # Sin checkpoint automatico : compactar el journal es trabajo de un hilo de fondo, no del juego.
+        conexion.execute("PRAGMA synchronous=FULL")
+        conexion.execute("PRAGMA wal_autocheckpoint=0")
+        return conexion
+    
+    def _conexion_hilo(self) -> sqlite3.Connection :
+        """Conexion del hilo actual (el escritor en segundo plano abre la suya)"""
+        conexion = getattr(self.locales, "conexion", None)
+        if conexion is None :
+            conexion = self.locales.conexion = self._conectar()
+        return conexion
+    
+    def _crear_esquema(self, version : int) :
+        """Crea o actualiza las tablas e indices; la primera vez migra los records de los CSV"""
+        migrados = 0
+        with self.conexion :
+            for tabla, columnas in COLUMNAS.items() :
+                definicion = ", ".join(f"{c} {self._tipo(c)}" for c in columnas)
+                self.conexion.execute(f"CREATE TABLE IF NOT EXISTS {tabla} (id INTEGER PRIMARY KEY, {definicion})")
+                
+                # Bases de una version anterior : agregar las columnas nuevas (los records viejos quedan en NULL)
+                existentes = {fila["name"] for fila in self.conexion.execute(f"PRAGMA table_info({tabla})")}
+                for columna in columnas :
+                    if columna not in existentes :
+                        self.conexion.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {self._tipo(columna)}")
+                
+                self.conexion.execute(f"CREATE INDEX IF NOT EXISTS {tabla}_puntaje ON {tabla} (puntaje DESC, id)")
+                self.conexion.execute(f"CREATE INDEX IF NOT EXISTS {tabla}_fecha ON {tabla} (fecha)")
+                for columna in COLUMNAS_FILTRO :
+                    if columna in columnas :
+                        self.conexion.execute(f"CREATE INDEX IF NOT EXISTS {tabla}_{columna} ON {tabla} ({columna}, puntaje DESC, id)")
+            
+            # La torre guardaba la dificultad del menu, pero solo experto cambia la IA
+            if 0 < version < 3 :
+                self.conexion.execute("UPDATE records_torre SET dificultad = ? WHERE dificultad IN ('facil', 'normal', 'dificil')",
+                                      (TowerConfig.DIFICULTAD_ESCALONADA,))
+            
+            if version == 0 :
+                migrados = self._migrar_csv("records_1vs1", Paths.RECORDS_1VS1.replace(".json", ".csv"))
+                migrados += self._migrar_csv("records_torre", Paths.RECORDS_TORRE.replace(".json", ".csv"))
+            self.conexion.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        
+        if migrados :
+            print(f"✅ {migrados} records migrados de CSV a {self.ruta}")
+    
+    def _tipo(self, columna : str) -> str :
+        """Tipo SQL de una columna"""
+        return "TEXT" if columna in COLUMNAS_TEXTO else "INTEGER"
+    
+    def _migrar_csv(self, tabla : str, ruta : str) -> int :
+        """Importa un CSV con el formato anterior (los archivos quedan como estaban)"""
+        # En sistemas que distinguen mayusculas la carpeta del repositorio es Data/
+        candidatas = [ruta, ruta.replace(Paths.DATA, "Data/", 1)]
+        ruta = next((r for r in candidatas if os.path.exists(r)), None)
+        if ruta is None :
+            return 0
+        
+        try :
+            with open(ruta, "r", encoding="utf-8", newline="") as f :
+                filas = [convertir_fila(tabla, fila) for fila in csv.DictReader(f)]
+        except (OSError, KeyError, ValueError) as e :
+            print(f"Error al migrar {ruta} : {e}")
+            return 0
+        
+        self.conexion.executemany(self._sql_insertar(tabla), filas)
+        return len(filas)
+    
+    def _sql_insertar(self, tabla : str) -> str :
+        """INSERT con todas las columnas de la tabla"""
+        columnas = COLUMNAS[tabla]
+        return f"INSERT INTO {tabla} ({", ".join(columnas)}) VALUES ({", ".join("?" * len(columnas))})"
+    
+    def insertar(self, tabla : str, record : Dict) :
+        """Guarda un record (una fila, una transaccion : una entrada del journal con fsync)"""
+        conexion = self._conexion_hilo()
+        with conexion :
+            conexion.execute(self._sql_insertar(tabla), tuple(record.get(c) for c in COLUMNAS[tabla]))
+        
+        self.pendientes_compactar += 1
+        if self.pendientes_compactar >= RecordsConfig.COMPACTAR_CADA :
+            self.compactar()
+    
+    def compactar(self) :
+        """Lanza la compactacion del journal en segundo plano (si ya hay una en curso no hace nada)"""
+        if self.hilo_compactacion is not None and self.hilo_compactacion.is_alive() :
+            return
+        self.pendientes_compactar = 0
+        self.hilo_compactacion = threading.Thread(target=self._compactar, name="records-compactacion", daemon=True)
+        self.hilo_compactacion.start()
+    
+    def _compactar(self) :
+        """Copia el journal a la base y lo vacia (checkpoint : atomico ante cortes, con su propia conexion)"""
+        try :
+            conexion = sqlite3.connect(self.ruta, timeout=5)
+            try :
+                conexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally :
+                conexion.close()
+        except sqlite3.Error as e :
+            print(f"Error al compactar {self.ruta} : {e}")
+    
+    def insertar_nuevos(self, tabla : str, filas : List[tuple]) -> int :
+        """Inserta un lote en una transaccion omitiendo los que ya estan (iguales en todas las columnas).
+        La busqueda del duplicado usa el indice por puntaje. Retorna cuantos se insertaron"""
+        columnas = COLUMNAS[tabla]
+        igualdad = " AND ".join(f"{c} IS ?" for c in columnas)
+        sql = (f"INSERT INTO {tabla} ({", ".join(columnas)}) SELECT {", ".join("?" * len(columnas))} "
+               f"WHERE NOT EXISTS (SELECT 1 FROM {tabla} WHERE {igualdad})")
+        conexion = self._conexion_hilo()
+        with conexion :
+            cursor = conexion.executemany(sql, (fila + fila for fila in filas))
+        
+        self.pendientes_compactar += cursor.rowcount
+        if self.pendientes_compactar >= RecordsConfig.COMPACTAR_CADA :
+            self.compactar()
+        return cursor.rowcount
+    
+    def top(self, tabla : str, cantidad : int) -> List[Dict] :
+        """Mejores records por puntaje (en empate, el mas antiguo primero)"""
+        donde, parametros = self._filtro(tabla, {}, None)
+        cursor = self.conexion.execute(
+            f"SELECT {", ".join(COLUMNAS[tabla])} FROM {tabla}{donde} ORDER BY puntaje DESC, id LIMIT ?", (*parametros, cantidad)
+        )
+        return [dict(fila) for fila in cursor]
+    
+    def _filtro(self, tabla : str, filtros : Dict[str, str], desde : Optional[str]) -> Tuple[str, list] :
+        """Clausula WHERE del ranking : condicion de la tabla, igualdad en columnas filtrables y fecha minima"""
+        condiciones, parametros = [], []
+        if tabla in CONDICION_RANKING :
+            condiciones.append(CONDICION_RANKING[tabla])
+        for columna, valor in filtros.items() :
+            if columna not in COLUMNAS_FILTRO or columna not in COLUMNAS[tabla] :
+                raise ValueError(f"No se puede filtrar {tabla} por {columna}")
+            condiciones.append(f"{columna} = ?")
+            parametros.append(valor)
+        if desde is not None :
+            condiciones.append("fecha >= ?")
+            parametros.append(desde)
+        return (" WHERE " + " AND ".join(condiciones)) if condiciones else "", parametros
+    
+    def consultar(self, tabla : str, filtros : Dict[str, str], desde : Optional[str] = None, cantidad : int = 8, desplazamiento : int = 0) -> List[Dict] :
+        """Pagina del ranking filtrado (usa el indice (columna, puntaje) del filtro)"""
+        donde, parametros = self._filtro(tabla, filtros, desde)
+        cursor = self.conexion.execute(
+            f"SELECT {", ".join(COLUMNAS[tabla])} FROM {tabla}{donde} ORDER BY puntaje DESC, id LIMIT ? OFFSET ?",
+            (*parametros, cantidad, desplazamiento)
+        )
+        return [dict(fila) for fila in cursor]
+    
+    def contar_filtrados(self, tabla : str, filtros : Dict[str, str], desde : Optional[str] = None) -> int :
+        """Cantidad de records del ranking que cumplen los filtros"""
+        donde, parametros = self._filtro(tabla, filtros, desde)
+        return self.conexion.execute(f"SELECT COUNT(*) FROM {tabla}{donde}", parametros).fetchone()[0]
+    
+    def firma(self) -> Tuple :
+        """(mtime, tamaño) de la base y su WAL : cambia con cada escritura, de este u otro proceso"""
+        firma = []
+        for ruta in (self.ruta, self.ruta + "-wal") :
+            try :
+                estado = os.stat(ruta)
+                firma.append((estado.st_mtime_ns, estado.st_size))
+            except OSError :
+                firma.append(None)
+        return tuple(firma)
+    
+    def contar(self, tabla : str) -> int :
+        """Cantidad de records de la tabla"""
+        return self.conexion.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+    
+    def cerrar(self) :
+        """Espera la compactacion en curso y cierra la conexion"""
+        if self.hilo_compactacion is not None :
+            self.hilo_compactacion.join()
+        self.conexion.close()
\ No newline at end of file
@@ -0,0 +1,147 @@
+# Importador de records heredados
+# Lee los CSV / JSON / TXT de las versiones anteriores (y de otras maquinas) record por record y los agrega a la base
+
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional
+from src.managers.records_db import RecordsDB, convertir_fila
+from src.utils.config import Paths
+
+# Records por transaccion
+TAMANO_LOTE = 1000
+# Bytes leidos por vez del JSON (la memoria no depende del tamaño del archivo)
+TAMANO_BLOQUE = 64 * 1024
+SEPARADORES = re.compile(r"[\s,\[\]]*")
+
+
+def leer_json(ruta : str) -> Iterator[Dict] :
+    """Recorre los objetos de una lista JSON (o JSON por lineas) sin cargar el archivo entero"""
+    decodificador = json.JSONDecoder()
+    with open(ruta, "r", encoding="utf-8") as f :
+        buffer = ""
+        posicion = 0
+        fin = False
+        while True :
+            # Saltar lo que separa un objeto del siguiente
+            posicion = SEPARADORES.match(buffer, posicion).end()
+            if posicion == len(buffer) :
+                if fin :
+                    return
+                buffer = f.read(TAMANO_BLOQUE)
+                posicion = 0
+                fin = not buffer
+                continue
+            
+            try :
+                objeto, posicion = decodificador.raw_decode(buffer, posicion)
+            except json.JSONDecodeError :
+                # Objeto incompleto : conservar el resto y leer mas (al final del archivo es un error real)
+                bloque = f.read(TAMANO_BLOQUE)
+                if not bloque :
+                    raise
+                buffer = buffer[posicion :] + bloque
+                posicion = 0
+                continue
+            
+            if isinstance(objeto, dict) :
+                yield objeto
+
+
+def leer_csv(ruta : str) -> Iterator[Dict] :
+    """Recorre las filas de un CSV con encabezado"""
+    with open(ruta, "r", encoding="utf-8", newline="") as f :
+        yield from csv.DictReader(f)
+
+
+def leer_records(ruta : str) -> Iterator[Dict] :
+    """Lector segun el formato (los .txt de versiones anteriores son JSON)"""
+    if ruta.lower().endswith(".csv") :
+        return leer_csv(ruta)
+    return leer_json(ruta)
+
+
+def tabla_de(record : Dict) -> str :
+    """Modo del record : los de torre tienen peleas ganadas"""
+    return "records_torre" if "peleas_ganadas" in record else "records_1vs1"
+
+
+def importar(db : RecordsDB, ruta : str, tamano_lote : int = TAMANO_LOTE) -> Dict[str, int] :
+    """Importa un archivo en lotes; los records ya presentes en la base (o repetidos en el archivo) se omiten"""
+    resultado = {"leidos" : 0, "nuevos" : 0, "invalidos" : 0}
+    lotes : Dict[str, List[tuple]] = {"records_1vs1" : [], "records_torre" : []}
+    
+    for record in leer_records(ruta) :
+        resultado["leidos"] += 1
+        tabla = tabla_de(record)
+        try :
+            lotes[tabla].append(convertir_fila(tabla, record))
+        except (TypeError, ValueError) :
+            resultado["invalidos"] += 1
+            continue
+        
+        if len(lotes[tabla]) >= tamano_lote :
+            resultado["nuevos"] += db.insertar_nuevos(tabla, lotes[tabla])
+            lotes[tabla].clear()
+    
+    for tabla, lote in lotes.items() :
+        if lote :
+            resultado["nuevos"] += db.insertar_nuevos(tabla, lote)
+    
+    resultado["duplicados"] = resultado["leidos"] - resultado["nuevos"] - resultado["invalidos"]
+    return resultado
+
+
+def archivos_por_defecto() -> List[str] :
+    """Records heredados de data/ y Data/ (sin repetir en sistemas que no distinguen mayusculas)"""
+    rutas : Dict[str, str] = {}
+    for carpeta in (Paths.DATA, "Data/") :
+        for extension in ("csv", "json", "txt") :
+            for ruta in sorted(glob.glob(os.path.join(carpeta, f"records*.{extension}"))) :
+                rutas.setdefault(os.path.realpath(ruta).lower(), ruta)
+    return list(rutas.values())
+
+
+def main(argumentos : Optional[List[str]] = None) :
+    """Comando de importacion : python -m src.managers.records_import [archivos]"""
+    parser = argparse.ArgumentParser(description="Importa records de archivos CSV / JSON / TXT a la base de records")
+    parser.add_argument("archivos", nargs="*", help="Archivos a importar (por defecto los records de data/ y Data/)")
+    parser.add_argument("--base", default=Paths.RECORDS_DB)
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Records por transaccion")
+    argumentos = parser.parse_args(argumentos)
+    
+    archivos = argumentos.archivos or archivos_por_defecto()
+    if not archivos :
+        print("No hay archivos de records para importar")
+        return
+    
+    db = RecordsDB(argumentos.base)
+    # Cache de 64 MB : con lotes grandes los indices no entran en la cache por defecto (2 MB)
+    db.conexion.execute("PRAGMA cache_size = -65536")
+    total_leidos = total_nuevos = 0
+    inicio_total = time.perf_counter()
+    for ruta in archivos :
+        inicio = time.perf_counter()
+        try :
+            resultado = importar(db, ruta, argumentos.lote)
+        except (OSError, ValueError) as e :
+            print(f"Error al importar {ruta} : {e}")
+            continue
+        
+        segundos = time.perf_counter() - inicio
+        print(f"{ruta} : {resultado["leidos"]} leidos, {resultado["nuevos"]} nuevos, {resultado["duplicados"]} duplicados, "
+              f"{resultado["invalidos"]} invalidos en {segundos:.2f} s ({resultado["leidos"] / max(segundos, 1e-9):.0f} records/s)")
+        total_leidos += resultado["leidos"]
+        total_nuevos += resultado["nuevos"]
+    
+    segundos = time.perf_counter() - inicio_total
+    print(f"Total : {total_nuevos} records nuevos de {total_leidos} en {segundos:.2f} s ({total_leidos / max(segundos, 1e-9):.0f} records/s)")
+    db.cerrar()
+
+
+if __name__ == "__main__" :
+    main()
\ No newline at end of file
@@ -1,133 +1,31 @@
 # Gestor de records del jueg
-# Maneja el guardado y lectura de records en formato CSV
+# Calcula los puntajes y guarda los records en la base SQLite
 
-import csv
-import os
-from typing import List, Dict
-from datetime import datetime
-from src.utils.config import Paths, RecordsConfig, TowerConfig
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from src.managers.leaderboard import Leaderboard
+from src.managers.persistence_writer import obtener_escritor
+from src.managers.records_db import COLUMNAS, COLUMNAS_FILTRO, FORMATO_FECHA, RecordsDB, en_ranking
+from src.utils.config import RecordsConfig, TowerConfig
 
 
 class RecordsManager :
     """Gestor de records del juego"""
     
     def __init__(self) :
-        """Inicializa el gestor de records"""
-        self.archivo_1vs1 = Paths.RECORDS_1VS1.replace(".json", ".csv")
-        self.archivo_torre = Paths.RECORDS_TORRE.replace(".json", ".csv")
-        self.records_1vs1 : List[Dict] = []
-        self.records_torre : List[Dict] = []
+        """Inicializa el gestor de records (abre la base; solo trae los mejores de cada modo)"""
+        self.db = RecordsDB()
         
-        self._asegurar_carpeta_data()
-        self.cargar_records_1vs1()
-        self.cargar_records_torre()
+        # Top K en memoria, recargado si la base cambia (mtime y tamaño); todos los records quedan en la base
+        self.rankings = {tabla : Leaderboard(RecordsConfig.TOP_RECORDS) for tabla in COLUMNAS}
+        self.firma_rankings : Optional[Tuple] = None
     
-    def _asegurar_carpeta_data(self) :
-        """Crea la carpeta data si no existe"""
-        os.makedirs(Paths.DATA, exist_ok=True)
-    
-    def cargar_records_1vs1(self) :
-        """Carga los records 1vs1 desde el archivo CSV"""
-        if not os.path.exists(self.archivo_1vs1) :
-            self.records_1vs1 = []
-            return
-        
-        try :
-            with open(self.archivo_1vs1, "r", encoding="utf-8", newline="") as f :
-                reader = csv.DictReader(f)
-                self.records_1vs1 = []
-                for row in reader :
-                    # Convertir strings a numeros
-                    record = {
-                        "nombre" : row["nombre"],
-                        "puntaje" : int(row["puntaje"]),
-                        "rounds_ganados" : int(row["rounds_ganados"]),
-                        "rounds_perdidos" : int(row["rounds_perdidos"]),
-                        "golpes_totales" : int(row["golpes_totales"]),
-                        "dano_causado" : int(row["dano_causado"]),
-                        "dano_recibido" : int(row["dano_recibido"]),
-                        "tiempo_segundos" : int(row["tiempo_segundos"]),
-                        "fecha" : row.get("fecha", "N/A")
-                    }
-                    self.records_1vs1.append(record)
-        except Exception as e :
-            print(f"Error al cargar records 1vs1 : {e}")
-            self.records_1vs1 = []
-    
-    def cargar_records_torre(self) :
-        """Carga los records de torre desde el archivo CSV"""
-        if not os.path.exists(self.archivo_torre) :
-            self.records_torre = []
-            return
-        
-        try :
-            with open(self.archivo_torre, "r", encoding="utf-8", newline="") as f :
-                reader = csv.DictReader(f)
-                self.records_torre = []
-                for row in reader :
-                    # Convertir strings a numeros
-                    record = {
-                        "nombre" : row["nombre"],
-                        "puntaje" : int(row["puntaje"]),
-                        "peleas_ganadas" : int(row["peleas_ganadas"]),
-                        "golpes_totales" : int(row["golpes_totales"]),
-                        "dano_causado" : int(row["dano_causado"]),
-                        "dano_recibido" : int(row["dano_recibido"]),
-                        "tiempo_segundos" : int(row["tiempo_segundos"]),
-                        "fecha" : row.get("fecha", "N/A")
-                    }
-                    self.records_torre.append(record)
-        except Exception as e :
-            print(f"Error al cargar records torre : {e}")
-            self.records_torre = []
-    
-    def guardar_records_1vs1(self) :
-        """Guarda los records 1vs1 en archivo CSV"""
-        try :
-            with open(self.archivo_1vs1, "w", encoding="utf-8", newline="") as f :
-                # Definir columnas del CSV
-                fieldnames = [
-                    "nombre", "puntaje", "rounds_ganados", "rounds_perdidos",
-                    "golpes_totales", "dano_causado", "dano_recibido",
-                    "tiempo_segundos", "fecha"
-                ]
-                
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()  # Escribir encabezados
-                
-                for record in self.records_1vs1 :
-                    writer.writerow(record)
-            
-            print(f"✅ Records 1vs1 guardados en CSV : {self.archivo_1vs1}")
-        except Exception as e :
-            print(f"❌ Error al guardar records 1vs1 : {e}")
-    
-    def guardar_records_torre(self) :
-        """Guarda los records de torre en archivo CSV"""
-        try :
-            with open(self.archivo_torre, "w", encoding="utf-8", newline="") as f :
-                # Definir columnas del CSV
-                fieldnames = [
-                    "nombre", "puntaje", "peleas_ganadas", "golpes_totales",
-                    "dano_causado", "dano_recibido", "tiempo_segundos", "fecha"
-                ]
-                
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()  # Escribir encabezados
-                
-                for record in self.records_torre :
-                    writer.writerow(record)
-            
-            print(f"✅ Records torre guardados en CSV : {self.archivo_torre}")
-        except Exception as e :
-            print(f"❌ Error al guardar records torre : {e}")
-    
-    def agregar_record(self, nombre : str, stats_j1 : Dict, stats_j2 : Dict, rounds_j1 : int, rounds_j2 : int, tiempo_total : int) :
-        """Agrega un nuevo record 1vs1"""
+    def agregar_record(self, nombre : str, stats_j1 : Dict, stats_j2 : Dict, rounds_j1 : int, rounds_j2 : int, tiempo_total : int, semilla : Optional[int] = None, contexto : Optional[Dict[str, str]] = None) :
+        """Agrega un nuevo record 1vs1 (la semilla permite reproducir la pelea contra la IA)"""
         puntaje = self._calcular_puntaje_1vs1(stats_j1, rounds_j1, tiempo_total)
         
         # Obtener fecha actual
-        fecha_actual = datetime.now().strftime("%Y-%m-%d %H :%M :%S")
+        fecha_actual = datetime.now().strftime(FORMATO_FECHA)
         
         record = {
             "nombre" : nombre.upper()[ :3],
@@ -138,19 +36,19 @@ class RecordsManager :
             "dano_causado" : int(stats_j1["dano_causado"]),
             "dano_recibido" : int(stats_j1["dano_recibido"]),
             "tiempo_segundos" : tiempo_total,
-            "fecha" : fecha_actual
+            "fecha" : fecha_actual,
+            "semilla" : semilla
         }
+        self._agregar_contexto("records_1vs1", record, contexto)
         
-        self.records_1vs1.append(record)
-        self._ordenar_records_1vs1()
-        self.guardar_records_1vs1()
+        self._insertar("records_1vs1", record)
     
-    def agregar_record_torre(self, nombre : str, peleas_ganadas : int, stats_totales : Dict) :
-        """Agrega un nuevo record de torre"""
+    def agregar_record_torre(self, nombre : str, peleas_ganadas : int, stats_totales : Dict, semilla : Optional[int] = None, contexto : Optional[Dict[str, str]] = None) :
+        """Agrega un nuevo record de torre (semilla de la torre : cada pelea deriva la suya)"""
         puntaje = self._calcular_puntaje_torre(peleas_ganadas, stats_totales)
         
         # Obtener fecha actual
-        fecha_actual = datetime.now().strftime("%Y-%m-%d %H :%M :%S")
+        fecha_actual = datetime.now().strftime(FORMATO_FECHA)
         
         record = {
             "nombre" : nombre.upper()[ :3],
@@ -160,12 +58,19 @@ class RecordsManager :
             "dano_causado" : int(stats_totales["dano_causado"]),
             "dano_recibido" : int(stats_totales["dano_recibido"]),
             "tiempo_segundos" : stats_totales["tiempo_total"],
-            "fecha" : fecha_actual
+            "fecha" : fecha_actual,
+            "semilla" : semilla
         }
+        self._agregar_contexto("records_torre", record, contexto)
         
-        self.records_torre.append(record)
-        self._ordenar_records_torre()
-        self.guardar_records_torre()
+        self._insertar("records_torre", record)
+    
+    def _agregar_contexto(self, tabla : str, record : Dict, contexto : Optional[Dict[str, str]]) :
+        """Copia al record los personajes, mapa y dificultad de la partida (los que tenga la tabla)"""
+        contexto = contexto or {}
+        for columna in COLUMNAS_FILTRO :
+            if columna in COLUMNAS[tabla] :
+                record[columna] = contexto.get(columna)
     
     def _calcular_puntaje_1vs1(self, stats : Dict, rounds_ganados : int, tiempo : int) -> int :
         """Calcula el puntaje para modo 1vs1"""
@@ -206,18 +111,76 @@ class RecordsManager :
         
         return puntaje
     
-    def _ordenar_records_1vs1(self) :
-        """Ordena los records 1vs1 por puntaje"""
-        self.records_1vs1.sort(key=lambda x : x["puntaje"], reverse=True)
+    def _sincronizar(self) :
+        """Recarga los rankings si otro proceso escribio en la base"""
+        firma = self.db.firma()
+        if firma != self.firma_rankings :
+            for tabla, ranking in self.rankings.items() :
+                ranking.cargar(self.db.top(tabla, ranking.capacidad))
+            self.firma_rankings = firma
+    
+    def _insertar(self, tabla : str, record : Dict) :
+        """Ubica el record en el ranking (costo acotado por K) y encola su escritura en la base"""
+        self._sincronizar()
+        if en_ranking(tabla, record) :
+            self.rankings[tabla].insertar(record)
+        obtener_escritor().encolar(self._guardar, tabla, record)
+    
+    def _guardar(self, tabla : str, record : Dict) :
+        """Escribe el record (corre en el hilo del escritor)"""
+        self.db.insertar(tabla, record)
+        print(f"✅ Record {tabla.removeprefix("records_")} guardado : {record["nombre"]} {record["puntaje"]}")
     
-    def _ordenar_records_torre(self) :
-        """Ordena los records de torre por puntaje"""
-        self.records_torre.sort(key=lambda x : x["puntaje"], reverse=True)
+    def _top(self, tabla : str, cantidad : int) -> List[Dict] :
+        """Ranking desde memoria; mas alla de K se consulta la base"""
+        self._sincronizar()
+        ranking = self.rankings[tabla]
+        if cantidad <= ranking.capacidad :
+            return ranking.top(cantidad)
+        return self.db.top(tabla, cantidad)
+    
+    def califica_1vs1(self, stats_j1 : Dict, rounds_j1 : int, tiempo_total : int) -> bool :
+        """Indica si el resultado entra al top 1vs1 (antes de pedir el nombre)"""
+        self._sincronizar()
+        return self.rankings["records_1vs1"].califica(self._calcular_puntaje_1vs1(stats_j1, rounds_j1, tiempo_total))
+    
+    def califica_torre(self, peleas_ganadas : int, stats_totales : Dict) -> bool :
+        """Indica si el resultado entra al top de torre (antes de pedir el nombre)"""
+        self._sincronizar()
+        return self.rankings["records_torre"].califica(max(0, self._calcular_puntaje_torre(peleas_ganadas, stats_totales)))
+    
+    def consultar_records(self, modo : str, pagina : int = 0, por_pagina : int = 8, dias : Optional[int] = None, **filtros : str) -> Tuple[List[Dict], int] :
+        """Pagina del ranking de un modo ("1vs1" o "torre") filtrado por personaje, rival, mapa, dificultad y ultimos dias.
+        Retorna (records de la pagina, total que cumple los filtros)"""
+        tabla = f"records_{modo}"
+        filtros = {columna : valor for columna, valor in filtros.items() if valor is not None}
+        desde = (datetime.now() - timedelta(days=dias)).strftime(FORMATO_FECHA) if dias is not None else None
+        
+        # Sin filtros la primera pagina sale del ranking en memoria
+        if not filtros and desde is None :
+            self._sincronizar()
+            ranking = self.rankings[tabla]
+            if (pagina + 1) * por_pagina <= ranking.capacidad :
+                return ranking.top(ranking.capacidad)[pagina * por_pagina :(pagina + 1) * por_pagina], self.db.contar_filtrados(tabla, {})
+        
+        records = self.db.consultar(tabla, filtros, desde, por_pagina, pagina * por_pagina)
+        return records, self.db.contar_filtrados(tabla, filtros, desde)
     
     def obtener_top_records_1vs1(self, cantidad : int = 10) -> List[Dict] :
         """Obtiene los mejores records 1vs1"""
-        return self.records_1vs1[ :cantidad]
+        return self._top("records_1vs1", cantidad)
     
     def obtener_top_records_torre(self, cantidad : int = 10) -> List[Dict] :
         """Obtiene los mejores records de torre"""
-        return self.records_torre[ :cantidad]
\ No newline at end of file
+        return self._top("records_torre", cantidad)
+
+
+_records_manager : Optional[RecordsManager] = None
+
+
+def obtener_records_manager() -> RecordsManager :
+    """Gestor de records compartido por todo el proceso (se crea al primer uso)"""
+    global _records_manager
+    if _records_manager is None :
+        _records_manager = RecordsManager()
+    return _records_manager
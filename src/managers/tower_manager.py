@@ -1,11 +1,15 @@
 # Gestor del modo Torre.
 # Maneja la logica del modo torre (3 peleas consecutivas)
 
+import json
+import os
 import pygame
 import sys
 from typing import List, Dict, Optional
-from src.utils.config import (ANCHO, ALTO, AMARILLO, BLANCO, NEGRO, NARANJA, ROJO, Paths, TowerConfig)
+from src.managers.persistence_writer import obtener_escritor
+from src.utils.config import (ANCHO, ALTO, AMARILLO, BLANCO, NEGRO, NARANJA, ROJO, Paths, RecordsConfig, TowerConfig)
 from src.utils.helpers import cargar_fuente
+from src.utils.rng import derivar_semilla, nueva_semilla
 
 
 class TowerManager :
@@ -31,8 +35,11 @@ class TowerManager :
         
         # Estado de la torre
         self.personaje_jugador : Optional[str] = None
+        self.mapa : Optional[str] = None
+        self.dificultad : Optional[str] = None
         self.oponentes : List[str] = []
         self.pelea_actual = 0
+        self.semilla = nueva_semilla()
         
         # Estadisticas acumuladas
         self.stats_totales = {
@@ -42,10 +49,13 @@ class TowerManager :
             "tiempo_total" : 0
         }
     
-    def iniciar_torre(self, personaje_jugador : str) :
-        """Inicia una nueva torre"""
+    def iniciar_torre(self, personaje_jugador : str, mapa : Optional[str] = None, dificultad : Optional[str] = None) :
+        """Inicia una nueva torre (mapa y dificultad se guardan con el record)"""
         self.personaje_jugador = personaje_jugador
+        self.mapa = mapa
+        self.dificultad = dificultad
         self.pelea_actual = 0
+        self.semilla = nueva_semilla()
         
         # Obtener oponentes (todos excepto el elegido)
         oponentes_disponibles = [
@@ -63,12 +73,62 @@ class TowerManager :
             "tiempo_total" : 0
         }
     
+    def continuar_torre(self) -> bool :
+        """Restaura la torre guardada; retorna False si no hay una valida"""
+        estado = _estado_vigente()
+        if estado is None :
+            return False
+        
+        # Los personajes del guardado tienen que seguir existiendo
+        ids = {p["id"] for p in self.personajes_data}
+        try :
+            oponentes = list(estado["oponentes"])
+            pelea_actual = int(estado["pelea_actual"])
+            if estado["personaje_jugador"] not in ids or not set(oponentes) <= ids or not 0 <= pelea_actual < len(oponentes) :
+                return False
+            
+            self.stats_totales = {clave : estado["stats_totales"][clave] for clave in self.stats_totales}
+            self.semilla = int(estado["semilla"])
+        except (KeyError, TypeError, ValueError) :
+            return False
+        
+        self.personaje_jugador = estado["personaje_jugador"]
+        self.mapa = estado.get("mapa")
+        self.dificultad = estado.get("dificultad")
+        self.oponentes = oponentes
+        self.pelea_actual = pelea_actual
+        return True
+    
+    def guardar_progreso(self) :
+        """Encola el guardado del estado de la torre (despues de cada pelea ganada)"""
+        estado = {
+            "version" : TowerConfig.VERSION_GUARDADO,
+            "personaje_jugador" : self.personaje_jugador,
+            "mapa" : self.mapa,
+            "dificultad" : self.dificultad,
+            "oponentes" : list(self.oponentes),
+            "pelea_actual" : self.pelea_actual,
+            "semilla" : self.semilla,
+            "stats_totales" : dict(self.stats_totales)
+        }
+        _recordar_estado(estado)
+        obtener_escritor().encolar(guardar_estado_torre, Paths.TORRE_GUARDADA, estado)
+    
+    def borrar_progreso(self) :
+        """Encola el borrado del progreso (torre completada o perdida)"""
+        _recordar_estado(None)
+        obtener_escritor().encolar(borrar_estado_torre, Paths.TORRE_GUARDADA)
+    
     def obtener_oponente_actual(self) -> Optional[str] :
         """Obtiene el oponente de la pelea actual"""
         if self.pelea_actual < len(self.oponentes) :
             return self.oponentes[self.pelea_actual]
         return None
     
+    def semilla_pelea(self) -> int :
+        """Semilla de la pelea actual derivada de la de la torre"""
+        return derivar_semilla(self.semilla, "pelea", self.pelea_actual)
+    
     def avanzar_pelea(self) :
         """Avanza a la siguiente pelea"""
         self.pelea_actual += 1
@@ -133,7 +193,7 @@ class TowerManager :
         if es_inicio :
             inst = "ENTER para comenzar | ESC para cancelar"
         else :
-            inst = "ENTER para continuar | ESC para abandonar"
+            inst = "ENTER para continuar | ESC para salir (se guarda)"
         
         instruccion = self.fuente_pequena.render(inst, True, NARANJA)
         self.pantalla.blit(instruccion, (ANCHO // 2 - instruccion.get_width() // 2, ALTO - 30))
@@ -194,85 +254,97 @@ class TowerManager :
     
     def mostrar_pantalla_victoria_torre(self) :
         """Muestra la pantalla de victoria al completar la torre"""
-        from src.managers.records_manager import RecordsManager
+        from src.managers.records_manager import obtener_records_manager
         
+        # Fuera del top no se pide nombre : el resultado se archiva igual (tambien si se cancela el nombre)
+        records_manager = obtener_records_manager()
+        peleas_ganadas = len(self.oponentes)
         nombre_input = ""
-        ingresando_nombre = True
+        ingresando_nombre = records_manager.califica_torre(peleas_ganadas, self.stats_totales)
+        if not ingresando_nombre :
+            self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, peleas_ganadas)
         cursor_visible = True
         ultimo_parpadeo = pygame.time.get_ticks()
         
         while True :
             for evento in pygame.event.get() :
                 if evento.type == pygame.QUIT :
+                    if ingresando_nombre :
+                        self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, peleas_ganadas)
                     pygame.quit()
                     sys.exit()
                 elif evento.type == pygame.KEYDOWN :
                     if ingresando_nombre :
                         if evento.key == pygame.K_RETURN and len(nombre_input) > 0 :
-                            records_manager = RecordsManager()
-                            records_manager.agregar_record_torre(
-                                nombre_input,
-                                len(self.oponentes),
-                                self.stats_totales)
+                            self._guardar_record(records_manager, nombre_input, peleas_ganadas)
                             return
                         elif evento.key == pygame.K_BACKSPACE :
                             nombre_input = nombre_input[ :-1]
                         elif evento.key == pygame.K_ESCAPE :
+                            self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, peleas_ganadas)
                             return
                         elif len(nombre_input) < 3 and evento.unicode.isalpha() :
                             nombre_input += evento.unicode.upper()
+                    elif evento.key in (pygame.K_RETURN, pygame.K_ESCAPE) :
+                        return
             
             ahora = pygame.time.get_ticks()
             if ahora - ultimo_parpadeo > 500 :
                 cursor_visible = not cursor_visible
                 ultimo_parpadeo = ahora
             
-            self._dibujar_pantalla_victoria(nombre_input, cursor_visible)
+            self._dibujar_pantalla_victoria(nombre_input, cursor_visible, ingresando_nombre)
             
             pygame.display.flip()
             self.reloj.tick(30)
     
     def mostrar_pantalla_game_over(self) :
         """Muestra la pantalla de Game Over"""
-        from src.managers.records_manager import RecordsManager
+        from src.managers.records_manager import obtener_records_manager
         
+        # Fuera del top no se pide nombre : el resultado se archiva igual (tambien si se cancela el nombre)
+        records_manager = obtener_records_manager()
+        peleas_ganadas = self.pelea_actual
         nombre_input = ""
-        ingresando_nombre = True
+        ingresando_nombre = records_manager.califica_torre(peleas_ganadas, self.stats_totales)
+        if not ingresando_nombre :
+            self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, peleas_ganadas)
         cursor_visible = True
         ultimo_parpadeo = pygame.time.get_ticks()
         
         while True :
             for evento in pygame.event.get() :
                 if evento.type == pygame.QUIT :
+                    if ingresando_nombre :
+                        self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, peleas_ganadas)
                     pygame.quit()
                     sys.exit()
                 elif evento.type == pygame.KEYDOWN :
                     if ingresando_nombre :
                         if evento.key == pygame.K_RETURN and len(nombre_input) > 0 :
-                            records_manager = RecordsManager()
-                            records_manager.agregar_record_torre(
-                                nombre_input,
-                                self.pelea_actual,
-                                self.stats_totales)
+                            self._guardar_record(records_manager, nombre_input, peleas_ganadas)
                             return
                         elif evento.key == pygame.K_BACKSPACE :
                             nombre_input = nombre_input[ :-1]
                         elif evento.key == pygame.K_ESCAPE :
+                            self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, peleas_ganadas)
                             return
                         elif len(nombre_input) < 3 and evento.unicode.isalpha() :
                             nombre_input += evento.unicode.upper()
+                    elif evento.key in (pygame.K_RETURN, pygame.K_ESCAPE) :
+                        return
             
             ahora = pygame.time.get_ticks()
             if ahora - ultimo_parpadeo > 500 :
                 cursor_visible = not cursor_visible
                 ultimo_parpadeo = ahora
             
-            self._dibujar_pantalla_derrota(nombre_input, cursor_visible)
+            self._dibujar_pantalla_derrota(nombre_input, cursor_visible, ingresando_nombre)
             
             pygame.display.flip()
             self.reloj.tick(30)
     
-    def _dibujar_pantalla_victoria(self, nombre_input : str, cursor_visible : bool) :
+    def _dibujar_pantalla_victoria(self, nombre_input : str, cursor_visible : bool, ingresando_nombre : bool = True) :
         """Dibuja la pantalla de victoria"""
         self.pantalla.fill((10, 10, 30))
         
@@ -283,9 +355,12 @@ class TowerManager :
         self.pantalla.blit(subtitulo, (ANCHO // 2 - subtitulo.get_width() // 2, 80))
         
         self._dibujar_estadisticas(140)
-        self._dibujar_input_nombre(nombre_input, cursor_visible, 270)
+        if ingresando_nombre :
+            self._dibujar_input_nombre(nombre_input, cursor_visible, 270)
+        else :
+            self._dibujar_fuera_del_top(270)
     
-    def _dibujar_pantalla_derrota(self, nombre_input : str, cursor_visible : bool) :
+    def _dibujar_pantalla_derrota(self, nombre_input : str, cursor_visible : bool, ingresando_nombre : bool = True) :
         """Dibuja la pantalla de derrota"""
         self.pantalla.fill((10, 10, 30))
         
@@ -296,7 +371,10 @@ class TowerManager :
         self.pantalla.blit(subtitulo, (ANCHO // 2 - subtitulo.get_width() // 2, 100))
         
         self._dibujar_estadisticas(160)
-        self._dibujar_input_nombre(nombre_input, cursor_visible, 280)
+        if ingresando_nombre :
+            self._dibujar_input_nombre(nombre_input, cursor_visible, 280)
+        else :
+            self._dibujar_fuera_del_top(280)
     
     def _dibujar_estadisticas(self, y_inicial : int) :
         """Dibuja las estadisticas acumuladas"""
@@ -323,12 +401,86 @@ class TowerManager :
         input_render = self.fuente_grande.render(texto_input, True, AMARILLO)
         self.pantalla.blit(input_render, (ANCHO // 2 - input_render.get_width() // 2, y + 40))
         
-        instruccion = self.fuente_pequena.render("ENTER : guardar | ESC : saltar", True, NARANJA)
+        instruccion = self.fuente_pequena.render("ENTER : guardar | ESC : sin nombre", True, NARANJA)
         self.pantalla.blit(instruccion, (ANCHO // 2 - instruccion.get_width() // 2, ALTO - 40))
     
+    def _dibujar_fuera_del_top(self, y : int) :
+        """Dibuja el aviso de resultado fuera del ranking"""
+        aviso = self.fuente_media.render(f"FUERA DEL TOP {RecordsConfig.TOP_RECORDS}", True, BLANCO)
+        self.pantalla.blit(aviso, (ANCHO // 2 - aviso.get_width() // 2, y))
+        
+        instruccion = self.fuente_pequena.render("ENTER : continuar", True, NARANJA)
+        self.pantalla.blit(instruccion, (ANCHO // 2 - instruccion.get_width() // 2, ALTO - 40))
+    
+    def _guardar_record(self, records_manager, nombre : str, peleas_ganadas : int) :
+        """Guarda el resultado de la torre"""
+        records_manager.agregar_record_torre(nombre, peleas_ganadas, self.stats_totales, self.semilla, self._contexto())
+    
+    def _contexto(self) -> Dict[str, Optional[str]] :
+        """Personaje, mapa y dificultad efectiva de la torre (filtros del ranking)"""
+        dificultad = "experto" if self.dificultad == "experto" else TowerConfig.DIFICULTAD_ESCALONADA
+        return {"personaje" : self.personaje_jugador, "mapa" : self.mapa, "dificultad" : dificultad}
+    
     def _obtener_datos_oponente(self, oponente_id : str) -> Optional[Dict] :
         """Obtiene los datos de un oponente por su ID"""
         for personaje in self.personajes_data :
             if personaje["id"] == oponente_id :
                 return personaje
-        return None
\ No newline at end of file
+        return None
+
+
+def guardar_estado_torre(ruta : str, estado : Dict) :
+    """Escribe el progreso de forma atomica (un cierre a mitad de escritura deja el archivo anterior)"""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f :
+        json.dump(estado, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def borrar_estado_torre(ruta : str) :
+    """Elimina el progreso guardado si existe"""
+    try :
+        os.remove(ruta)
+    except FileNotFoundError :
+        pass
+
+
+def cargar_estado_torre(ruta : str) -> Optional[Dict] :
+    """Lee el progreso guardado (None si no hay, esta dañado o es de otra version)"""
+    try :
+        with open(ruta, "r", encoding="utf-8") as f :
+            estado = json.load(f)
+    except (OSError, ValueError) :
+        return None
+    if not isinstance(estado, dict) or estado.get("version") != TowerConfig.VERSION_GUARDADO :
+        return None
+    return estado
+
+
+# Progreso vigente en este proceso : el disco se lee una vez; despues manda lo ultimo encolado
+_estado_leido = False
+_estado : Optional[Dict] = None
+
+
+def _recordar_estado(estado : Optional[Dict]) :
+    """Registra el progreso que se acaba de encolar (None : borrado)"""
+    global _estado_leido, _estado
+    _estado_leido = True
+    _estado = estado
+
+
+def _estado_vigente() -> Optional[Dict] :
+    """Progreso guardado sin esperar al escritor (puede no haberlo escrito todavia)"""
+    global _estado_leido, _estado
+    if not _estado_leido :
+        _estado = cargar_estado_torre(Paths.TORRE_GUARDADA)
+        _estado_leido = True
+    return _estado
+
+
+def hay_torre_guardada() -> bool :
+    """Indica si hay una torre para continuar (no bloquea : se llama al dibujar el menu)"""
+    return _estado_vigente() is not None
\ No newline at end of file
@@ -1,24 +1,30 @@
 # Sistema de Inteligencia Artificial
 # Controla el comportamiento de los oponentes controlados por la CPU
 
-import pygame
 import random
-from typing import Literal
+from typing import Literal, Optional
 from src.entities.player import Player
+from src.systems.ai_scheduler import PLANIFICADOR_IA
+from src.systems.threat_prediction import PredictorAmenazas
+from src.utils.clock import tiempo_juego
 from src.utils.config import ANCHO, ALTO, IAConfig
 
 
-DificultadType = Literal[ "facil", "normal", "dificil"]
+DificultadType = Literal[ "facil", "normal", "dificil", "experto"]
+
+# Frames antes del impacto en los que la IA reacciona a bolas y rayos
+FRAMES_ANTICIPACION = 30
 
 
 class AIController :
     """Controlador de IA para oponentes"""
     
-    def __init__(self, jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "normal") :
-        """Inicializa el controlador de IA"""
+    def __init__(self, jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "normal", semilla : Optional[int] = None) :
+        """Inicializa el controlador de IA (con semilla sus decisiones son reproducibles)"""
         self.jugador_ia = jugador_ia
         self.jugador_oponente = jugador_oponente
         self.dificultad = dificultad
+        self.rng = random.Random(semilla)
         
         # Cargar configuracion segun la dificultad
         self._cargar_configuracion(dificultad)
@@ -36,6 +42,19 @@ class AIController :
         self.tiempo_sin_mover = 0
         self.ultima_verificacion = 0
         self.contador_emergencias = 0
+        
+        # Ticks de decision : entre ticks se repite el ultimo movimiento
+        self.turno = PLANIFICADOR_IA.registrar(self.decisiones_por_segundo)
+        self.movimiento : Optional[str] = None
+        self.deslizar = False
+        
+        # Bolas y rayos que vienen hacia la IA
+        self.amenazas = PredictorAmenazas()
+        self.sentido_esquive = 1
+    
+    def sembrar(self, semilla : int) :
+        """Reinicia el flujo de decisiones (revancha con una semilla nueva)"""
+        self.rng.seed(semilla)
     
     def _cargar_configuracion(self, dificultad : DificultadType) :
         """Carga la configuracion segun la dificultad"""
@@ -43,6 +62,8 @@ class AIController :
             config = IAConfig.FACIL
         elif dificultad == "normal" :
             config = IAConfig.NORMAL
+        elif dificultad == "experto" :
+            config = IAConfig.EXPERTO
         else :  # dificil
             config = IAConfig.DIFICIL
         
@@ -53,19 +74,27 @@ class AIController :
         self.probabilidad_especial = config["prob_especial"]
         self.distancia_ataque = config["distancia_ataque"]
         self.distancia_minima = config["distancia_minima"]
+        self.decisiones_por_segundo = config["decisiones_por_segundo"]
     
     def actualizar(self) :
-        """Logica principal de la IA"""
-        ahora = pygame.time.get_ticks()
-        
+        """Logica principal de la IA (percepcion y decision solo en los ticks del planificador)"""
         # Verificar estados bloqueantes
         if self._esta_bloqueado() :
             return
         
+        ahora = tiempo_juego()
+        
         # Forzar dejar de cubrirse despues de un tiempo
         if self.jugador_ia.cubriendose and ahora - self.ultimo_ataque > 500 :
             self.jugador_ia.dejar_de_cubrirse()
         
+        if not PLANIFICADOR_IA.decidir(self.turno, ahora, self._decidir, ahora) :
+            self._repetir_movimiento()
+    
+    def _decidir(self, ahora : int) :
+        """Tick de decision : percibe la situacion y elige la accion"""
+        self.movimiento = None
+        
         # Sistema anti-bloqueo
         self._verificar_bloqueo(ahora)
         
@@ -86,6 +115,22 @@ class AIController :
         # Evaluar situacion y decidir
         self._evaluar_situacion(distancia_x, distancia_y, ahora)
     
+    def _repetir_movimiento(self) :
+        """Entre ticks aplica el ultimo movimiento decidido (los ataques no se repiten)"""
+        if self.movimiento is None :
+            return
+        
+        distancia_x = abs(self.jugador_ia.x - self.jugador_oponente.x)
+        distancia_y = abs(self.jugador_ia.y - self.jugador_oponente.y)
+        if self.movimiento == "acercarse" :
+            self._acercarse_al_oponente(distancia_x, distancia_y)
+        elif self.movimiento == "alejarse" :
+            self._alejarse_del_oponente()
+        elif self.movimiento == "esquivar" :
+            self._esquivar()
+        else :
+            self._movimiento_lateral(distancia_y, self.deslizar)
+    
     def _esta_bloqueado(self) -> bool :
         """Verifica si la IA esta en un estado bloqueante"""
         return any([
@@ -94,7 +139,8 @@ class AIController :
             self.jugador_ia.usando_kamehameha,
             self.jugador_ia.usando_movimiento_final,
             self.jugador_ia.aturdido,
-            self.jugador_ia.en_ko
+            self.jugador_ia.en_ko,
+            self.jugador_ia.hitstop_restante > 0
         ])
     
     def _verificar_bloqueo(self, ahora : int) :
@@ -133,22 +179,26 @@ class AIController :
             if self.dificultad == "dificil" :
                 self.modo_actual = "AGRESIVO"
             else :
-                self.modo_actual = random.choice(["AGRESIVO", "AGRESIVO", "NEUTRO"])
+                self.modo_actual = self.rng.choice(["AGRESIVO", "AGRESIVO", "NEUTRO"])
         else :
-            self.modo_actual = random.choice(["AGRESIVO", "AGRESIVO", "NEUTRO"])
+            self.modo_actual = self.rng.choice(["AGRESIVO", "AGRESIVO", "NEUTRO"])
     
     def _evaluar_situacion(self, distancia_x : float, distancia_y : float, ahora : int) :
         """Evalua la situacion y toma decisiones"""
+        # Prioridad 0 : Esquivar o bloquear bolas y rayos que llegan
+        if self.amenazas.actualizar(self.jugador_ia, self.jugador_oponente) and self._reaccionar_amenaza(ahora) :
+            return
+        
         # Prioridad 1 : Defender si el oponente esta atacando muy cerca
         if self.jugador_oponente.golpe_animando and distancia_x < 80 :
-            if random.random() < self.probabilidad_defensa :
+            if self.rng.random() < self.probabilidad_defensa :
                 self.jugador_ia.cubrirse()
                 self.ultimo_ataque = ahora
                 return
         
         # Prioridad 2 : Retroceder o atacar si esta muy cerca
         if distancia_x < self.distancia_minima :
-            if random.random() < 0.3 :
+            if self.rng.random() < 0.3 :
                 self._alejarse_del_oponente()
             else :
                 if ahora - self.ultimo_ataque > self.tiempo_entre_ataques :
@@ -181,11 +231,37 @@ class AIController :
             else :
                 self._movimiento_lateral(distancia_y)
         else :  # NEUTRO
-            if random.random() < 0.5 :
+            if self.rng.random() < 0.5 :
                 self._acercarse_al_oponente(distancia_x, distancia_y)
             else :
                 self._movimiento_lateral(distancia_y)
     
+    def _reaccionar_amenaza(self, ahora : int) -> bool :
+        """Sale de la trayectoria si llega a tiempo, si no se cubre justo antes del impacto"""
+        frames, subida, bajada = self.amenazas.proxima
+        if frames > FRAMES_ANTICIPACION or self.rng.random() >= self.probabilidad_defensa :
+            return False
+        
+        # Esquivar hacia el lado mas corto que no saque al personaje de pantalla
+        paso = self.velocidad * 0.8
+        alto = self.jugador_ia.sprite.get_height()
+        opciones = []
+        if subida / paso <= frames and self.jugador_ia.y - subida >= 0 :
+            opciones.append((subida, -1))
+        if bajada / paso <= frames and self.jugador_ia.y + alto + bajada <= ALTO :
+            opciones.append((bajada, 1))
+        if opciones :
+            self.sentido_esquive = min(opciones)[1]
+            self._esquivar()
+            return True
+        
+        # Cubrirse recien cuando el impacto llega antes del proximo tick (la guardia dura 500 ms)
+        if frames <= self.turno.periodo + 1 :
+            self.jugador_ia.cubrirse()
+            self.ultimo_ataque = ahora
+            return True
+        return False
+    
     def _decidir_ataque(self, ahora : int) :
         """Decide que tipo de ataque usar"""
         if self.jugador_ia.stamina_actual < 10 :
@@ -198,27 +274,27 @@ class AIController :
         vida_porcentaje = self.jugador_ia.vida_actual / self.jugador_ia.vida_maxima
         prob_especial = self.probabilidad_especial * (1.5 if vida_porcentaje < 0.3 else 1.0)
         
-        probabilidad = random.random()
+        probabilidad = self.rng.random()
         
         # Ataque especial
         if probabilidad < prob_especial * 0.5 :
-            if self.jugador_ia.tiene_stamina(50) and random.random() < 0.4 :
+            if self.jugador_ia.tiene_stamina(50) and self.rng.random() < 0.4 :
                 self.jugador_ia.iniciar_kamehameha()
                 self.ultimo_ataque = ahora
-                self.tiempo_entre_ataques = random.randint(1500, 2500)
+                self.tiempo_entre_ataques = self.rng.randint(1500, 2500)
             elif self.jugador_ia.tiene_stamina(15) :
                 self.jugador_ia.iniciar_lanzar_bola()
                 self.ultimo_ataque = ahora
-                self.tiempo_entre_ataques = random.randint(800, 1200)
+                self.tiempo_entre_ataques = self.rng.randint(800, 1200)
             else :
                 self._ataque_cuerpo_a_cuerpo(ahora)
         
         # Movimiento final
         elif probabilidad < prob_especial and self.jugador_ia.tiene_stamina(80) :
-            if random.random() < 0.2 :
+            if self.rng.random() < 0.2 :
                 self.jugador_ia.iniciar_movimiento_final()
                 self.ultimo_ataque = ahora
-                self.tiempo_entre_ataques = random.randint(2000, 3000)
+                self.tiempo_entre_ataques = self.rng.randint(2000, 3000)
             else :
                 self._ataque_cuerpo_a_cuerpo(ahora)
         
@@ -228,29 +304,30 @@ class AIController :
     
     def _ataque_cuerpo_a_cuerpo(self, ahora : int) :
         """Ejecuta un ataque cuerpo a cuerpo"""
-        if random.random() < 0.65 :
+        if self.rng.random() < 0.65 :
             self.jugador_ia.iniciar_golpe("golpe_j")
             self.ultimo_ataque = ahora
             
             if self.dificultad == "dificil" :
-                self.tiempo_entre_ataques = random.randint(100, 250)
+                self.tiempo_entre_ataques = self.rng.randint(100, 250)
             elif self.dificultad == "normal" :
-                self.tiempo_entre_ataques = random.randint(200, 400)
+                self.tiempo_entre_ataques = self.rng.randint(200, 400)
             else :
-                self.tiempo_entre_ataques = random.randint(300, 550)
+                self.tiempo_entre_ataques = self.rng.randint(300, 550)
         else :
             self.jugador_ia.iniciar_golpe("patada_k")
             self.ultimo_ataque = ahora
             
             if self.dificultad == "dificil" :
-                self.tiempo_entre_ataques = random.randint(150, 350)
+                self.tiempo_entre_ataques = self.rng.randint(150, 350)
             elif self.dificultad == "normal" :
-                self.tiempo_entre_ataques = random.randint(300, 550)
+                self.tiempo_entre_ataques = self.rng.randint(300, 550)
             else :
-                self.tiempo_entre_ataques = random.randint(400, 750)
+                self.tiempo_entre_ataques = self.rng.randint(400, 750)
     
     def _acercarse_al_oponente(self, distancia_x : float, distancia_y : float) :
         """Se acerca al oponente de forma inteligente"""
+        self.movimiento = "acercarse"
         # Movimiento horizontal
         if self.jugador_ia.x < self.jugador_oponente.x :
             self.jugador_ia.x += self.velocidad
@@ -271,6 +348,7 @@ class AIController :
     
     def _alejarse_del_oponente(self) :
         """Se aleja del oponente"""
+        self.movimiento = "alejarse"
         if self.jugador_ia.x < self.jugador_oponente.x :
             self.jugador_ia.x -= self.velocidad * 1.2
             self.jugador_ia.estado = "izquierda" if self.jugador_ia.mirando_derecha else "derecha"
@@ -281,8 +359,13 @@ class AIController :
         self.jugador_ia.sprite = self.jugador_ia.sprites[self.jugador_ia.estado]
         self._aplicar_limites()
     
-    def _movimiento_lateral(self, distancia_y : float) :
-        """Movimiento lateral para esquivar"""
+    def _movimiento_lateral(self, distancia_y : float, deslizar : Optional[bool] = None) :
+        """Movimiento lateral para esquivar (deslizar se sortea en el tick y se mantiene entre ticks)"""
+        self.movimiento = "lateral"
+        if deslizar is None :
+            deslizar = self.rng.random() < 0.5
+        self.deslizar = deslizar
+        
         if distancia_y > 40 :
             if self.jugador_ia.y < self.jugador_oponente.y :
                 self.jugador_ia.y += self.velocidad * 0.8
@@ -293,7 +376,7 @@ class AIController :
             
             self.jugador_ia.sprite = self.jugador_ia.sprites[self.jugador_ia.estado]
         else :
-            if random.random() < 0.5 :
+            if deslizar :
                 if self.jugador_ia.x < self.jugador_oponente.x :
                     self.jugador_ia.x += self.velocidad * 0.3
                     self.jugador_ia.estado = "derecha" if self.jugador_ia.mirando_derecha else "izquierda"
@@ -307,6 +390,14 @@ class AIController :
         
         self._aplicar_limites()
     
+    def _esquivar(self) :
+        """Movimiento vertical para salir de la trayectoria de una amenaza"""
+        self.movimiento = "esquivar"
+        self.jugador_ia.y += self.velocidad * 0.8 * self.sentido_esquive
+        self.jugador_ia.estado = "subir" if self.sentido_esquive < 0 and "subir" in self.jugador_ia.sprites else "bajar"
+        self.jugador_ia.sprite = self.jugador_ia.sprites[self.jugador_ia.estado]
+        self._aplicar_limites()
+    
     def _accion_emergencia(self, ahora : int) :
         """Accion de emergencia cuando la IA se queda trabada"""
         distancia_x = abs(self.jugador_ia.x - self.jugador_oponente.x)
@@ -326,8 +417,8 @@ class AIController :
         
         # Atacar si tiene stamina
         if self.jugador_ia.tiene_stamina(5) :
-            if random.random() < 0.8 :
-                if random.random() < 0.7 :
+            if self.rng.random() < 0.8 :
+                if self.rng.random() < 0.7 :
                     self.jugador_ia.iniciar_golpe("golpe_j")
                 else :
                     self.jugador_ia.iniciar_golpe("patada_k")
@@ -0,0 +1,98 @@
+# Planificador de ticks de la IA
+# Reparte la percepcion y decision de las IAs : frecuencia por dificultad, desfasaje y presupuesto por frame
+
+import time
+from typing import Callable, Dict, Optional
+from src.utils.config import FPS, IAConfig
+
+
+class TurnoIA :
+    """Turno de decision de una IA registrada en el planificador"""
+    
+    __slots__ = ("periodo", "fase", "proximo", "peor_us")
+    
+    def __init__(self, periodo : int, fase : int) :
+        """Inicializa el turno (el primer tick se fija en la primera consulta)"""
+        self.periodo = periodo
+        self.fase = fase
+        self.proximo : Optional[int] = None
+        self.peor_us = 0.0  # Tick mas caro medido : lo que se reserva del presupuesto
+
+
+class PlanificadorIA :
+    """Decide que IA piensa en cada frame; entre ticks cada IA repite su ultima decision"""
+    
+    def __init__(self, presupuesto_us : int = IAConfig.PRESUPUESTO_US) :
+        """Inicializa el planificador sin IAs"""
+        self.presupuesto_us = presupuesto_us
+        self.registradas = 0
+        self.frame_actual = -1
+        self.gastado_us = 0.0
+        
+        # Metricas
+        self.ticks = 0
+        self.postergados = 0
+        self.costo_total_us = 0.0
+        self.peor_tick_us = 0.0
+    
+    def reiniciar(self) :
+        """Empieza una partida : las fases se asignan otra vez desde el primer turno (reproducible)"""
+        self.registradas = 0
+        self.frame_actual = -1
+        self.gastado_us = 0.0
+    
+    def registrar(self, decisiones_por_segundo : float) -> TurnoIA :
+        """Crea el turno de una IA; las IAs sucesivas de la partida quedan desfasadas un frame"""
+        periodo = max(1, round(FPS / decisiones_por_segundo))
+        turno = TurnoIA(periodo, self.registradas % periodo)
+        self.registradas += 1
+        return turno
+    
+    def decidir(self, turno : TurnoIA, ahora : int, decision : Callable, *argumentos) -> bool :
+        """Ejecuta la decision si al turno le toca y queda presupuesto en el frame; retorna si se ejecuto"""
+        frame = ahora * FPS // 1000
+        
+        # Primer tick con la fase del turno, o el tiempo volvio atras (reinicio o restore)
+        if turno.proximo is None or frame < turno.proximo - turno.periodo :
+            turno.proximo = frame + turno.fase
+        if frame < turno.proximo :
+            return False
+        
+        if frame != self.frame_actual :
+            self.frame_actual = frame
+            self.gastado_us = 0.0
+        
+        # Si su peor tick no entra en lo que queda del frame pasa al siguiente. Uno atrasado un periodo entero
+        # entra solo en un frame sin gasto : el frame nunca supera max(presupuesto, un tick)
+        atrasado = frame >= turno.proximo + turno.periodo
+        if self.gastado_us + turno.peor_us > self.presupuesto_us and not (atrasado and self.gastado_us == 0) :
+            self.postergados += 1
+            return False
+        
+        inicio = time.perf_counter_ns()
+        decision(*argumentos)
+        costo = (time.perf_counter_ns() - inicio) / 1000
+        
+        self.gastado_us += costo
+        self.ticks += 1
+        self.costo_total_us += costo
+        self.peor_tick_us = max(self.peor_tick_us, costo)
+        turno.peor_us = max(turno.peor_us, costo)
+        
+        # Mantener la fase salvo que el tick se haya atrasado mas de un periodo
+        turno.proximo += turno.periodo
+        if turno.proximo <= frame :
+            turno.proximo = frame + turno.periodo
+        return True
+    
+    def metricas(self) -> Dict[str, float] :
+        """Metricas acumuladas de los ticks"""
+        return {
+            "ticks" : self.ticks,
+            "postergados" : self.postergados,
+            "costo_medio_us" : self.costo_total_us / self.ticks if self.ticks else 0.0,
+            "peor_tick_us" : self.peor_tick_us,
+        }
+
+
+PLANIFICADOR_IA = PlanificadorIA()
\ No newline at end of file
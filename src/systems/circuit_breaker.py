@@ -0,0 +1,113 @@
+# Circuit breaker del backend de IA
+# Corta las consultas tras fallos seguidos o latencia alta y prueba de nuevo tras un enfriamiento
+
+from collections import deque
+from typing import Dict, List
+from src.utils.config import GeminiConfig
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+def _percentil(valores : List[float], p : float) -> float :
+    """Percentil por rango mas cercano (0 si no hay muestras)"""
+    if not valores :
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+class CircuitBreaker :
+    """Estados : cerrado (consulta), abierto (IA local) y semiabierto (una consulta de prueba)"""
+    
+    def __init__(self, fallos_maximos : int = GeminiConfig.FALLOS_MAXIMOS, presupuesto_latencia : float = GeminiConfig.PRESUPUESTO_LATENCIA, enfriamiento : int = GeminiConfig.ENFRIAMIENTO) :
+        """Inicializa el circuito cerrado"""
+        self.fallos_maximos = fallos_maximos
+        self.presupuesto_latencia = presupuesto_latencia
+        self.enfriamiento = enfriamiento
+        
+        self.estado = CERRADO
+        self.fallos_seguidos = 0
+        self.abierto_desde = 0
+        self.sonda_en_curso = False
+        
+        # Metricas
+        self.llamadas = 0
+        self.fallos = 0
+        self.aperturas = 0
+        self.latencias = deque(maxlen=GeminiConfig.VENTANA_LATENCIAS)
+        self.tiempo_fallback = 0
+    
+    def permite(self, ahora : int) -> bool :
+        """Indica si se puede hacer una consulta (y la cuenta si se permite)"""
+        if self.estado == ABIERTO :
+            if ahora - self.abierto_desde < self.enfriamiento :
+                return False
+            self.tiempo_fallback += ahora - self.abierto_desde
+            self.estado = SEMIABIERTO
+            self.sonda_en_curso = False
+        
+        if self.estado == SEMIABIERTO :
+            # Una sola consulta de prueba hasta saber su resultado
+            if self.sonda_en_curso :
+                return False
+            self.sonda_en_curso = True
+        
+        self.llamadas += 1
+        return True
+    
+    def registrar_exito(self, latencia_ms : float, ahora : int) :
+        """Registra una respuesta valida"""
+        self.latencias.append(latencia_ms)
+        self.fallos_seguidos = 0
+        
+        # Respuestas que llegan siempre tarde equivalen a fallos
+        if len(self.latencias) >= GeminiConfig.MIN_MUESTRAS_LATENCIA and self.p95 > self.presupuesto_latencia :
+            self._abrir(ahora, f"p95 {self.p95:.0f} ms > {self.presupuesto_latencia} ms")
+            self.latencias.clear()
+        elif self.estado == SEMIABIERTO :
+            self.estado = CERRADO
+            print("✅ Gemini respondio : circuito cerrado")
+    
+    def registrar_fallo(self, latencia_ms : float, ahora : int) :
+        """Registra una consulta fallida (error, timeout o respuesta invalida)"""
+        self.latencias.append(latencia_ms)
+        self.fallos += 1
+        self.fallos_seguidos += 1
+        if self.estado == SEMIABIERTO :
+            self._abrir(ahora, "fallo la consulta de prueba")
+        elif self.fallos_seguidos >= self.fallos_maximos :
+            self._abrir(ahora, f"{self.fallos_seguidos} fallos seguidos")
+    
+    def _abrir(self, ahora : int, motivo : str) :
+        """Pasa a la IA local durante el enfriamiento"""
+        self.estado = ABIERTO
+        self.abierto_desde = ahora
+        self.fallos_seguidos = 0
+        self.aperturas += 1
+        print(f"⚡ Circuito Gemini abierto ({motivo}) : IA local por {self.enfriamiento // 1000} s")
+    
+    @property
+    def p50(self) -> float :
+        """Latencia mediana de la ventana en ms"""
+        return _percentil(list(self.latencias), 0.5)
+    
+    @property
+    def p95(self) -> float :
+        """Latencia p95 de la ventana en ms"""
+        return _percentil(list(self.latencias), 0.95)
+    
+    def metricas(self, ahora : int) -> Dict[str, float] :
+        """Metricas acumuladas (tiempo en fallback incluye la apertura actual)"""
+        tiempo_fallback = self.tiempo_fallback
+        if self.estado == ABIERTO :
+            tiempo_fallback += ahora - self.abierto_desde
+        return {
+            "llamadas" : self.llamadas,
+            "fallos" : self.fallos,
+            "aperturas" : self.aperturas,
+            "p50_ms" : self.p50,
+            "p95_ms" : self.p95,
+            "tiempo_fallback_ms" : tiempo_fallback,
+        }
\ No newline at end of file
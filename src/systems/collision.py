@@ -1,30 +1,21 @@
 # Sistema de deteccion de colisiones.
 # Maneja todas las colisiones entre jugadores, ataques y proyectiles.
 
-from typing import Dict
+from typing import Optional
 from src.entities.player import Player
+from src.utils.events import EventBus, EventoCombate
 
 
 class CollisionSystem :
     """Sistema centralizado de deteccion de colisiones"""
     
-    def __init__(self, jugador1 : Player, jugador2 : Player) :
+    def __init__(self, jugador1 : Player, jugador2 : Player, eventos : Optional[EventBus] = None) :
         """Inicializa el sistema de colisiones"""
         self.jugador1 = jugador1
         self.jugador2 = jugador2
         
-        # Estadisticas de combate
-        self.stats_jugador1 = {
-            "golpes_totales" : 0,
-            "dano_causado" : 0,
-            "dano_recibido" : 0
-        }
-        
-        self.stats_jugador2 = {
-            "golpes_totales" : 0,
-            "dano_causado" : 0,
-            "dano_recibido" : 0
-        }
+        # Los impactos se publican en el bus (estadisticas, audio, HUD)
+        self.eventos = eventos or EventBus()
     
     def detectar_todas(self) :
         """Detecta todas las colisiones del juego"""
@@ -41,8 +32,9 @@ class CollisionSystem :
                 dano_real = self.jugador2.recibir_dano(dano)
                 self.jugador1.hitbox_activa = False
                 self.jugador2.recibir_golpe_combo()
+                self._aplicar_hitstop(self.jugador1, self.jugador2)
                 
-                self._registrar_golpe(1, dano_real)
+                self._registrar_golpe(1, self.jugador2, dano_real, self.jugador1.golpe_tipo)
         
         # Jugador 2 -> Jugador 1
         if self.jugador2.hitbox_activa and self.jugador2.hitbox_ataque :
@@ -51,19 +43,26 @@ class CollisionSystem :
                 dano_real = self.jugador1.recibir_dano(dano)
                 self.jugador2.hitbox_activa = False
                 self.jugador1.recibir_golpe_combo()
+                self._aplicar_hitstop(self.jugador2, self.jugador1)
                 
-                self._registrar_golpe(2, dano_real)
+                self._registrar_golpe(2, self.jugador1, dano_real, self.jugador2.golpe_tipo)
+    
+    def _aplicar_hitstop(self, atacante : Player, defensor : Player) :
+        """Congela a ambos jugadores segun la frame data del ataque"""
+        frames = atacante.obtener_hitstop_ataque()
+        atacante.aplicar_hitstop(frames)
+        defensor.aplicar_hitstop(frames)
     
     def _detectar_proyectiles(self) :
         """Detecta colisiones de proyectiles"""
         # Proyectiles J1 -> J2
         for bola in self.jugador1.bolas_activas[ :] :
             if bola.rect.colliderect(self.jugador2.rect) :
-                # Usar el daño del proyectil 
+                # Usar el daño del proyectil
                 dano = bola.obtener_dano()
                 dano_real = self.jugador2.recibir_dano(dano)
                 self.jugador1.bolas_activas.remove(bola)
-                self._registrar_golpe(1, dano_real)
+                self._registrar_golpe(1, self.jugador2, dano_real, bola.ataque)
         
         # Proyectiles J2 -> J1
         for bola in self.jugador2.bolas_activas[ :] :
@@ -71,7 +70,7 @@ class CollisionSystem :
                 dano = bola.obtener_dano()
                 dano_real = self.jugador1.recibir_dano(dano)
                 self.jugador2.bolas_activas.remove(bola)
-                self._registrar_golpe(2, dano_real)
+                self._registrar_golpe(2, self.jugador1, dano_real, bola.ataque)
     
     def _detectar_kamehamehas(self) :
         """Detecta colisiones de Kamehamehas"""
@@ -83,11 +82,10 @@ class CollisionSystem :
                     dano_real = self.jugador2.recibir_dano(self.jugador1.dano_kamehameha)
                     self.jugador1.kamehameha_activo.marcar_impacto()
                     
-                    # Registrar estadisticas solo una vez
-                    if not hasattr(self.jugador1.kamehameha_activo, "_stats_registradas") :
-                        self.stats_jugador1["dano_causado"] += dano_real
-                        self.stats_jugador2["dano_recibido"] += dano_real
-                        self.jugador1.kamehameha_activo._stats_registradas = True
+                    # Registrar el impacto solo una vez
+                    if not self.jugador1.kamehameha_activo.impacto_registrado :
+                        self.jugador1.kamehameha_activo.impacto_registrado = True
+                        self._registrar_golpe(1, self.jugador2, dano_real, "kamehameha")
                     break
         
         # Kamehameha J2 -> J1
@@ -98,40 +96,12 @@ class CollisionSystem :
                     dano_real = self.jugador1.recibir_dano(self.jugador2.dano_kamehameha)
                     self.jugador2.kamehameha_activo.marcar_impacto()
                     
-                    if not hasattr(self.jugador2.kamehameha_activo, "_stats_registradas") :
-                        self.stats_jugador2["dano_causado"] += dano_real
-                        self.stats_jugador1["dano_recibido"] += dano_real
-                        self.jugador2.kamehameha_activo._stats_registradas = True
+                    if not self.jugador2.kamehameha_activo.impacto_registrado :
+                        self.jugador2.kamehameha_activo.impacto_registrado = True
+                        self._registrar_golpe(2, self.jugador1, dano_real, "kamehameha")
                     break
     
-    def _registrar_golpe(self, jugador_num : int, dano_real : float) :
-        """Registra un golpe en las estadisticas"""
-        if jugador_num == 1 :
-            self.stats_jugador1["golpes_totales"] += 1
-            self.stats_jugador1["dano_causado"] += dano_real
-            self.stats_jugador2["dano_recibido"] += dano_real
-        else :
-            self.stats_jugador2["golpes_totales"] += 1
-            self.stats_jugador2["dano_causado"] += dano_real
-            self.stats_jugador1["dano_recibido"] += dano_real
-    
-    def obtener_estadisticas(self) -> Dict :
-        """Obtiene las estadisticas de combate"""
-        return {
-            "jugador1" : self.stats_jugador1.copy(),
-            "jugador2" : self.stats_jugador2.copy()
-        }
-    
-    def reiniciar_estadisticas(self) :
-        """Reinicia las estadisticas de combate"""
-        self.stats_jugador1 = {
-            "golpes_totales" : 0,
-            "dano_causado" : 0,
-            "dano_recibido" : 0
-        }
-        
-        self.stats_jugador2 = {
-            "golpes_totales" : 0,
-            "dano_causado" : 0,
-            "dano_recibido" : 0
-        }
\ No newline at end of file
+    def _registrar_golpe(self, jugador_num : int, defensor : Player, dano_real : float, ataque : str) :
+        """Publica un impacto (golpe o bloqueo) en el bus de eventos"""
+        tipo = EventoCombate.BLOQUEO if defensor.cubriendose else EventoCombate.GOLPE
+        self.eventos.publicar(tipo, jugador_num, dano_real, ataque)
\ No newline at end of file
@@ -0,0 +1,67 @@
+# Cache de decisiones de la IA
+# LRU indexada por un vector de estado cuantizado, con expiracion por TTL
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from src.utils.config import GeminiConfig
+
+ClaveEstado = Tuple[int, ...]
+
+
+class DecisionCache :
+    """Cache LRU de decisiones para estados tacticamente equivalentes"""
+    
+    def __init__(self, dificultad : str = "normal") :
+        """Inicializa la cache con la configuracion de la dificultad"""
+        config = GeminiConfig.CACHE.get(dificultad, GeminiConfig.CACHE["normal"])
+        self.capacidad = config["capacidad"]
+        self.ttl = config["ttl"]
+        self.paso_distancia = config["paso_distancia"]
+        self.paso_porcentaje = config["paso_porcentaje"]
+        
+        # clave -> (instante de guardado, decision)
+        self.entradas : "OrderedDict[ClaveEstado, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        
+        # Metricas
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def clave(self, estado : Dict[str, Any]) -> ClaveEstado :
+        """Cuantiza un estado de juego en una clave de cache"""
+        paso_d = self.paso_distancia
+        paso_p = self.paso_porcentaje
+        return (
+            int(estado["distancia_x"]) // paso_d,
+            int(estado["distancia_y"]) // paso_d,
+            int(estado["mi_vida"] * 100 / estado["mi_vida_max"]) // paso_p,
+            int(estado["mi_energia"] * 100 / estado["mi_energia_max"]) // paso_p,
+            int(estado["oponente_vida"] * 100 / estado["oponente_vida_max"]) // paso_p,
+            int(estado["oponente_atacando"]),
+            int(estado["oponente_cubierto"]),
+        )
+    
+    def obtener(self, clave : ClaveEstado, ahora : int) -> Optional[Dict[str, Any]] :
+        """Retorna la decision guardada si existe y no expiro"""
+        entrada = self.entradas.get(clave)
+        if entrada is None or ahora - entrada[0] > self.ttl :
+            if entrada is not None :
+                del self.entradas[clave]
+            self.fallos += 1
+            return None
+        
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[1]
+    
+    def guardar(self, clave : ClaveEstado, decision : Dict[str, Any], ahora : int) :
+        """Guarda una decision (desaloja la menos usada si esta llena)"""
+        self.entradas[clave] = (ahora, decision)
+        self.entradas.move_to_end(clave)
+        if len(self.entradas) > self.capacidad :
+            self.entradas.popitem(last=False)
+    
+    @property
+    def tasa_aciertos(self) -> float :
+        """Proporcion de consultas resueltas por la cache"""
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
\ No newline at end of file
@@ -0,0 +1,345 @@
+# Simulacion rapida de la pelea
+# Modelo reducido de los luchadores (sin sprites ni eventos) que se clona en el lugar para buscar jugadas
+
+from typing import Optional, Tuple
+from src.entities.frame_data import MoveData
+from src.entities.player import Player
+from src.utils.clock import tiempo_juego
+from src.utils.config import ANCHO, ALTO, FPS, CombatConfig, TimeConfig
+
+MS_POR_FRAME = 1000 / FPS
+MAX_PROYECTILES = 8
+
+# Velocidades de las acciones de movimiento de la IA (plan_interpreter)
+VELOCIDAD_ACERCARSE = 3.5
+VELOCIDAD_ALEJARSE = 4.0
+ALCANCE_GOLPE = 60  # Ancho de la hitbox del golpe basico
+
+
+class LuchadorSimulado :
+    """Estado de un luchador reducido a numeros"""
+    
+    __slots__ = (
+        # Estado que cambia frame a frame
+        "x", "y", "vida", "stamina", "mirando_derecha", "cubierto", "hitstop", "aturdido",
+        "golpe", "golpe_tick", "golpe_segmento", "golpe_activo", "golpe_dano", "golpe_hitstop",
+        "bola_frames", "final_frames", "kame_ms", "kame_distancia", "kame_impacto",
+        # Datos fijos del personaje
+        "ancho", "alto", "frame_data", "dano_bola", "dano_kamehameha",
+        "duracion_bola", "duracion_final", "alto_bola", "puede_kame", "ancho_kame", "alto_kame",
+    )
+    
+    def __init__(self) :
+        """Inicializa un luchador vacio (se llena con cargar)"""
+        for atributo in self.__slots__ :
+            setattr(self, atributo, 0)
+        self.golpe : Optional[MoveData] = None
+        self.frame_data = {}
+    
+    def cargar(self, jugador : Player, ahora : int) :
+        """Copia el estado de un jugador real"""
+        inicio = jugador.sprites["inicio"]
+        self.ancho = inicio.get_width()
+        self.alto = inicio.get_height()
+        self.frame_data = jugador.frame_data
+        self.dano_bola = jugador.dano_bola if jugador.imagen_bola is not None else 0
+        self.dano_kamehameha = jugador.dano_kamehameha
+        self.alto_bola = jugador.imagen_bola.get_height() if jugador.imagen_bola is not None else 0
+        clip_bola = jugador.clips.get("bola_energia_0")
+        self.duracion_bola = clip_bola.duracion_total if clip_bola else 1
+        clip_final = jugador.clips.get("movimiento_final")
+        self.duracion_final = clip_final.duracion_total if clip_final else 0
+        self.puede_kame = "kamehameha" in jugador.sprites and len(jugador.imagenes_kamehameha) > 2
+        if self.puede_kame :
+            punta = jugador.imagenes_kamehameha[2]
+            self.ancho_kame = punta.get_width()
+            self.alto_kame = punta.get_height()
+        
+        self.x = jugador.x
+        self.y = jugador.y
+        self.vida = jugador.vida_actual
+        self.stamina = jugador.stamina_actual
+        self.mirando_derecha = jugador.mirando_derecha
+        self.cubierto = jugador.cubriendose
+        self.hitstop = jugador.hitstop_restante
+        self.aturdido = 0
+        if jugador.aturdido :
+            restante = CombatConfig.DURACION_ATURDIMIENTO - (ahora - jugador.tiempo_inicio_aturdido)
+            self.aturdido = max(1, int(restante / MS_POR_FRAME))
+        
+        self.golpe = None
+        self.golpe_activo = False
+        if jugador.golpe_animando :
+            self.golpe = jugador.frame_data.get(jugador.golpe_tipo)
+            self.golpe_tick = jugador.animador_golpe.tick
+            self.golpe_segmento = jugador.hitbox_segmento
+            self.golpe_activo = jugador.hitbox_activa
+            self.golpe_dano = jugador.obtener_dano_ataque()
+            self.golpe_hitstop = jugador.obtener_hitstop_ataque()
+        
+        self.bola_frames = 0
+        if jugador.lanzando_bola and jugador.animador_bola.clip :
+            self.bola_frames = jugador.animador_bola.clip.duracion_total - jugador.animador_bola.tick
+        
+        self.final_frames = 0
+        if jugador.usando_movimiento_final and jugador.animador_movimiento_final.clip :
+            self.final_frames = jugador.animador_movimiento_final.clip.duracion_total - jugador.animador_movimiento_final.tick
+        
+        self.kame_ms = -1.0
+        self.kame_distancia = 0.0
+        self.kame_impacto = False
+        kame = jugador.kamehameha_activo
+        if jugador.usando_kamehameha and kame :
+            self.kame_ms = max(0, kame.tiempo_transcurrido)
+            self.kame_distancia = kame.distancia_maxima
+            self.kame_impacto = kame.impacto
+    
+    def copiar_de(self, otro : "LuchadorSimulado") :
+        """Copia el estado completo de otro luchador (sin crear objetos)"""
+        for atributo in self.__slots__ :
+            setattr(self, atributo, getattr(otro, atributo))
+    
+    @property
+    def ocupado(self) -> bool :
+        """Indica si no puede iniciar acciones ni moverse"""
+        return bool(self.golpe or self.bola_frames or self.final_frames or self.kame_ms >= 0 or self.aturdido or self.hitstop or self.vida <= 0)
+    
+    def recibir_dano(self, cantidad : float) -> float :
+        """Aplica daño con las mismas reglas que Player.recibir_dano"""
+        if self.aturdido :
+            cantidad *= CombatConfig.MULTIPLICADOR_DANO_ATURDIDO
+        if self.cubierto :
+            cantidad *= CombatConfig.REDUCCION_DANO_CUBIERTO
+        cantidad = min(cantidad, self.vida)
+        self.vida -= cantidad
+        return cantidad
+    
+    def mover(self, mov_x : float, mov_y : float = 0) :
+        """Mueve dentro de los limites de la pantalla"""
+        self.x = min(max(self.x + mov_x, 0), ANCHO - self.ancho)
+        self.y = min(max(self.y + mov_y, 0), ALTO - self.alto)
+    
+    def iniciar(self, accion : str) -> bool :
+        """Inicia un ataque si el jugador real podria hacerlo (False si no)"""
+        if self.ocupado :
+            return False
+        if accion in ("golpe", "patada") :
+            tipo, costo = ("golpe_j", CombatConfig.COSTO_GOLPE) if accion == "golpe" else ("patada_k", CombatConfig.COSTO_PATADA)
+            if self.stamina < costo or tipo not in self.frame_data :
+                return False
+            self.stamina -= costo
+            self.golpe = self.frame_data[tipo]
+            self.golpe_tick = 0
+            self.golpe_segmento = -1
+            self.golpe_dano = CombatConfig.DANO_GOLPE if accion == "golpe" else CombatConfig.DANO_PATADA
+            self.golpe_hitstop = self.golpe.hitstop
+            self._actualizar_hitbox()
+            return True
+        if accion == "bola_energia" :
+            if self.stamina < CombatConfig.COSTO_BOLA or self.cubierto :
+                return False
+            self.stamina -= CombatConfig.COSTO_BOLA
+            self.bola_frames = self.duracion_bola
+            return True
+        if accion == "kamehameha" :
+            if not self.puede_kame or self.stamina < CombatConfig.COSTO_KAMEHAMEHA :
+                return False
+            self.stamina -= CombatConfig.COSTO_KAMEHAMEHA
+            self.kame_ms = 0.0
+            self.kame_distancia = 0.0
+            self.kame_impacto = False
+            return True
+        if accion == "movimiento_final" :
+            if not self.duracion_final or self.stamina < CombatConfig.COSTO_MOVIMIENTO_FINAL :
+                return False
+            self.stamina -= CombatConfig.COSTO_MOVIMIENTO_FINAL
+            self.final_frames = self.duracion_final
+            return True
+        return False
+    
+    def hitbox(self) -> Optional[Tuple[float, float, float, float]] :
+        """Hitbox del ataque en el tick actual (x, y, ancho, alto) o None"""
+        if not self.golpe or not self.golpe_activo :
+            return None
+        entrada = self.golpe.tabla_hitbox[self.golpe_tick]
+        if entrada is None :
+            return None
+        _, ancho, alto, offset_x, offset_y = entrada
+        x = self.x + self.ancho + offset_x if self.mirando_derecha else self.x - ancho - offset_x
+        return x, self.y + self.alto // 2 - alto // 2 + offset_y, ancho, alto
+    
+    def _actualizar_hitbox(self) :
+        """Activa la hitbox al entrar en un segmento nuevo (como Player)"""
+        entrada = self.golpe.tabla_hitbox[self.golpe_tick]
+        if entrada is None :
+            self.golpe_activo = False
+        elif entrada[0] != self.golpe_segmento :
+            self.golpe_segmento = entrada[0]
+            self.golpe_activo = True
+
+
+class SimulacionRapida :
+    """Dos luchadores y un pool fijo de proyectiles que se avanzan sin dibujar"""
+    
+    def __init__(self, velocidad_esquive : float = 4.0, oponente_agresivo : bool = True) :
+        """Reserva los luchadores y el pool de proyectiles"""
+        self.velocidad_esquive = velocidad_esquive
+        self.oponente_agresivo = oponente_agresivo  # El rival golpea apenas queda en rango
+        self.luchadores = (LuchadorSimulado(), LuchadorSimulado())
+        # Proyectil : [activo, x, y, velocidad, dano, alto, dueño]
+        self.proyectiles = [[False, 0.0, 0.0, 0.0, 0.0, 0, 0] for _ in range(MAX_PROYECTILES)]
+        self.dano_hecho = [0.0, 0.0]
+    
+    def cargar(self, jugador_ia : Player, oponente : Player) :
+        """Toma el estado actual de la pelea (el luchador 0 es la IA)"""
+        ahora = tiempo_juego()
+        self.luchadores[0].cargar(jugador_ia, ahora)
+        self.luchadores[1].cargar(oponente, ahora)
+        self.dano_hecho[0] = self.dano_hecho[1] = 0.0
+        
+        for proyectil in self.proyectiles :
+            proyectil[0] = False
+        libres = iter(self.proyectiles)
+        for dueno, jugador in enumerate((jugador_ia, oponente)) :
+            for bola in jugador.bolas_activas :
+                proyectil = next(libres, None)
+                if proyectil is None :
+                    return
+                velocidad = bola.velocidad if bola.direccion else -bola.velocidad
+                proyectil[:] = [True, bola.x, bola.y, velocidad, bola.obtener_dano(), bola.rect.height, dueno]
+    
+    def copiar_de(self, otra : "SimulacionRapida") :
+        """Copia otra simulacion en el lugar"""
+        self.luchadores[0].copiar_de(otra.luchadores[0])
+        self.luchadores[1].copiar_de(otra.luchadores[1])
+        for propio, ajeno in zip(self.proyectiles, otra.proyectiles) :
+            propio[:] = ajeno
+        self.dano_hecho[0], self.dano_hecho[1] = otra.dano_hecho
+    
+    def _lanzar(self, dueno : int, velocidad : float, dano : float, alto : int) :
+        """Ocupa un slot libre del pool con un proyectil nuevo"""
+        luchador = self.luchadores[dueno]
+        for proyectil in self.proyectiles :
+            if not proyectil[0] :
+                x = luchador.x + luchador.ancho if luchador.mirando_derecha else luchador.x
+                proyectil[:] = [True, x, luchador.y + luchador.alto // 2, velocidad if luchador.mirando_derecha else -velocidad, dano, alto, dueno]
+                return
+    
+    def _avanzar_luchador(self, indice : int) :
+        """Un frame del luchador (mismo orden que Player.actualizar)"""
+        luchador = self.luchadores[indice]
+        if luchador.vida <= 0 :
+            return
+        if luchador.hitstop :
+            luchador.hitstop -= 1
+            return
+        if luchador.aturdido :
+            luchador.aturdido -= 1
+            return
+        
+        atacando = False
+        if luchador.bola_frames :
+            luchador.bola_frames -= 1
+            atacando = True
+        if luchador.golpe :
+            luchador.golpe_tick += 1
+            if luchador.golpe_tick >= luchador.golpe.total :
+                luchador.golpe = None
+                luchador.golpe_activo = False
+            else :
+                luchador._actualizar_hitbox()
+                atacando = True
+        if luchador.kame_ms >= 0 :
+            luchador.kame_ms += MS_POR_FRAME
+            if luchador.kame_ms > TimeConfig.DURACION_KAMEHAMEHA :
+                luchador.kame_ms = -1.0
+            else :
+                if not luchador.kame_impacto :
+                    luchador.kame_distancia = (luchador.kame_ms - 100) / 10 * 15
+                atacando = True
+        if luchador.final_frames :
+            luchador.final_frames -= 1
+            atacando = True
+            if not luchador.final_frames :
+                # El proyectil del movimiento final no lleva daño propio (Projectile.obtener_dano)
+                self._lanzar(indice, 8, 0, luchador.alto_bola)
+        
+        if not atacando :
+            luchador.stamina = min(CombatConfig.STAMINA_MAXIMA, luchador.stamina + CombatConfig.REGENERACION_STAMINA)
+    
+    def _colisiones(self) :
+        """Golpes, proyectiles y kamehamehas (mismas reglas que CollisionSystem)"""
+        for atacante_i in (0, 1) :
+            atacante = self.luchadores[atacante_i]
+            defensor = self.luchadores[1 - atacante_i]
+            
+            caja = atacante.hitbox()
+            if caja is not None :
+                x, y, ancho, alto = caja
+                if x < defensor.x + defensor.ancho and defensor.x < x + ancho and y < defensor.y + defensor.alto and defensor.y < y + alto :
+                    self.dano_hecho[atacante_i] += defensor.recibir_dano(atacante.golpe_dano)
+                    atacante.golpe_activo = False
+                    atacante.hitstop = max(atacante.hitstop, atacante.golpe_hitstop)
+                    defensor.hitstop = max(defensor.hitstop, atacante.golpe_hitstop)
+            
+            if atacante.kame_ms >= 100 :
+                centro_y = atacante.y + atacante.alto // 2
+                if atacante.mirando_derecha :
+                    inicio_x, fin_x = atacante.x + atacante.ancho, atacante.x + atacante.ancho + atacante.kame_distancia + atacante.ancho_kame
+                else :
+                    inicio_x, fin_x = atacante.x - atacante.kame_distancia - atacante.ancho_kame, atacante.x
+                mitad_alto = atacante.alto_kame // 2
+                if inicio_x < defensor.x + defensor.ancho and defensor.x < fin_x and centro_y - mitad_alto < defensor.y + defensor.alto and defensor.y < centro_y + mitad_alto :
+                    self.dano_hecho[atacante_i] += defensor.recibir_dano(atacante.dano_kamehameha)
+                    atacante.kame_impacto = True
+        
+        for proyectil in self.proyectiles :
+            activo, x, y, velocidad, dano, alto, dueno = proyectil
+            if not activo :
+                continue
+            x += velocidad
+            proyectil[1] = x
+            if x < -50 or x > ANCHO + 50 :
+                proyectil[0] = False
+                continue
+            defensor = self.luchadores[1 - dueno]
+            if defensor.x <= x <= defensor.x + defensor.ancho and y - alto / 2 < defensor.y + defensor.alto and defensor.y < y + alto / 2 :
+                self.dano_hecho[dueno] += defensor.recibir_dano(dano)
+                proyectil[0] = False
+    
+    def iniciar(self, indice : int, accion : str) -> bool :
+        """Inicia un ataque del luchador (la bola sale en el mismo frame, como en Player)"""
+        luchador = self.luchadores[indice]
+        if not luchador.iniciar(accion) :
+            return False
+        if accion == "bola_energia" and luchador.dano_bola :
+            self._lanzar(indice, TimeConfig.VELOCIDAD_PROYECTIL, luchador.dano_bola, luchador.alto_bola)
+        return True
+    
+    def avanzar(self, accion_ia : Optional[str] = None) :
+        """Avanza un frame; accion_ia repite movimiento o guardia de la IA"""
+        self._avanzar_luchador(0)
+        self._avanzar_luchador(1)
+        
+        ia = self.luchadores[0]
+        if accion_ia and not ia.ocupado :
+            direccion = 1 if ia.x < self.luchadores[1].x else -1
+            if accion_ia == "acercarse" :
+                ia.mover(VELOCIDAD_ACERCARSE * direccion)
+            elif accion_ia == "alejarse" :
+                ia.mover(-VELOCIDAD_ALEJARSE * direccion)
+            elif accion_ia in ("subir", "bajar") :
+                ia.mover(0, -self.velocidad_esquive if accion_ia == "subir" else self.velocidad_esquive)
+        
+        # Modelo del rival : presiona con golpes si esta libre y en rango
+        rival = self.luchadores[1]
+        if self.oponente_agresivo and not rival.ocupado and abs(rival.x - ia.x) < rival.ancho + ALCANCE_GOLPE and abs(rival.y - ia.y) < rival.alto :
+            rival.cubierto = False
+            rival.iniciar("golpe")
+        
+        # Orientacion
+        derecha = self.luchadores[0].x < self.luchadores[1].x
+        self.luchadores[0].mirando_derecha = derecha
+        self.luchadores[1].mirando_derecha = not derecha
+        
+        self._colisiones()
\ No newline at end of file
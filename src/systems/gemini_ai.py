@@ -4,46 +4,69 @@
 import pygame
 import random
 import requests
-import json
 from typing import Literal, Optional, Dict, Any
 from src.entities.player import Player
-from src.systems.ai import AIController
+from src.systems.circuit_breaker import CircuitBreaker
+from src.systems.decision_cache import DecisionCache
+from src.systems.gemini_client import ClienteGemini
+from src.systems.gemini_worker import GeminiWorker
+from src.systems.plan_interpreter import PlanIA, ejecutar_accion, medir
+from src.systems.policy_model import RegistroDecisiones, crear_controlador_local
+from src.utils.config import GeminiConfig
+from src.utils.rng import derivar_semilla
 
-DificultadType = Literal["facil", "normal", "dificil"]
+DificultadType = Literal["facil", "normal", "dificil", "experto"]
 
 
 class GeminiAIController :
     """Controlador de IA potenciado por Google Gemini"""
     
-    def __init__(self, jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "normal", api_key : Optional[str] = None) :
+    def __init__(self, jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "normal", api_key : Optional[str] = None, sesion : Optional[requests.Session] = None, semilla : Optional[int] = None) :
         """Inicializa el controlador de IA con Gemini"""
         self.jugador_ia = jugador_ia
         self.jugador_oponente = jugador_oponente
         self.dificultad = dificultad
         self.api_key = api_key
         
-        # Fallback a IA tradicional si no hay API key
-        self.ai_tradicional = AIController(jugador_ia, jugador_oponente, dificultad)
+        # Fallback a IA local si no hay API key (la politica destilada si hay un modelo entrenado)
+        semilla_local = None if semilla is None else derivar_semilla(semilla, "local")
+        self.ai_tradicional = crear_controlador_local(jugador_ia, jugador_oponente, dificultad, semilla_local)
         self.usar_gemini = api_key is not None and len(api_key) > 0
         
         # Estado interno
         self.ultimo_llamado_gemini = 0
         self.intervalo_gemini = self._obtener_intervalo_por_dificultad()
-        self.ultima_decision = None
+        self.plan : Optional[PlanIA] = None
+        self.plan_expira = 0
+        self.duracion_plan = GeminiConfig.DURACION_PLAN.get(dificultad, GeminiConfig.DURACION_PLAN["normal"])
         self.contador_decisiones = 0
         
+        # Decisiones ya tomadas para estados equivalentes (evitan llamadas de red)
+        self.cache = DecisionCache(dificultad)
+        
+        # Sin red o con latencia alta se juega con la IA local hasta la consulta de prueba
+        self.circuito = CircuitBreaker()
+        
         # Historial de combate 
         self.historial_combate = []
         self.max_historial = 5
         
-        # URL de la API de Gemini
+        # Cliente HTTP (pool keep-alive compartido) e hilo de consultas (el game loop nunca espera a la red)
+        self.worker : Optional[GeminiWorker] = None
         if self.usar_gemini :
-            self.api_url = f"https ://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash :generateContent?key={self.api_key}"
+            self.api_url = GeminiConfig.URL_API.format(self.api_key)
+            self.cliente = ClienteGemini(self.api_url, sesion)
+            self.worker = GeminiWorker(self._consultar_gemini)
+        
+        # Pares (estado, accion) de Gemini para entrenar la politica destilada
+        self.registro : Optional[RegistroDecisiones] = None
+        if self.usar_gemini and GeminiConfig.REGISTRAR_DATASET :
+            self.registro = RegistroDecisiones()
         
         print(f"🤖 Gemini AI {"ACTIVADO" if self.usar_gemini else "DESACTIVADO (usando IA tradicional)"}")
     
     def _obtener_intervalo_por_dificultad(self) -> int :
-        """Determina con que frecuencia consultar a Gemini segun dificultad"""
+        """Tiempo minimo entre consultas a Gemini segun dificultad"""
         intervalos = {
             "facil" : 1500,    # Consulta cada 1.5 segundos
             "normal" : 800,    # Consulta cada 0.8 segundos
@@ -64,15 +87,81 @@ class GeminiAIController :
         if self._esta_bloqueado() :
             return
         
-        # Decidir si consultar a Gemini o ejecutar ultima decision
-        if ahora - self.ultimo_llamado_gemini > self.intervalo_gemini :
-            self._consultar_gemini(ahora)
-        elif self.ultima_decision :
-            self._ejecutar_decision(self.ultima_decision)
+        # Recoger la decision del worker si ya llego
+        hay_nueva, estado, decision = self.worker.tomar_decision()
+        if hay_nueva :
+            latencia = self.worker.ultima_latencia_ms
+            if self._registrar_decision(decision, ahora) :
+                self.circuito.registrar_exito(latencia, ahora)
+                self.cache.guardar(self.cache.clave(estado), decision, ahora)
+            else :
+                self.circuito.registrar_fallo(latencia, ahora)
+        
+        # Plan nuevo poco antes de que expire el actual : de la cache si el estado es equivalente, si no del worker
+        if ahora - self.ultimo_llamado_gemini > self.intervalo_gemini and ahora >= self.plan_expira - GeminiConfig.ANTICIPACION_PLAN :
+            self.ultimo_llamado_gemini = ahora
+            estado = self._obtener_estado_juego()
+            decision = self.cache.obtener(self.cache.clave(estado), ahora)
+            if decision is not None :
+                self._registrar_decision(decision, ahora)
+            elif self.circuito.permite(ahora) :
+                self.worker.solicitar(estado)
+        
+        accion = None
+        if self.plan and ahora < self.plan_expira :
+            valores = medir(self.jugador_ia, self.jugador_oponente)
+            accion = self.plan.elegir_accion(valores)
+            if accion and self.registro :
+                self.registro.registrar(valores, accion, ahora)
+        
+        if accion :
+            self._ejecutar_accion(accion)
         else :
-            # Comportamiento basico mientras espera decision
+            # Comportamiento basico sin plan vigente o si ninguna regla aplica
             self.ai_tradicional.actualizar()
     
+    def _registrar_decision(self, decision : Optional[Dict[str, Any]], ahora : int) -> bool :
+        """Compila y adopta el plan recibido (False si la consulta fallo o no es valido)"""
+        plan = None
+        if decision is not None :
+            plan = PlanIA.desde_respuesta(decision, self.duracion_plan, GeminiConfig.DURACION_PLAN_MAXIMA, GeminiConfig.MAX_REGLAS_PLAN)
+        
+        self.plan = plan
+        if plan is None :
+            return False
+        
+        self.plan_expira = ahora + plan.duracion
+        self.contador_decisiones += 1
+        if self.contador_decisiones % 10 == 0 :
+            print(f"🧠 Gemini planeo {len(plan.reglas)} reglas por {plan.duracion} ms - {plan.razon}")
+        return True
+    
+    def sembrar(self, semilla : int) :
+        """Reinicia el flujo de decisiones de la IA local"""
+        self.ai_tradicional.sembrar(derivar_semilla(semilla, "local"))
+    
+    def metricas(self) -> Dict[str, float] :
+        """Metricas del backend de IA (consultas, latencia, cache y fallback)"""
+        metricas = self.circuito.metricas(pygame.time.get_ticks())
+        metricas["aciertos_cache"] = self.cache.aciertos
+        metricas["tasa_cache"] = self.cache.tasa_aciertos
+        return metricas
+    
+    def detener(self) :
+        """Detiene el hilo de consultas y registra las metricas de la pelea"""
+        if self.worker and self.usar_gemini :
+            self.worker.detener()
+            self.usar_gemini = False  # Si se sigue actualizando juega la IA local
+            if self.registro :
+                self.registro.cerrar()
+            m = self.metricas()
+            print(
+                f"📊 IA Gemini : {m["llamadas"]} llamadas, {m["fallos"]} fallos, "
+                f"p50 {m["p50_ms"]:.0f} ms, p95 {m["p95_ms"]:.0f} ms, "
+                f"cache {m["aciertos_cache"]} ({m["tasa_cache"]:.0%}), "
+                f"fallback {m["tiempo_fallback_ms"] / 1000:.1f} s"
+            )
+    
     def _esta_bloqueado(self) -> bool :
         """Verifica si la IA esta en un estado bloqueante"""
         return any([
@@ -81,7 +170,8 @@ class GeminiAIController :
             self.jugador_ia.usando_kamehameha,
             self.jugador_ia.usando_movimiento_final,
             self.jugador_ia.aturdido,
-            self.jugador_ia.en_ko
+            self.jugador_ia.en_ko,
+            self.jugador_ia.hitstop_restante > 0
         ])
     
     def _obtener_estado_juego(self) -> Dict[str, Any] :
@@ -145,122 +235,21 @@ ESTRATEGIA SEGUN SITUACION :
 - Si energia < 20 : acercarse, golpe, o esperar
 - En dificultad "dificil" : se mas agresivo y usa combos
 
+Arma un PLAN para los proximos {self.duracion_plan // 1000} segundos : una lista de reglas que se evaluan
+en orden cada frame; se ejecuta la accion de la primera regla cuyas condiciones se cumplan todas.
+Variables para las condiciones : distancia_x, distancia_y, mi_vida_pct, mi_energia, oponente_vida_pct,
+oponente_energia, oponente_atacando (1/0), oponente_cubierto (1/0). Condiciones como "<80", ">=50" o 1.
+Usa maximo {GeminiConfig.MAX_REGLAS_PLAN} reglas y termina con una regla sin condiciones ("si" vacio).
+
 Responde SOLO con un objeto JSON (sin markdown) :
-{{"accion" : "nombre_accion", "razon" : "explicacion breve"}}"""
+{{"plan" : [{{"si" : {{"oponente_atacando" : 1, "distancia_x" : "<100"}}, "accion" : "defender"}}, {{"si" : {{"distancia_x" : "<80", "mi_energia" : ">=5"}}, "accion" : "golpe"}}, {{"si" : {{}}, "accion" : "acercarse"}}], "duracion" : {self.duracion_plan}, "razon" : "explicacion breve"}}"""
         
         return prompt
     
-    def _consultar_gemini(self, ahora : int) :
-        """Consulta a Gemini para obtener la siguiente accion"""
-        try :
-            estado = self._obtener_estado_juego()
-            prompt = self._crear_prompt(estado)
-            
-            # Preparar request
-            payload = {
-                "contents" : [{
-                    "parts" : [{
-                        "text" : prompt
-                    }]
-                }],
-                "generationConfig" : {
-                    "temperature" : 0.7,
-                    "maxOutputTokens" : 150,
-                }
-            }
-            
-            # Hacer request a Gemini
-            response = requests.post(
-                self.api_url,
-                headers={"Content-Type" : "application/json"},
-                json=payload,
-                timeout=2)  # Timeout corto para no pausar el juego
-            
-            if response.status_code == 200 :
-                result = response.json()
-                texto_respuesta = result["candidates"][0]["content"]["parts"][0]["text"]
-                
-                # Limpiar respuesta 
-                texto_respuesta = texto_respuesta.strip()
-                if texto_respuesta.startswith("```json") :
-                    texto_respuesta = texto_respuesta.replace("```json", "").replace("```", "").strip()
-                elif texto_respuesta.startswith("```") :
-                    texto_respuesta = texto_respuesta.replace("```", "").strip()
-                
-                decision = json.loads(texto_respuesta)
-                self.ultima_decision = decision
-                self.ultimo_llamado_gemini = ahora
-                self.contador_decisiones += 1
-                
-                # Debug
-                if self.contador_decisiones % 10 == 0 :
-                    print(f"🧠 Gemini decidio : {decision["accion"]} - {decision.get("razon", "")}")
-                
-            else :
-                print(f"⚠️ Error API Gemini : {response.status_code}")
-                self._usar_fallback()
-                
-        except requests.exceptions.Timeout :
-            # Timeout - usar IA tradicional esta vez
-            self._usar_fallback()
-        except Exception as e :
-            print(f"⚠️ Error consultando Gemini : {e}")
-            self._usar_fallback()
-    
-    def _ejecutar_decision(self, decision : Dict[str, Any]) :
-        """Ejecuta la decision tomada por Gemini"""
-        accion = decision.get("accion", "esperar")
-        
-        if accion == "acercarse" :
-            self._acercarse_al_oponente()
-        elif accion == "alejarse" :
-            self._alejarse_del_oponente()
-        elif accion == "golpe" :
-            if self.jugador_ia.tiene_stamina(5) :
-                self.jugador_ia.iniciar_golpe("golpe_j")
-        elif accion == "patada" :
-            if self.jugador_ia.tiene_stamina(8) :
-                self.jugador_ia.iniciar_golpe("patada_k")
-        elif accion == "defender" :
-            self.jugador_ia.cubrirse()
-        elif accion == "bola_energia" :
-            if self.jugador_ia.tiene_stamina(15) :
-                self.jugador_ia.iniciar_lanzar_bola()
-        elif accion == "kamehameha" :
-            if self.jugador_ia.tiene_stamina(50) :
-                self.jugador_ia.iniciar_kamehameha()
-        elif accion == "movimiento_final" :
-            if self.jugador_ia.tiene_stamina(80) :
-                self.jugador_ia.iniciar_movimiento_final()
-        elif accion == "esperar" :
-            # No hacer nada, recuperar stamina
-            self.jugador_ia.estado = "inicio"
-            self.jugador_ia.sprite = self.jugador_ia.sprites["inicio"]
-    
-    def _acercarse_al_oponente(self) :
-        """Se acerca al oponente"""
-        velocidad = 3.5
-        if self.jugador_ia.x < self.jugador_oponente.x :
-            self.jugador_ia.x += velocidad
-            self.jugador_ia.estado = "derecha" if self.jugador_ia.mirando_derecha else "izquierda"
-        else :
-            self.jugador_ia.x -= velocidad
-            self.jugador_ia.estado = "izquierda" if self.jugador_ia.mirando_derecha else "derecha"
-        
-        self.jugador_ia.sprite = self.jugador_ia.sprites[self.jugador_ia.estado]
-    
-    def _alejarse_del_oponente(self) :
-        """Se aleja del oponente"""
-        velocidad = 4.0
-        if self.jugador_ia.x < self.jugador_oponente.x :
-            self.jugador_ia.x -= velocidad
-            self.jugador_ia.estado = "izquierda" if self.jugador_ia.mirando_derecha else "derecha"
-        else :
-            self.jugador_ia.x += velocidad
-            self.jugador_ia.estado = "derecha" if not self.jugador_ia.mirando_derecha else "izquierda"
-        
-        self.jugador_ia.sprite = self.jugador_ia.sprites[self.jugador_ia.estado]
+    def _consultar_gemini(self, estado : Dict[str, Any]) -> Optional[Dict[str, Any]] :
+        """Consulta a Gemini la siguiente accion (se ejecuta en el hilo del worker)"""
+        return self.cliente.consultar(self._crear_prompt(estado))
     
-    def _usar_fallback(self) :
-        """Usa la IA tradicional como respaldo"""
-        self.ai_tradicional.actualizar()
\ No newline at end of file
+    def _ejecutar_accion(self, accion : str) :
+        """Ejecuta la accion elegida por el plan de Gemini"""
+        ejecutar_accion(self.jugador_ia, self.jugador_oponente, accion)
@@ -0,0 +1,166 @@
+# Cliente HTTP de Gemini
+# Sesion con pool de conexiones keep-alive y reintentos, compartida entre peleas
+
+import json
+import requests
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.utils.config import GeminiConfig
+
+
+_sesion_compartida : Optional[requests.Session] = None
+
+
+def crear_sesion(tamano_pool : int = GeminiConfig.TAMANO_POOL, reintentos : int = GeminiConfig.REINTENTOS, backoff : float = GeminiConfig.BACKOFF) -> requests.Session :
+    """Crea una sesion con pool de conexiones y reintentos con backoff"""
+    reintento = Retry(
+        total=reintentos,
+        connect=reintentos,
+        read=0,  # Una respuesta lenta ya esta vieja : no se repite
+        backoff_factor=backoff,
+        status_forcelist=GeminiConfig.ESTADOS_REINTENTO,
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamano_pool, max_retries=reintento)
+    
+    sesion = requests.Session()
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    sesion.headers.update({"Content-Type" : "application/json"})
+    return sesion
+
+
+def obtener_sesion() -> requests.Session :
+    """Retorna la sesion compartida (se crea la primera vez)"""
+    global _sesion_compartida
+    if _sesion_compartida is None :
+        _sesion_compartida = crear_sesion()
+    return _sesion_compartida
+
+
+def cerrar_sesion() :
+    """Cierra la sesion compartida y sus conexiones"""
+    global _sesion_compartida
+    if _sesion_compartida is not None :
+        _sesion_compartida.close()
+        _sesion_compartida = None
+
+
+class ClienteGemini :
+    """Envia prompts a Gemini y decodifica la decision JSON"""
+    
+    def __init__(self, api_url : str, sesion : Optional[requests.Session] = None, timeout : float = GeminiConfig.TIMEOUT) :
+        """Inicializa el cliente (por defecto usa la sesion compartida)"""
+        self.api_url = api_url
+        self.sesion = sesion or obtener_sesion()
+        self.timeout = timeout
+    
+    def consultar(self, prompt : str) -> Optional[Dict[str, Any]] :
+        """Retorna la decision de Gemini o None si la consulta fallo"""
+        payload = {
+            "contents" : [{
+                "parts" : [{
+                    "text" : prompt
+                }]
+            }],
+            "generationConfig" : {
+                "temperature" : 0.7,
+                "maxOutputTokens" : 400,  # Alcanza para un plan de varias reglas
+            }
+        }
+        
+        try :
+            response = self.sesion.post(self.api_url, json=payload, timeout=self.timeout)
+            
+            if response.status_code == 200 :
+                result = response.json()
+                texto_respuesta = result["candidates"][0]["content"]["parts"][0]["text"]
+                
+                # Limpiar respuesta
+                texto_respuesta = texto_respuesta.strip()
+                if texto_respuesta.startswith("```json") :
+                    texto_respuesta = texto_respuesta.replace("```json", "").replace("```", "").strip()
+                elif texto_respuesta.startswith("```") :
+                    texto_respuesta = texto_respuesta.replace("```", "").strip()
+                
+                return json.loads(texto_respuesta)
+            
+            print(f"⚠️ Error API Gemini : {response.status_code}")
+        
+        except requests.exceptions.Timeout :
+            # Timeout - la IA tradicional juega hasta la proxima decision
+            pass
+        except Exception as e :
+            print(f"⚠️ Error consultando Gemini : {e}")
+        
+        return None
+
+
+# MEDICION CONTRA UN SERVIDOR LOCAL
+
+class _ServidorSimulado(BaseHTTPRequestHandler) :
+    """Responde como Gemini con una decision fija (HTTP/1.1 keep-alive)"""
+    
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Evita el retardo de ACK entre cabeceras y cuerpo
+    respuesta = json.dumps({
+        "candidates" : [{"content" : {"parts" : [{"text" : json.dumps({"accion" : "acercarse", "razon" : "prueba"})}]}}]
+    }).encode()
+    
+    def do_POST(self) :
+        """Consume el cuerpo y responde la decision"""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.respuesta)))
+        self.end_headers()
+        self.wfile.write(self.respuesta)
+    
+    def log_message(self, *args) :
+        """Silencia el log por request"""
+
+
+def medir_latencia(consultas : int = 200) -> Dict[str, float] :
+    """Compara la latencia por decision sin pool y con la sesion persistente"""
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ServidorSimulado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/generateContent"
+    
+    def medir(consultar) -> List[float] :
+        tiempos = []
+        for _ in range(consultas) :
+            inicio = time.perf_counter()
+            consultar()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return tiempos
+    
+    def consultar_sin_pool() :
+        # Una conexion nueva por decision, como el requests.post original
+        with crear_sesion() as nueva :
+            ClienteGemini(url, sesion=nueva).consultar("estado")
+    
+    cliente = ClienteGemini(url, sesion=crear_sesion())
+    try :
+        sin_pool = medir(consultar_sin_pool)
+        con_pool = medir(lambda : cliente.consultar("estado"))
+    finally :
+        cliente.sesion.close()
+        servidor.shutdown()
+    
+    return {
+        "sin_pool_p50_ms" : statistics.median(sin_pool),
+        "con_pool_p50_ms" : statistics.median(con_pool),
+        "sin_pool_media_ms" : statistics.fmean(sin_pool),
+        "con_pool_media_ms" : statistics.fmean(con_pool),
+    }
+
+
+if __name__ == "__main__" :
+    for clave, valor in medir_latencia().items() :
+        print(f"{clave} : {valor:.3f}")
\ No newline at end of file
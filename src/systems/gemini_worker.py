@@ -0,0 +1,73 @@
+# Hilo de consultas a Gemini
+# Ejecuta las llamadas de red fuera del game loop con una sola consulta en vuelo
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+EstadoJuego = Dict[str, Any]
+Decision = Optional[Dict[str, Any]]
+
+
+class GeminiWorker :
+    """Trabajador en segundo plano : siempre consulta el estado mas reciente"""
+    
+    def __init__(self, consultar : Callable[[EstadoJuego], Decision]) :
+        """Inicia el hilo con la funcion que resuelve una consulta"""
+        self._consultar = consultar
+        
+        # Slots sin locks : se reemplaza la tupla completa (asignacion atomica)
+        self._pendiente : Tuple[int, Optional[EstadoJuego]] = (0, None)
+        self._resultado : Tuple[int, Optional[EstadoJuego], Decision] = (0, None, None)
+        self._ultima_tomada = 0
+        self.ultima_latencia_ms = 0.0  # Se escribe antes de publicar el resultado
+        
+        self._despertar = threading.Event()
+        self._activo = True
+        self._hilo = threading.Thread(target=self._ejecutar, name="gemini-worker", daemon=True)
+        self._hilo.start()
+    
+    def solicitar(self, estado : EstadoJuego) :
+        """Publica un estado nuevo (reemplaza al anterior si aun no se envio)"""
+        self._pendiente = (self._pendiente[0] + 1, estado)
+        self._despertar.set()
+    
+    def tomar_decision(self) -> Tuple[bool, Optional[EstadoJuego], Decision] :
+        """Retorna (hay_nueva, estado consultado, decision) sin bloquear"""
+        secuencia, estado, decision = self._resultado
+        if secuencia == self._ultima_tomada :
+            return False, None, None
+        
+        self._ultima_tomada = secuencia
+        return True, estado, decision
+    
+    @property
+    def en_vuelo(self) -> bool :
+        """Indica si hay una consulta pendiente o en curso"""
+        return self._pendiente[0] != self._resultado[0]
+    
+    def detener(self) :
+        """Detiene el hilo (la consulta en curso termina por su timeout)"""
+        self._activo = False
+        self._despertar.set()
+    
+    def _ejecutar(self) :
+        """Loop del hilo : espera un estado nuevo y lo consulta"""
+        procesada = 0
+        while True :
+            self._despertar.wait()
+            self._despertar.clear()
+            if not self._activo :
+                return
+            
+            # Solo el estado mas nuevo : los intermedios se descartan
+            secuencia, estado = self._pendiente
+            if secuencia == procesada or estado is None :
+                continue
+            procesada = secuencia
+            
+            # Un estado que llegue durante la consulta vuelve a activar el evento
+            inicio = time.perf_counter()
+            decision = self._consultar(estado)
+            self.ultima_latencia_ms = (time.perf_counter() - inicio) * 1000
+            self._resultado = (secuencia, estado, decision)
\ No newline at end of file
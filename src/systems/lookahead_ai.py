@@ -0,0 +1,138 @@
+# IA con busqueda hacia adelante (dificultad experto)
+# En cada decision simula cada accion candidata unos frames en la simulacion rapida y elige la mejor
+
+import time
+from typing import Optional
+from src.entities.player import Player
+from src.systems.ai import AIController, DificultadType
+from src.systems.ai_scheduler import PLANIFICADOR_IA
+from src.systems.fast_sim import SimulacionRapida
+from src.systems.plan_interpreter import ejecutar_accion
+from src.utils.clock import tiempo_juego
+from src.utils.config import IAConfig
+
+ATAQUES = ("golpe", "patada", "bola_energia", "kamehameha", "movimiento_final")
+
+# Orden de evaluacion : si se acaba el presupuesto quedan afuera las ultimas
+CANDIDATAS = ("defender", "golpe", "patada", "acercarse", "alejarse", "bola_energia", "subir", "bajar", "kamehameha", "movimiento_final", "esperar")
+
+
+class LookaheadAIController(AIController) :
+    """IA que elige la accion con mejor resultado simulado dentro de un presupuesto por frame"""
+    
+    def __init__(self, jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "experto", semilla : Optional[int] = None) :
+        """Inicializa el controlador y reserva las simulaciones"""
+        super().__init__(jugador_ia, jugador_oponente, dificultad, semilla)
+        config = IAConfig.EXPERTO
+        self.horizonte = config["horizonte"]
+        self.presupuesto = config["presupuesto_ms"] / 1000
+        
+        # Se reutilizan en cada decision : base (estado real) y prueba (rollout)
+        self.base = SimulacionRapida(self.velocidad * 0.8)
+        self.prueba = SimulacionRapida(self.velocidad * 0.8)
+        
+        self.accion_actual = "esperar"
+        
+        # Metricas
+        self.decisiones = 0
+        self.candidatas_evaluadas = 0
+        self.peor_decision_ms = 0.0
+    
+    def actualizar(self) :
+        """Decide en los ticks del planificador y mantiene la accion elegida entre decisiones"""
+        if self._esta_bloqueado() :
+            return
+        
+        if not PLANIFICADOR_IA.decidir(self.turno, tiempo_juego(), self._decidir) and self.accion_actual not in ATAQUES :
+            self._ejecutar(self.accion_actual, nueva=False)
+    
+    def _decidir(self) :
+        """Tick de decision : busca la mejor accion y la inicia"""
+        self.accion_actual = self._buscar_mejor_accion()
+        self._ejecutar(self.accion_actual, nueva=True)
+    
+    def _buscar_mejor_accion(self) -> str :
+        """Simula cada candidata hasta agotar el presupuesto y retorna la de mejor puntaje"""
+        inicio = time.perf_counter()
+        self.base.cargar(self.jugador_ia, self.jugador_oponente)
+        
+        mejor_accion = "esperar"
+        mejor_puntaje = float("-inf")
+        evaluadas = 0
+        anterior = inicio
+        for accion in CANDIDATAS :
+            puntaje = self._simular(accion)
+            evaluadas += 1
+            if puntaje is not None and puntaje > mejor_puntaje :
+                mejor_accion, mejor_puntaje = accion, puntaje
+            
+            # Cortar si otra candidata como la ultima no entra en el presupuesto
+            ahora = time.perf_counter()
+            if 2 * ahora - anterior - inicio > self.presupuesto :
+                break
+            anterior = ahora
+        
+        self.decisiones += 1
+        self.candidatas_evaluadas += evaluadas
+        self.peor_decision_ms = max(self.peor_decision_ms, (time.perf_counter() - inicio) * 1000)
+        return mejor_accion
+    
+    def _simular(self, accion : str) -> Optional[float] :
+        """Avanza la simulacion con la accion y retorna su puntaje (None si no se puede hacer)"""
+        prueba = self.prueba
+        prueba.copiar_de(self.base)
+        ia, oponente = prueba.luchadores
+        
+        ia.cubierto = accion == "defender"
+        if accion in ATAQUES :
+            if not prueba.iniciar(0, accion) :
+                return None
+            movimiento = None
+        else :
+            movimiento = accion
+        
+        for _ in range(self.horizonte) :
+            prueba.avanzar(movimiento)
+            if ia.vida <= 0 or oponente.vida <= 0 :
+                break
+        
+        # La guardia solo gana si evita daño (en empate se prefiere actuar)
+        return self._puntuar(prueba) - (0.05 if accion == "defender" else 0)
+    
+    def _puntuar(self, simulacion : SimulacionRapida) -> float :
+        """Daño hecho menos daño recibido, con desempates por KO, stamina y distancia"""
+        ia, oponente = simulacion.luchadores
+        puntaje = simulacion.dano_hecho[0] - 1.2 * simulacion.dano_hecho[1]
+        if oponente.vida <= 0 :
+            puntaje += 100
+        if ia.vida <= 0 :
+            puntaje -= 100
+        
+        # Preferir quedar a distancia de golpe y con stamina para el siguiente ataque
+        distancia_ideal = ia.ancho + 30
+        puntaje -= 0.005 * abs(abs(ia.x - oponente.x) - distancia_ideal)
+        puntaje -= 0.005 * abs(ia.y - oponente.y)
+        puntaje += 0.02 * ia.stamina
+        return puntaje
+    
+    def _ejecutar(self, accion : str, nueva : bool) :
+        """Aplica la accion al jugador real (los ataques solo al decidirlos)"""
+        jugador = self.jugador_ia
+        if accion != "defender" and jugador.cubriendose :
+            jugador.dejar_de_cubrirse()
+        
+        if accion in ("subir", "bajar") :
+            paso = self.velocidad * 0.8
+            jugador.y += -paso if accion == "subir" else paso
+            jugador.estado = "subir" if accion == "subir" and "subir" in jugador.sprites else "bajar"
+            jugador.sprite = jugador.sprites[jugador.estado]
+            self._aplicar_limites()
+            return
+        
+        if accion == "defender" and jugador.cubriendose :
+            return
+        if nueva or accion not in ATAQUES :
+            if accion in ATAQUES :
+                self.ultimo_ataque = tiempo_juego()
+            ejecutar_accion(jugador, self.jugador_oponente, accion)
+            self._aplicar_limites()
\ No newline at end of file
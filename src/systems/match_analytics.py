@@ -0,0 +1,207 @@
+# Analisis de partidas registradas
+# Abre los .npz con mmap y calcula daño por ataque, efectividad por distancia y mapas de calor con NumPy
+
+import argparse
+import glob
+import io
+import mmap
+import os
+import struct
+import time
+import zipfile
+import numpy as np
+from typing import Dict, List
+from src.utils.config import ALTO, ANCHO, MatchLogConfig, Paths
+from src.utils.events import EventoCombate
+
+# Especiales sin proyectil : el intento es el propio evento ESPECIAL
+ATAQUES_SIN_PROYECTIL = ("kamehameha",)
+MAX_ATAQUES = 256
+NIVELES_CALOR = " .:-=+*#%@"
+
+
+def abrir_partida(ruta : str) -> Dict[str, np.ndarray] :
+    """Columnas de un .npz como vistas sobre un mmap del archivo (sin copiar; las comprimidas se leen enteras)"""
+    with open(ruta, "rb") as f :
+        memoria = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    columnas = {}
+    with zipfile.ZipFile(ruta) as archivo :
+        for info in archivo.infolist() :
+            nombre = info.filename.removesuffix(".npy")
+            if info.compress_type != zipfile.ZIP_STORED :
+                columnas[nombre] = np.load(io.BytesIO(archivo.read(info)))
+                continue
+            
+            # Cabecera local del zip (30 bytes + nombre + extra); despues empieza el .npy
+            largo_nombre, largo_extra = struct.unpack_from("<HH", memoria, info.header_offset + 26)
+            inicio = info.header_offset + 30 + largo_nombre + largo_extra
+            
+            # Cabecera del .npy : magia, version, largo (2 bytes en la 1.0, 4 en las demas) y diccionario
+            version_1 = memoria[inicio + 6] == 1
+            (largo,) = struct.unpack_from("<H" if version_1 else "<I", memoria, inicio + 8)
+            fin_cabecera = inicio + (10 if version_1 else 12) + largo
+            cabecera = io.BytesIO(memoria[inicio :fin_cabecera])
+            np.lib.format.read_magic(cabecera)
+            if version_1 :
+                forma, fortran, tipo = np.lib.format.read_array_header_1_0(cabecera)
+            else :
+                forma, fortran, tipo = np.lib.format.read_array_header_2_0(cabecera)
+            
+            cantidad = int(np.prod(forma))
+            datos = np.frombuffer(memoria, dtype=tipo, count=cantidad, offset=fin_cabecera) if cantidad else np.empty(0, tipo)
+            columnas[nombre] = datos.reshape(forma, order="F" if fortran else "C")
+    return columnas
+
+
+class AnalisisPartidas :
+    """Acumula las metricas de muchas partidas (cada partida se procesa vectorizada)"""
+    
+    def __init__(self) :
+        """Inicializa los acumuladores"""
+        self.ataques : Dict[str, int] = {}
+        self.partidas = 0
+        self.frames = 0
+        
+        # Por ataque : impactos, bloqueos y daño
+        self.golpes = np.zeros(MAX_ATAQUES, dtype=np.int64)
+        self.bloqueos = np.zeros(MAX_ATAQUES, dtype=np.int64)
+        self.dano = np.zeros(MAX_ATAQUES)
+        self.dano_bloqueado = np.zeros(MAX_ATAQUES)
+        
+        # Por ataque y distancia al iniciarlo : intentos y cuantos conectaron (golpe o bloqueo)
+        self.bins_distancia = ANCHO // MatchLogConfig.ANCHO_BIN_DISTANCIA + 1
+        self.intentos = np.zeros((MAX_ATAQUES, self.bins_distancia), dtype=np.int64)
+        self.conectados = np.zeros((MAX_ATAQUES, self.bins_distancia), dtype=np.int64)
+        
+        # Por jugador : frames en cada celda de la pantalla
+        celda = MatchLogConfig.CELDA_MAPA_CALOR
+        self.calor = np.zeros((2, ALTO // celda + 1, ANCHO // celda + 1), dtype=np.int64)
+    
+    def agregar(self, columnas : Dict[str, np.ndarray]) :
+        """Suma una partida"""
+        self.partidas += 1
+        self._agregar_calor(columnas["posiciones"])
+        if len(columnas["ev_tipo"]) == 0 :
+            return
+        
+        # Indices de ataque de la partida -> indices globales
+        globales = np.array([self.ataques.setdefault(str(nombre), len(self.ataques)) for nombre in columnas["ataques"]], dtype=np.intp)
+        ataque = globales[columnas["ev_ataque"]]
+        tipo = columnas["ev_tipo"]
+        dano = columnas["ev_dano"]
+        
+        golpe = tipo == EventoCombate.GOLPE
+        bloqueo = tipo == EventoCombate.BLOQUEO
+        self.golpes += np.bincount(ataque[golpe], minlength=MAX_ATAQUES)
+        self.bloqueos += np.bincount(ataque[bloqueo], minlength=MAX_ATAQUES)
+        self.dano += np.bincount(ataque[golpe], weights=dano[golpe], minlength=MAX_ATAQUES)
+        self.dano_bloqueado += np.bincount(ataque[bloqueo], weights=dano[bloqueo], minlength=MAX_ATAQUES)
+        
+        self._agregar_efectividad(columnas, ataque, tipo, golpe | bloqueo)
+    
+    def _agregar_efectividad(self, columnas : Dict[str, np.ndarray], ataque : np.ndarray, tipo : np.ndarray, impacto : np.ndarray) :
+        """Cada impacto se asigna al ultimo intento del mismo jugador con el mismo ataque"""
+        sin_proyectil = np.isin(ataque, [self.ataques[a] for a in ATAQUES_SIN_PROYECTIL if a in self.ataques])
+        intento = (tipo == EventoCombate.ATAQUE) | (tipo == EventoCombate.PROYECTIL) | ((tipo == EventoCombate.ESPECIAL) & sin_proyectil)
+        if not intento.any() :
+            return
+        
+        bins = np.minimum(columnas["ev_distancia"] // MatchLogConfig.ANCHO_BIN_DISTANCIA, self.bins_distancia - 1).astype(np.intp)
+        np.add.at(self.intentos, (ataque[intento], bins[intento]), 1)
+        
+        # Clave ordenable (jugador, ataque, frame) : los eventos ya vienen en orden de frame
+        frame = columnas["ev_frame"].astype(np.int64)
+        grupo = columnas["ev_jugador"].astype(np.int64) * MAX_ATAQUES + ataque
+        clave = grupo * (int(frame.max()) + 1) + frame
+        orden = np.argsort(clave[intento], kind="stable")
+        claves_intento = clave[intento][orden]
+        
+        grupos_intento = grupo[intento][orden]
+        bins_intento = bins[intento][orden]
+        
+        # Intento previo mas cercano del mismo jugador y ataque; un intento con varios impactos conecta una vez
+        posicion = np.searchsorted(claves_intento, clave[impacto], side="right") - 1
+        valido = posicion >= 0
+        valido[valido] = grupos_intento[posicion[valido]] == grupo[impacto][valido]
+        conectados = np.unique(posicion[valido])
+        np.add.at(self.conectados, (ataque[intento][orden][conectados], bins_intento[conectados]), 1)
+    
+    def _agregar_calor(self, posiciones : np.ndarray) :
+        """Histograma 2D de los centros de cada jugador"""
+        self.frames += len(posiciones)
+        if len(posiciones) == 0 :
+            return
+        celda = MatchLogConfig.CELDA_MAPA_CALOR
+        celdas = np.clip((posiciones // celda).astype(np.intp), 0, None)
+        filas = np.minimum(celdas[:, :, 1], self.calor.shape[1] - 1)
+        columnas = np.minimum(celdas[:, :, 0], self.calor.shape[2] - 1)
+        for jugador in range(2) :
+            np.add.at(self.calor[jugador], (filas[:, jugador], columnas[:, jugador]), 1)
+    
+    def imprimir(self) :
+        """Reporte en texto : tablas por ataque y mapas de calor"""
+        print(f"{self.partidas} partidas, {self.frames} frames ({self.frames / 60 / 60:.1f} min de combate)")
+        
+        print("\nDAÑO POR ATAQUE")
+        print(f"{"ataque":<14}{"golpes":>8}{"daño":>10}{"daño/golpe":>12}{"bloqueos":>10}{"daño bloq.":>12}")
+        for nombre, i in sorted(self.ataques.items(), key=lambda par : -self.dano[par[1]]) :
+            if self.golpes[i] or self.bloqueos[i] :
+                print(f"{nombre or "-":<14}{self.golpes[i]:>8}{self.dano[i]:>10.0f}{self.dano[i] / max(self.golpes[i], 1):>12.1f}"
+                      f"{self.bloqueos[i]:>10}{self.dano_bloqueado[i]:>12.0f}")
+        
+        print(f"\nEFECTIVIDAD POR DISTANCIA (conectados / intentos, bins de {MatchLogConfig.ANCHO_BIN_DISTANCIA} px)")
+        usados = np.flatnonzero(self.intentos.sum(axis=0))
+        if len(usados) :
+            ultimo = usados[-1] + 1
+            print(f"{"ataque":<14}" + "".join(f"{b * MatchLogConfig.ANCHO_BIN_DISTANCIA:>6}" for b in range(ultimo)))
+            for nombre, i in sorted(self.ataques.items()) :
+                if self.intentos[i].any() :
+                    tasas = np.divide(self.conectados[i, :ultimo], self.intentos[i, :ultimo], out=np.full(ultimo, np.nan), where=self.intentos[i, :ultimo] > 0)
+                    print(f"{nombre:<14}" + "".join("     -" if np.isnan(t) else f"{t:>6.0%}" for t in tasas))
+        
+        for jugador in range(2) :
+            print(f"\nMAPA DE CALOR J{jugador + 1}")
+            calor = self.calor[jugador]
+            niveles = np.zeros(calor.shape, dtype=np.intp)
+            if calor.max() :
+                niveles = np.ceil(np.log1p(calor) / np.log1p(calor.max()) * (len(NIVELES_CALOR) - 1)).astype(np.intp)
+            for fila in niveles :
+                print("|" + "".join(NIVELES_CALOR[n] for n in fila) + "|")
+
+
+def main(argumentos : List[str] = None) :
+    """Comando de analisis : python -m src.systems.match_analytics [archivos o carpetas]"""
+    parser = argparse.ArgumentParser(description="Metricas de balance a partir de las partidas registradas")
+    parser.add_argument("rutas", nargs="*", default=[Paths.PARTIDAS], help=f"Archivos .npz o carpetas (por defecto {Paths.PARTIDAS})")
+    parser.add_argument("--salida", help="Guarda los acumulados en un .npz")
+    argumentos = parser.parse_args(argumentos)
+    
+    archivos = []
+    for ruta in argumentos.rutas :
+        archivos += sorted(glob.glob(os.path.join(ruta, "*.npz"))) if os.path.isdir(ruta) else [ruta]
+    if not archivos :
+        print("No hay partidas registradas : juega con python main.py --registrar-partidas")
+        return
+    
+    analisis = AnalisisPartidas()
+    inicio = time.perf_counter()
+    for ruta in archivos :
+        try :
+            analisis.agregar(abrir_partida(ruta))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e :
+            print(f"Error al leer {ruta} : {e}")
+    segundos = time.perf_counter() - inicio
+    
+    analisis.imprimir()
+    print(f"\n{len(archivos)} archivos en {segundos:.2f} s ({len(archivos) / max(segundos, 1e-9):.0f} partidas/s)")
+    
+    if argumentos.salida :
+        np.savez(argumentos.salida, ataques=np.array(list(analisis.ataques) or [""]),
+                 golpes=analisis.golpes, bloqueos=analisis.bloqueos, dano=analisis.dano, dano_bloqueado=analisis.dano_bloqueado,
+                 intentos=analisis.intentos, conectados=analisis.conectados, calor=analisis.calor)
+        print(f"Acumulados guardados en {argumentos.salida}")
+
+
+if __name__ == "__main__" :
+    main()
\ No newline at end of file
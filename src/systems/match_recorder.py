@@ -0,0 +1,120 @@
+# Registro de partidas
+# Guarda cada evento de combate y la posicion de los luchadores por frame en columnas NumPy (un .npz por pelea)
+
+import os
+import time
+import numpy as np
+from typing import Dict, Optional
+from src.entities.player import Player
+from src.managers.persistence_writer import obtener_escritor
+from src.utils.config import MatchLogConfig, Paths
+from src.utils.events import DatosEvento, EventBus, EventoCombate
+
+
+class MatchRecorder :
+    """Grabador de una pelea : arreglos reservados al crearlo, sin asignar memoria por frame"""
+    
+    def __init__(self, max_frames : int = MatchLogConfig.MAX_FRAMES, max_eventos : int = MatchLogConfig.MAX_EVENTOS) :
+        """Reserva las columnas de frames y de eventos"""
+        # Por frame : centro (x, y) y vida de cada jugador
+        self.posiciones = np.zeros((max_frames, 2, 2), dtype=np.float32)
+        self.vida = np.zeros((max_frames, 2), dtype=np.float32)
+        
+        # Por evento : frame, tipo, jugador que lo origina, ataque (indice en self.ataques), daño y distancia entre jugadores
+        self.ev_frame = np.zeros(max_eventos, dtype=np.int32)
+        self.ev_tipo = np.zeros(max_eventos, dtype=np.uint8)
+        self.ev_jugador = np.zeros(max_eventos, dtype=np.uint8)
+        self.ev_ataque = np.zeros(max_eventos, dtype=np.uint8)
+        self.ev_dano = np.zeros(max_eventos, dtype=np.float32)
+        self.ev_distancia = np.zeros(max_eventos, dtype=np.float32)
+        
+        self.ataques : Dict[str, int] = {}
+        self.jugador1 : Optional[Player] = None
+        self.jugador2 : Optional[Player] = None
+        self.frames = 0
+        self.eventos = 0
+        self.descartados = 0
+    
+    def conectar_eventos(self, eventos : EventBus) :
+        """Suscribe el grabador a todos los eventos de combate"""
+        for tipo in EventoCombate :
+            eventos.suscribir(tipo, self._registrar_evento)
+    
+    def iniciar(self, jugador1 : Player, jugador2 : Player) :
+        """Empieza a grabar una pelea nueva (reusa los arreglos)"""
+        self.jugador1 = jugador1
+        self.jugador2 = jugador2
+        self.ataques.clear()
+        self.frames = 0
+        self.eventos = 0
+        self.descartados = 0
+    
+    @property
+    def activo(self) -> bool :
+        """Indica si hay una pelea en grabacion"""
+        return self.jugador1 is not None
+    
+    def registrar_frame(self) :
+        """Guarda posicion y vida de ambos jugadores en el frame actual"""
+        if not self.activo or self.frames >= len(self.posiciones) :
+            return
+        
+        i = self.frames
+        rect1, rect2 = self.jugador1.rect, self.jugador2.rect
+        self.posiciones[i, 0] = rect1.center
+        self.posiciones[i, 1] = rect2.center
+        self.vida[i] = (self.jugador1.vida_actual, self.jugador2.vida_actual)
+        self.frames += 1
+    
+    def _registrar_evento(self, evento : DatosEvento) :
+        """Agrega el evento en el frame actual (con el buffer lleno se cuenta como descartado)"""
+        if not self.activo :
+            return
+        if self.eventos >= len(self.ev_frame) :
+            self.descartados += 1
+            return
+        
+        i = self.eventos
+        self.ev_frame[i] = self.frames
+        self.ev_tipo[i] = evento.tipo
+        self.ev_jugador[i] = evento.jugador
+        self.ev_ataque[i] = self.ataques.setdefault(evento.ataque, len(self.ataques))
+        self.ev_dano[i] = evento.dano
+        self.ev_distancia[i] = abs(self.jugador1.rect.centerx - self.jugador2.rect.centerx)
+        self.eventos += 1
+    
+    def terminar(self, contexto : Optional[Dict] = None, semilla : Optional[int] = None) -> Optional[str] :
+        """Deja de grabar y encola el guardado del .npz; retorna la ruta (None si no habia pelea)"""
+        if not self.activo :
+            return None
+        
+        # Copias del tramo usado : el escritor las guarda mientras los arreglos se reusan en la revancha
+        columnas = {
+            "posiciones" : self.posiciones[ :self.frames].copy(),
+            "vida" : self.vida[ :self.frames].copy(),
+            "ev_frame" : self.ev_frame[ :self.eventos].copy(),
+            "ev_tipo" : self.ev_tipo[ :self.eventos].copy(),
+            "ev_jugador" : self.ev_jugador[ :self.eventos].copy(),
+            "ev_ataque" : self.ev_ataque[ :self.eventos].copy(),
+            "ev_dano" : self.ev_dano[ :self.eventos].copy(),
+            "ev_distancia" : self.ev_distancia[ :self.eventos].copy(),
+            "ataques" : np.array(list(self.ataques) or [""]),
+            "semilla" : np.int64(semilla or 0),
+            "descartados" : np.int32(self.descartados),
+        }
+        for clave, valor in (contexto or {}).items() :
+            columnas[clave] = np.array(valor or "")
+        
+        self.jugador1 = self.jugador2 = None
+        ruta = os.path.join(Paths.PARTIDAS, f"{time.strftime("%Y%m%d_%H%M%S")}_{semilla or 0:016x}.npz")
+        obtener_escritor().encolar(guardar_partida, ruta, columnas)
+        return ruta
+
+
+def guardar_partida(ruta : str, columnas : Dict[str, np.ndarray]) :
+    """Escribe el .npz sin comprimir (el analisis lo abre con mmap) de forma atomica"""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f :
+        np.savez(f, **columnas)
+    os.replace(temporal, ruta)
\ No newline at end of file
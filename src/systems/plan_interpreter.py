@@ -0,0 +1,173 @@
+# Interprete de planes de la IA
+# Gemini responde un plan condicional (reglas "si ... entonces accion") que se evalua localmente cada frame
+
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.entities.player import Player
+
+# Variables que pueden usar las condiciones del plan
+VARIABLES = (
+    "distancia_x",
+    "distancia_y",
+    "mi_vida_pct",
+    "mi_energia",
+    "oponente_vida_pct",
+    "oponente_energia",
+    "oponente_atacando",
+    "oponente_cubierto",
+)
+
+ACCIONES = (
+    "acercarse",
+    "alejarse",
+    "golpe",
+    "patada",
+    "defender",
+    "bola_energia",
+    "kamehameha",
+    "movimiento_final",
+    "esperar",
+)
+
+# Los operadores de dos caracteres van primero para que "<=" no se lea como "<"
+OPERADORES : Tuple[Tuple[str, Callable[[float, float], bool]], ...] = (
+    ("<=", operator.le),
+    (">=", operator.ge),
+    ("!=", operator.ne),
+    ("==", operator.eq),
+    ("<", operator.lt),
+    (">", operator.gt),
+)
+
+Condicion = Tuple[str, Callable[[float, float], bool], float]
+Regla = Tuple[Tuple[Condicion, ...], str]
+
+
+def _compilar_condicion(variable : str, valor : Any) -> Condicion :
+    """Convierte "<80", 80 o true en (variable, operador, umbral)"""
+    if variable not in VARIABLES :
+        raise ValueError(f"Variable desconocida : {variable}")
+    
+    if isinstance(valor, (bool, int, float)) :
+        return variable, operator.eq, float(valor)
+    
+    texto = str(valor).replace(" ", "")
+    for simbolo, funcion in OPERADORES :
+        if texto.startswith(simbolo) :
+            return variable, funcion, float(texto[len(simbolo):])
+    return variable, operator.eq, float(texto)
+
+
+def medir(jugador_ia : Player, oponente : Player) -> Dict[str, float] :
+    """Valores actuales de las variables del plan"""
+    return {
+        "distancia_x" : abs(jugador_ia.x - oponente.x),
+        "distancia_y" : abs(jugador_ia.y - oponente.y),
+        "mi_vida_pct" : jugador_ia.vida_actual * 100 / jugador_ia.vida_maxima,
+        "mi_energia" : jugador_ia.stamina_actual,
+        "oponente_vida_pct" : oponente.vida_actual * 100 / oponente.vida_maxima,
+        "oponente_energia" : oponente.stamina_actual,
+        "oponente_atacando" : float(oponente.golpe_animando),
+        "oponente_cubierto" : float(oponente.cubriendose),
+    }
+
+
+def ejecutar_accion(jugador_ia : Player, oponente : Player, accion : str) :
+    """Ejecuta una accion del plan sobre el jugador controlado por la IA"""
+    if accion == "acercarse" :
+        _acercarse_al_oponente(jugador_ia, oponente)
+    elif accion == "alejarse" :
+        _alejarse_del_oponente(jugador_ia, oponente)
+    elif accion == "golpe" :
+        if jugador_ia.tiene_stamina(5) :
+            jugador_ia.iniciar_golpe("golpe_j")
+    elif accion == "patada" :
+        if jugador_ia.tiene_stamina(8) :
+            jugador_ia.iniciar_golpe("patada_k")
+    elif accion == "defender" :
+        jugador_ia.cubrirse()
+    elif accion == "bola_energia" :
+        if jugador_ia.tiene_stamina(15) :
+            jugador_ia.iniciar_lanzar_bola()
+    elif accion == "kamehameha" :
+        if jugador_ia.tiene_stamina(50) :
+            jugador_ia.iniciar_kamehameha()
+    elif accion == "movimiento_final" :
+        if jugador_ia.tiene_stamina(80) :
+            jugador_ia.iniciar_movimiento_final()
+    elif accion == "esperar" :
+        # No hacer nada, recuperar stamina
+        jugador_ia.estado = "inicio"
+        jugador_ia.sprite = jugador_ia.sprites["inicio"]
+
+
+def _acercarse_al_oponente(jugador_ia : Player, oponente : Player) :
+    """Se acerca al oponente"""
+    velocidad = 3.5
+    if jugador_ia.x < oponente.x :
+        jugador_ia.x += velocidad
+        jugador_ia.estado = "derecha" if jugador_ia.mirando_derecha else "izquierda"
+    else :
+        jugador_ia.x -= velocidad
+        jugador_ia.estado = "izquierda" if jugador_ia.mirando_derecha else "derecha"
+    
+    jugador_ia.sprite = jugador_ia.sprites[jugador_ia.estado]
+
+
+def _alejarse_del_oponente(jugador_ia : Player, oponente : Player) :
+    """Se aleja del oponente"""
+    velocidad = 4.0
+    if jugador_ia.x < oponente.x :
+        jugador_ia.x -= velocidad
+        jugador_ia.estado = "izquierda" if jugador_ia.mirando_derecha else "derecha"
+    else :
+        jugador_ia.x += velocidad
+        jugador_ia.estado = "derecha" if not jugador_ia.mirando_derecha else "izquierda"
+    
+    jugador_ia.sprite = jugador_ia.sprites[jugador_ia.estado]
+
+
+class PlanIA :
+    """Plan condicional compilado : la primera regla que se cumple decide la accion"""
+    
+    def __init__(self, reglas : List[Regla], duracion : int, razon : str = "") :
+        """Inicializa el plan con sus reglas ya compiladas"""
+        self.reglas = reglas
+        self.duracion = duracion
+        self.razon = razon
+    
+    @classmethod
+    def desde_respuesta(cls, respuesta : Dict[str, Any], duracion_defecto : int, duracion_maxima : int, max_reglas : int) -> Optional["PlanIA"] :
+        """Compila la respuesta de Gemini (None si no es un plan valido)"""
+        # Compatibilidad con el formato de una sola accion
+        if "plan" not in respuesta :
+            accion = respuesta.get("accion")
+            if accion not in ACCIONES :
+                return None
+            return cls([((), accion)], duracion_defecto, respuesta.get("razon", ""))
+        
+        reglas : List[Regla] = []
+        try :
+            for paso in respuesta["plan"][:max_reglas] :
+                accion = paso.get("accion")
+                if accion not in ACCIONES :
+                    continue
+                condiciones = tuple(_compilar_condicion(variable, valor) for variable, valor in (paso.get("si") or {}).items())
+                reglas.append((condiciones, accion))
+            duracion = int(respuesta.get("duracion", duracion_defecto))
+        except (AttributeError, TypeError, ValueError) :
+            return None
+        
+        if not reglas :
+            return None
+        return cls(reglas, max(0, min(duracion, duracion_maxima)), respuesta.get("razon", ""))
+    
+    def elegir_accion(self, valores : Dict[str, float]) -> Optional[str] :
+        """Evalua las reglas en orden (None si ninguna se cumple)"""
+        for condiciones, accion in self.reglas :
+            for variable, funcion, umbral in condiciones :
+                if not funcion(valores[variable], umbral) :
+                    break
+            else :
+                return accion
+        return None
\ No newline at end of file
@@ -0,0 +1,194 @@
+# Politica destilada de la IA
+# Registra pares (estado, accion) de Gemini, entrena un MLP chico con NumPy y lo ejecuta sin red
+
+import argparse
+import os
+import struct
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+from src.entities.player import Player
+from src.managers.persistence_writer import obtener_escritor
+from src.systems.ai import AIController, DificultadType
+from src.systems.plan_interpreter import ACCIONES, VARIABLES, ejecutar_accion, medir
+from src.utils.config import GeminiConfig, Paths
+
+# Registro : las variables del plan en float32 + indice de accion
+FORMATO_MUESTRA = struct.Struct(f"<{len(VARIABLES)}fB")
+TIPO_MUESTRA = np.dtype([("x", "<f4", (len(VARIABLES),)), ("accion", "u1")])
+
+# Acciones que se repiten entre ticks del planificador
+ACCIONES_CONTINUAS = ("acercarse", "alejarse")
+
+
+class RegistroDecisiones :
+    """Archivo binario de muestras (estado, accion) para entrenar la politica"""
+    
+    def __init__(self, ruta : str = Paths.DATASET_IA, intervalo : int = GeminiConfig.INTERVALO_MUESTRA, muestras_por_escritura : int = GeminiConfig.MUESTRAS_POR_ESCRITURA) :
+        """Inicializa el registro; el archivo lo escribe el hilo de persistencia"""
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.muestras_por_escritura = muestras_por_escritura
+        self.pendientes = bytearray()
+        self.ultima_muestra = 0
+        self.muestras = 0
+    
+    def registrar(self, valores : Dict[str, float], accion : str, ahora : int) :
+        """Agrega una muestra (como maximo una por intervalo); cada lote completo se encola"""
+        if ahora - self.ultima_muestra < self.intervalo :
+            return
+        self.ultima_muestra = ahora
+        self.pendientes += FORMATO_MUESTRA.pack(*(valores[v] for v in VARIABLES), ACCIONES.index(accion))
+        self.muestras += 1
+        if len(self.pendientes) >= self.muestras_por_escritura * FORMATO_MUESTRA.size :
+            self._encolar()
+    
+    def _encolar(self) :
+        """Pasa las muestras pendientes al hilo de persistencia"""
+        if self.pendientes :
+            obtener_escritor().encolar(agregar_muestras, self.ruta, bytes(self.pendientes))
+            self.pendientes.clear()
+    
+    def cerrar(self) :
+        """Encola las muestras que quedan"""
+        self._encolar()
+
+
+def agregar_muestras(ruta : str, datos : bytes) :
+    """Agrega muestras completas al final del registro (corre en el hilo de persistencia)"""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta, "ab") as f :
+        f.write(datos)
+
+
+def cargar_dataset(ruta : str = Paths.DATASET_IA) -> Tuple[np.ndarray, np.ndarray] :
+    """Retorna (X, y) del registro; ignora una muestra final incompleta"""
+    datos = np.fromfile(ruta, dtype=np.uint8)
+    completas = len(datos) // TIPO_MUESTRA.itemsize
+    muestras = datos[:completas * TIPO_MUESTRA.itemsize].view(TIPO_MUESTRA)
+    return muestras["x"].astype(np.float32), muestras["accion"].astype(np.int64)
+
+
+def entrenar(x : np.ndarray, y : np.ndarray, ocultas : int = 16, epocas : int = 400, tasa : float = 0.1, semilla : int = 0) -> Dict[str, np.ndarray] :
+    """Ajusta un MLP de una capa oculta (tanh + softmax) por descenso de gradiente"""
+    rng = np.random.default_rng(semilla)
+    media = x.mean(axis=0)
+    escala = x.std(axis=0) + 1e-6
+    xn = (x - media) / escala
+    objetivo = np.eye(len(ACCIONES), dtype=np.float32)[y]
+    
+    w1 = rng.normal(0, 1 / np.sqrt(x.shape[1]), (x.shape[1], ocultas)).astype(np.float32)
+    b1 = np.zeros(ocultas, dtype=np.float32)
+    w2 = rng.normal(0, 1 / np.sqrt(ocultas), (ocultas, len(ACCIONES))).astype(np.float32)
+    b2 = np.zeros(len(ACCIONES), dtype=np.float32)
+    
+    for _ in range(epocas) :
+        oculta = np.tanh(xn @ w1 + b1)
+        logits = oculta @ w2 + b2
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        
+        # Gradiente de la entropia cruzada
+        d_logits = (probs - objetivo) / len(x)
+        d_oculta = (d_logits @ w2.T) * (1 - oculta ** 2)
+        w2 -= tasa * oculta.T @ d_logits
+        b2 -= tasa * d_logits.sum(axis=0)
+        w1 -= tasa * xn.T @ d_oculta
+        b1 -= tasa * d_oculta.sum(axis=0)
+    
+    return {"media" : media, "escala" : escala, "w1" : w1, "b1" : b1, "w2" : w2, "b2" : b2}
+
+
+class PoliticaDestilada :
+    """MLP entrenado : estado -> accion"""
+    
+    def __init__(self, pesos : Dict[str, np.ndarray]) :
+        """Inicializa la politica; la normalizacion se pliega en la primera capa"""
+        self.w1 = (pesos["w1"] / pesos["escala"][:, None]).astype(np.float32)
+        self.b1 = (pesos["b1"] - (pesos["media"] / pesos["escala"]) @ pesos["w1"]).astype(np.float32)
+        self.w2 = pesos["w2"]
+        self.b2 = pesos["b2"]
+        self.x = np.zeros(len(VARIABLES), dtype=np.float32)
+    
+    @classmethod
+    def cargar(cls, ruta : str = Paths.MODELO_IA) -> "PoliticaDestilada" :
+        """Carga los pesos guardados por el comando de entrenamiento"""
+        with np.load(ruta) as datos :
+            return cls({clave : datos[clave] for clave in datos.files})
+    
+    def predecir(self, valores : Dict[str, float]) -> str :
+        """Accion mas probable para el estado"""
+        for i, variable in enumerate(VARIABLES) :
+            self.x[i] = valores[variable]
+        logits = np.tanh(self.x @ self.w1 + self.b1) @ self.w2 + self.b2
+        return ACCIONES[int(logits.argmax())]
+
+
+class DistilledAIController(AIController) :
+    """IA local que imita a Gemini con la politica destilada (sin red ni latencia)"""
+    
+    def __init__(self, jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "normal", politica : Optional[PoliticaDestilada] = None, semilla : Optional[int] = None) :
+        """Inicializa el controlador con la politica entrenada"""
+        super().__init__(jugador_ia, jugador_oponente, dificultad, semilla)
+        self.politica = politica or PoliticaDestilada.cargar()
+        self.accion : Optional[str] = None
+    
+    def _decidir(self, ahora : int) :
+        """Tick de decision (lo llama AIController.actualizar via el planificador) : ejecuta la accion que predice la politica"""
+        self.accion = self.politica.predecir(medir(self.jugador_ia, self.jugador_oponente))
+        if self.accion == "defender" :
+            self.ultimo_ataque = ahora
+        ejecutar_accion(self.jugador_ia, self.jugador_oponente, self.accion)
+        self._aplicar_limites()
+    
+    def _repetir_movimiento(self) :
+        """Entre ticks repite la ultima accion si es un desplazamiento (los ataques no se repiten)"""
+        if self.accion in ACCIONES_CONTINUAS :
+            ejecutar_accion(self.jugador_ia, self.jugador_oponente, self.accion)
+            self._aplicar_limites()
+
+
+def crear_controlador_local(jugador_ia : Player, jugador_oponente : Player, dificultad : DificultadType = "normal", semilla : Optional[int] = None) -> AIController :
+    """IA sin red : la politica destilada si hay un modelo entrenado, si no la tradicional"""
+    if os.path.exists(Paths.MODELO_IA) :
+        try :
+            return DistilledAIController(jugador_ia, jugador_oponente, dificultad, semilla=semilla)
+        except Exception as e :
+            print(f"⚠️ No se pudo cargar el modelo de IA : {e}")
+    return AIController(jugador_ia, jugador_oponente, dificultad, semilla)
+
+
+def main() :
+    """Comando de entrenamiento : python -m src.systems.policy_model"""
+    parser = argparse.ArgumentParser(description="Entrena la politica destilada a partir del registro de Gemini")
+    parser.add_argument("--dataset", default=Paths.DATASET_IA)
+    parser.add_argument("--modelo", default=Paths.MODELO_IA)
+    parser.add_argument("--ocultas", type=int, default=16)
+    parser.add_argument("--epocas", type=int, default=400)
+    parser.add_argument("--tasa", type=float, default=0.1)
+    argumentos = parser.parse_args()
+    
+    x, y = cargar_dataset(argumentos.dataset)
+    if len(x) == 0 :
+        print("El dataset esta vacio : juega contra Gemini para registrar decisiones")
+        return
+    
+    inicio = time.perf_counter()
+    pesos = entrenar(x, y, argumentos.ocultas, argumentos.epocas, argumentos.tasa)
+    print(f"Entrenado con {len(x)} muestras en {time.perf_counter() - inicio:.2f} s")
+    
+    # Precision sobre el propio dataset y costo por decision
+    politica = PoliticaDestilada(pesos)
+    aciertos = sum(politica.predecir(dict(zip(VARIABLES, fila))) == ACCIONES[etiqueta] for fila, etiqueta in zip(x, y))
+    valores = dict(zip(VARIABLES, x[0]))
+    inicio = time.perf_counter()
+    for _ in range(1000) :
+        politica.predecir(valores)
+    print(f"Precision : {aciertos / len(x):.1%} - {(time.perf_counter() - inicio) * 1000:.1f} us por decision")
+    
+    np.savez(argumentos.modelo, **pesos)
+    print(f"Modelo guardado en {argumentos.modelo}")
+
+
+if __name__ == "__main__" :
+    main()
\ No newline at end of file
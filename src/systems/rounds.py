@@ -3,9 +3,11 @@
 
 import pygame
 import sys
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
 from src.entities.player import Player
-from src.utils.config import (ANCHO, ALTO, AMARILLO, NEGRO, BLANCO, NARANJA, ROJO, FPS, RoundsConfig, TimeConfig)
+from src.utils.events import DatosEvento, EventBus, EventoCombate
+from src.utils.clock import tiempo_juego
+from src.utils.config import (ANCHO, ALTO, AMARILLO, NEGRO, BLANCO, NARANJA, ROJO, FPS, RecordsConfig, RoundsConfig, TimeConfig)
 
 
 class RoundsManager :
@@ -41,6 +43,8 @@ class RoundsManager :
             "dano_recibido" : 0
         }
         self.tiempo_inicio_pelea_total = 0
+        self.semilla_partida : Optional[int] = None  # Se guarda con el record
+        self.contexto_partida : Dict[str, str] = {}  # Personajes, mapa y dificultad (filtros del ranking)
         
         # Fuentes
         try :
@@ -62,7 +66,7 @@ class RoundsManager :
         
         self.stats_jugador1 = {"golpes_totales" : 0, "dano_causado" : 0, "dano_recibido" : 0}
         self.stats_jugador2 = {"golpes_totales" : 0, "dano_causado" : 0, "dano_recibido" : 0}
-        self.tiempo_inicio_pelea_total = pygame.time.get_ticks()
+        self.tiempo_inicio_pelea_total = tiempo_juego()
     
     def terminar_round(self, ganador : int) :
         """Termina el round actual"""
@@ -83,10 +87,30 @@ class RoundsManager :
         self.tiempo_cuenta_regresiva = pygame.time.get_ticks()
         self.round_actual += 1
     
-    def actualizar_estadisticas(self, stats : dict) :
-        """Actualiza las estadisticas desde el sistema de colisiones"""
-        self.stats_jugador1 = stats["jugador1"]
-        self.stats_jugador2 = stats["jugador2"]
+    def conectar_eventos(self, eventos : EventBus) :
+        """Suscribe las estadisticas a los impactos del combate"""
+        eventos.suscribir(EventoCombate.GOLPE, self._registrar_impacto)
+        eventos.suscribir(EventoCombate.BLOQUEO, self._registrar_impacto)
+    
+    def _registrar_impacto(self, evento : DatosEvento) :
+        """Acumula las estadisticas de un golpe o bloqueo"""
+        if evento.jugador == 1 :
+            atacante, defensor = self.stats_jugador1, self.stats_jugador2
+        else :
+            atacante, defensor = self.stats_jugador2, self.stats_jugador1
+        
+        # El Kamehameha suma daño pero no cuenta como golpe
+        if evento.ataque != "kamehameha" :
+            atacante["golpes_totales"] += 1
+        atacante["dano_causado"] += evento.dano
+        defensor["dano_recibido"] += evento.dano
+    
+    def obtener_estadisticas(self) -> Dict :
+        """Obtiene las estadisticas de combate"""
+        return {
+            "jugador1" : self.stats_jugador1.copy(),
+            "jugador2" : self.stats_jugador2.copy()
+        }
     
     def mostrar_animacion_ko(self, fondo : Optional[pygame.Surface], jugador1 : Player, jugador2 : Player, ui_manager) -> bool :
         """Muestra la animacion de KO"""
@@ -194,40 +218,42 @@ class RoundsManager :
     
     def mostrar_pantalla_final(self, es_modo_torre : bool = False) -> Literal["menu", "rematch"] :
         """Muestra la pantalla final con estadisticas"""
-        from src.managers.records_manager import RecordsManager
+        from src.managers.records_manager import obtener_records_manager
         
         ganador_num = 1 if self.rounds_jugador1 > self.rounds_jugador2 else 2
         ganador = "JUGADOR 1" if ganador_num == 1 else "JUGADOR 2"
         
-        tiempo_total = (pygame.time.get_ticks() - self.tiempo_inicio_pelea_total) // 1000
+        tiempo_total = (tiempo_juego() - self.tiempo_inicio_pelea_total) // 1000
         
         # En modo torre, retornar automaticamente
         if es_modo_torre :
             pygame.time.wait(2000)
             return "menu"
         
-        # Sistema de input de nombre
+        # Sistema de input de nombre : solo si gano el jugador 1 y el puntaje entra al top. Toda pelea terminada se archiva
+        # (sin nombre si no entra, si se cancela con ESC o si se cierra la ventana; las derrotas no compiten en el ranking)
+        records_manager = obtener_records_manager()
         nombre_input = ""
-        ingresando_nombre = (ganador_num == 1)
+        ingresando_nombre = ganador_num == 1 and records_manager.califica_1vs1(self.stats_jugador1, self.rounds_jugador1, tiempo_total)
+        if not ingresando_nombre :
+            self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, tiempo_total)
         cursor_visible = True
         ultimo_parpadeo = pygame.time.get_ticks()
         
         while True :
             for evento in pygame.event.get() :
                 if evento.type == pygame.QUIT :
+                    if ingresando_nombre :
+                        self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, tiempo_total)
                     pygame.quit()
                     sys.exit()
                 elif evento.type == pygame.KEYDOWN :
                     if ingresando_nombre :
                         if evento.key == pygame.K_RETURN and len(nombre_input) > 0 :
-                            records_manager = RecordsManager()
-                            records_manager.agregar_record(
-                                nombre_input,
-                                self.stats_jugador1,
-                                self.stats_jugador2,
-                                self.rounds_jugador1,
-                                self.rounds_jugador2,
-                                tiempo_total)
+                            self._guardar_record(records_manager, nombre_input, tiempo_total)
+                            ingresando_nombre = False
+                        elif evento.key == pygame.K_ESCAPE :
+                            self._guardar_record(records_manager, RecordsConfig.NOMBRE_ANONIMO, tiempo_total)
                             ingresando_nombre = False
                         elif evento.key == pygame.K_BACKSPACE :
                             nombre_input = nombre_input[ :-1]
@@ -250,6 +276,18 @@ class RoundsManager :
             pygame.display.flip()
             self.reloj.tick(FPS)
     
+    def _guardar_record(self, records_manager, nombre : str, tiempo_total : int) :
+        """Guarda el resultado del jugador 1"""
+        records_manager.agregar_record(
+            nombre,
+            self.stats_jugador1,
+            self.stats_jugador2,
+            self.rounds_jugador1,
+            self.rounds_jugador2,
+            tiempo_total,
+            self.semilla_partida,
+            self.contexto_partida)
+    
     def _dibujar_texto_centrado(self, texto : str, color : tuple, y : int) :
         """Dibuja texto centrado con sombra"""
         texto_render = self.fuente_grande.render(texto, True, color)
@@ -287,7 +325,7 @@ class RoundsManager :
         input_render = self.fuente_media.render(texto_input, True, AMARILLO)
         self.pantalla.blit(input_render, (ANCHO // 2 - input_render.get_width() // 2, 170))
         
-        instruccion = self.fuente_pequena.render("ENTER para guardar", True, NARANJA)
+        instruccion = self.fuente_pequena.render("ENTER para guardar | ESC sin nombre", True, NARANJA)
         self.pantalla.blit(instruccion, (ANCHO // 2 - instruccion.get_width() // 2, 220))
     
     def _dibujar_estadisticas_finales(self, tiempo_total : int) :
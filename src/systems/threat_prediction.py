@@ -0,0 +1,89 @@
+# Prediccion de amenazas a distancia
+# Tiempo hasta el impacto de bolas y rayos que vienen hacia la IA (movimiento lineal, forma cerrada)
+
+from typing import List, Optional
+from src.entities.player import Player
+from src.utils.clock import tiempo_juego
+from src.utils.config import FPS
+
+# Slots del buffer : [frames hasta el impacto, subida para esquivar, bajada para esquivar]
+CAPACIDAD_AMENAZAS = 8
+
+# La punta del Kamehameha aparece a los 100 ms y avanza velocidad_expansion cada 10 ms
+RETARDO_RAYO = 100
+MS_POR_FRAME = 1000 / FPS
+
+
+class PredictorAmenazas :
+    """Calcula en cada tick las amenazas que cruzan la franja vertical del defensor"""
+    
+    def __init__(self, capacidad : int = CAPACIDAD_AMENAZAS) :
+        """Reserva el buffer de amenazas (no se asigna memoria por tick)"""
+        self.buffer : List[List[float]] = [[0.0, 0.0, 0.0] for _ in range(capacidad)]
+        self.cantidad = 0
+        self.indice_proxima = -1
+    
+    def actualizar(self, defensor : Player, atacante : Player) -> int :
+        """Recalcula las amenazas del atacante contra el defensor y retorna cuantas hay"""
+        self.cantidad = 0
+        self.indice_proxima = -1
+        rect = defensor.rect
+        
+        # Bolas de energia (incluye las del movimiento final) : velocidad constante en x
+        for bola in atacante.bolas_activas :
+            mitad = bola.rect.width / 2
+            if bola.direccion :
+                frames = (rect.left - (bola.x + mitad)) / bola.velocidad
+                pasada = bola.x - mitad >= rect.right
+            else :
+                frames = ((bola.x - mitad) - rect.right) / bola.velocidad
+                pasada = bola.x + mitad <= rect.left
+            if not pasada :
+                self._agregar(max(0.0, frames), bola.rect.top, bola.rect.bottom, rect)
+        
+        # Kamehameha : la punta avanza a velocidad constante hasta impactar o terminar
+        rayo = atacante.kamehameha_activo
+        if rayo and rayo.activo and not rayo.impacto and rayo.imagen_final :
+            transcurrido = tiempo_juego() - rayo.tiempo_inicio
+            velocidad = rayo.velocidad_expansion * MS_POR_FRAME / 10
+            distancia = max(0.0, (transcurrido - RETARDO_RAYO) / 10 * rayo.velocidad_expansion)
+            ancho_punta = rayo.imagen_final.get_width()
+            if rayo.direccion :
+                hueco = rect.left - (rayo.origen_x + distancia + ancho_punta)
+            else :
+                hueco = (rayo.origen_x - distancia - ancho_punta) - rect.right
+            frames = max(0.0, hueco / velocidad) + max(0, RETARDO_RAYO - transcurrido) / MS_POR_FRAME
+            
+            # Solo cuenta si llega antes de que el rayo termine
+            if transcurrido + frames * MS_POR_FRAME <= rayo.duracion :
+                alto = max(imagen.get_height() for imagen in (rayo.imagen_inicio, rayo.imagen_cuerpo, rayo.imagen_final) if imagen)
+                centro_y = rayo.origen_y + rayo.sprite_personaje.get_height() // 2
+                self._agregar(frames, centro_y - alto // 2, centro_y + alto - alto // 2, rect)
+        
+        return self.cantidad
+    
+    def _agregar(self, frames : float, arriba : float, abajo : float, rect) :
+        """Guarda la amenaza si cruza al defensor (con el buffer lleno reemplaza a la mas lejana)"""
+        if abajo <= rect.top or arriba >= rect.bottom :
+            return
+        
+        if self.cantidad < len(self.buffer) :
+            indice = self.cantidad
+            self.cantidad += 1
+        else :
+            indice = max(range(self.cantidad), key=lambda i : self.buffer[i][0])
+            if self.buffer[indice][0] <= frames :
+                return
+        
+        slot = self.buffer[indice]
+        slot[0] = frames
+        slot[1] = rect.bottom - arriba  # subir hasta quedar por encima
+        slot[2] = abajo - rect.top  # bajar hasta quedar por debajo
+        
+        if self.indice_proxima < 0 or frames < self.buffer[self.indice_proxima][0] :
+            self.indice_proxima = indice
+    
+    @property
+    def proxima(self) -> Optional[List[float]] :
+        """Slot de la amenaza que llega antes (None si no hay)"""
+        return self.buffer[self.indice_proxima] if self.indice_proxima >= 0 else None
\ No newline at end of file
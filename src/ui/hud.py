@@ -4,7 +4,8 @@
 import pygame
 from typing import Tuple, Optional
 from src.entities.player import Player
-from src.utils.config import (ANCHO, ALTO, AMARILLO, BLANCO, NEGRO, NARANJA, ROJO, Paths, COLOR_BARRA_VIDA, COLOR_BARRA_VIDA_FONDO, COLOR_BARRA_STAMINA, COLOR_BARRA_STAMINA_FONDO)
+from src.utils.config import (ANCHO, ALTO, AMARILLO, BLANCO, NEGRO, NARANJA, ROJO, Paths, TimeConfig, COLOR_BARRA_VIDA, COLOR_BARRA_VIDA_FONDO, COLOR_BARRA_STAMINA, COLOR_BARRA_STAMINA_FONDO)
+from src.utils.events import DatosEvento, EventBus, EventoCombate
 from src.utils.helpers import cargar_fuente
 
 
@@ -33,6 +34,20 @@ class HUDManager :
             self.icono_z = pygame.transform.scale(self.icono_z, (30, 30))
         except :
             self.icono_z = None
+        
+        # Destellos de la barra de vida al recibir impactos : jugador -> (tiempo, color)
+        self.destellos = {1 : (0, BLANCO), 2 : (0, BLANCO)}
+    
+    def conectar_eventos(self, eventos : EventBus) :
+        """Suscribe los destellos del HUD a los impactos del combate"""
+        eventos.suscribir(EventoCombate.GOLPE, self._registrar_destello)
+        eventos.suscribir(EventoCombate.BLOQUEO, self._registrar_destello)
+    
+    def _registrar_destello(self, evento : DatosEvento) :
+        """Marca un destello en la barra del jugador que recibio el impacto"""
+        defensor = 2 if evento.jugador == 1 else 1
+        color = BLANCO if evento.tipo == EventoCombate.GOLPE else COLOR_BARRA_STAMINA
+        self.destellos[defensor] = (pygame.time.get_ticks(), color)
     
     def dibujar_barras_jugadores(self, jugador1 : Player, jugador2 : Player, rounds_j1 : int, rounds_j2 : int) :
         """Dibuja las barras de vida y stamina de ambos jugadores"""
@@ -46,13 +61,13 @@ class HUDManager :
         espacio = 25
         
         # Jugador 1 (izquierda)
-        self._dibujar_hud_jugador(jugador1, rounds_j1, margen, margen, ancho_barra, alto_barra_vida, alto_barra_stamina, espacio, "JUGADOR 1", alineacion="izquierda")
+        self._dibujar_hud_jugador(jugador1, rounds_j1, margen, margen, ancho_barra, alto_barra_vida, alto_barra_stamina, espacio, "JUGADOR 1", alineacion="izquierda", numero=1)
         
         # Jugador 2 (derecha)
         x_j2 = ANCHO - margen - ancho_barra
-        self._dibujar_hud_jugador(jugador2, rounds_j2, x_j2, margen, ancho_barra, alto_barra_vida, alto_barra_stamina, espacio, "JUGADOR 2", alineacion="derecha")
+        self._dibujar_hud_jugador(jugador2, rounds_j2, x_j2, margen, ancho_barra, alto_barra_vida, alto_barra_stamina, espacio, "JUGADOR 2", alineacion="derecha", numero=2)
     
-    def _dibujar_hud_jugador(self, jugador : Player, rounds : int, x : int, y : int, ancho_barra : int, alto_vida : int, alto_stamina : int, espacio : int, nombre : str, alineacion : str = "izquierda") :
+    def _dibujar_hud_jugador(self, jugador : Player, rounds : int, x : int, y : int, ancho_barra : int, alto_vida : int, alto_stamina : int, espacio : int, nombre : str, alineacion : str = "izquierda", numero : int = 1) :
         """Dibuja el HUD de un jugador"""
         # Nombre
         texto_nombre = self.fuente_press_start.render(nombre, True, AMARILLO)
@@ -67,6 +82,11 @@ class HUDManager :
         y_vida = y + 25
         self._dibujar_barra(x, y_vida, ancho_barra, alto_vida, jugador.vida_actual, jugador.vida_maxima, COLOR_BARRA_VIDA_FONDO, COLOR_BARRA_VIDA)
         
+        # Destello por impacto reciente
+        tiempo_destello, color_destello = self.destellos[numero]
+        if pygame.time.get_ticks() - tiempo_destello < TimeConfig.DURACION_DESTELLO_HUD :
+            pygame.draw.rect(self.pantalla, color_destello, (x - 2, y_vida - 2, ancho_barra + 4, alto_vida + 4), 3)
+        
         # Barra de stamina
         y_stamina = y_vida + espacio
         self._dibujar_barra(x, y_stamina, ancho_barra, alto_stamina, jugador.stamina_actual, jugador.stamina_maxima, COLOR_BARRA_STAMINA_FONDO, COLOR_BARRA_STAMINA)
@@ -4,10 +4,11 @@
 import pygame
 import sys
 from typing import Optional, List, Dict, Tuple
-from src.utils.config import (ANCHO, ALTO, NARANJA, AMARILLO, NEGRO, FPS_MENU, BLANCO, ROJO, VERDE, Paths)
+from src.utils.config import (ANCHO, ALTO, NARANJA, AMARILLO, NEGRO, FPS_MENU, BLANCO, ROJO, VERDE, MORADO, Paths, TowerConfig)
 from src.utils.helpers import cargar_fuente, crear_overlay, parpadeo
 from src.managers.audio_manager import AudioManager
-from src.managers.records_manager import RecordsManager
+from src.managers.records_manager import obtener_records_manager
+from src.managers.tower_manager import hay_torre_guardada
 
 
 class MenuManager :
@@ -136,8 +137,10 @@ class MenuManager :
     # MENU DE MODO DE JUEGO
     
     def menu_modo_juego(self) -> str :
-        """Menu para elegir modo de juego"""
+        """Menu para elegir modo de juego (Continuar Torre solo si hay una guardada)"""
         opciones = ["Pelea Rapida", "Modo Torre", "Volver"]
+        if hay_torre_guardada() :
+            opciones.insert(2, "Continuar Torre")
         seleccion = 0
         
         while True :
@@ -190,7 +193,8 @@ class MenuManager :
         dificultades = [
             {"nombre" : "FACIL", "descripcion" : "Para principiantes", "color" : VERDE},
             {"nombre" : "NORMAL", "descripcion" : "Desafio equilibrado", "color" : AMARILLO},
-            {"nombre" : "DIFICIL", "descripcion" : "Solo para expertos", "color" : ROJO}
+            {"nombre" : "DIFICIL", "descripcion" : "Solo para expertos", "color" : ROJO},
+            {"nombre" : "EXPERTO", "descripcion" : "Anticipa cada jugada", "color" : MORADO}
         ]
         seleccion = 1  # Empezar en Normal
         
@@ -229,8 +233,8 @@ class MenuManager :
         titulo = self.fuente_grande.render("SELECCIONA DIFICULTAD", True, AMARILLO)
         self.pantalla.blit(titulo, (ANCHO // 2 - titulo.get_width() // 2, 80))
         
-        y_inicial = 200
-        espacio_y = 120
+        y_inicial = 180
+        espacio_y = 100
         
         for i, dif in enumerate(dificultades) :
             y_pos = y_inicial + i * espacio_y
@@ -556,27 +560,39 @@ class MenuManager :
     
     def mostrar_records_1vs1(self) :
         """Muestra los records 1vs1"""
-        records_manager = RecordsManager()
-        records = records_manager.obtener_top_records_1vs1(8)
-        
-        while True :
-            for evento in pygame.event.get() :
-                if evento.type == pygame.QUIT :
-                    pygame.quit()
-                    sys.exit()
-                elif evento.type == pygame.KEYDOWN :
-                    if evento.key in [pygame.K_ESCAPE, pygame.K_RETURN] :
-                        return
-            
-            self._dibujar_tabla_records(records, "RECORDS 1vs1", es_torre=False)
-            self.reloj.tick(FPS_MENU)
+        self.mostrar_records("1vs1", "RECORDS 1vs1")
     
     def mostrar_records_torre(self) :
         """Muestra los records de torre"""
-        records_manager = RecordsManager()
-        records = records_manager.obtener_top_records_torre(8)
-        
+        self.mostrar_records("torre", "RECORDS TORRE")
+    
+    def mostrar_records(self, modo : str, titulo : str) :
+        """Ranking paginado con filtros : P personaje, R rival, M mapa, D dificultad, F fecha"""
+        records_manager = obtener_records_manager()
+        por_pagina = 8
+        pagina = 0
+        
+        # Cada filtro recorre sus valores; None = todos
+        opciones = {
+            "personaje" : [None] + [p["id"] for p in self.personajes_data],
+            "mapa" : [None] + [m["ruta"] for m in self.mapas_data],
+            "dificultad" : [None, "facil", "normal", "dificil", "experto"] if modo == "1vs1" else [None, TowerConfig.DIFICULTAD_ESCALONADA, "experto"],
+            "dias" : [None, 1, 7, 30]
+        }
+        teclas = {pygame.K_p : "personaje", pygame.K_m : "mapa", pygame.K_d : "dificultad", pygame.K_f : "dias"}
+        if modo == "1vs1" :
+            opciones["rival"] = opciones["personaje"]
+            teclas[pygame.K_r] = "rival"
+        indices = {filtro : 0 for filtro in opciones}
+        
+        actualizar = True
         while True :
+            if actualizar :
+                filtros = {filtro : opciones[filtro][indice] for filtro, indice in indices.items()}
+                records, total = records_manager.consultar_records(modo, pagina, por_pagina, **filtros)
+                paginas = max(1, (total + por_pagina - 1) // por_pagina)
+                actualizar = False
+            
             for evento in pygame.event.get() :
                 if evento.type == pygame.QUIT :
                     pygame.quit()
@@ -584,17 +600,46 @@ class MenuManager :
                 elif evento.type == pygame.KEYDOWN :
                     if evento.key in [pygame.K_ESCAPE, pygame.K_RETURN] :
                         return
+                    elif evento.key == pygame.K_LEFT and pagina > 0 :
+                        pagina -= 1
+                        actualizar = True
+                    elif evento.key == pygame.K_RIGHT and pagina < paginas - 1 :
+                        pagina += 1
+                        actualizar = True
+                    elif evento.key in teclas :
+                        filtro = teclas[evento.key]
+                        indices[filtro] = (indices[filtro] + 1) % len(opciones[filtro])
+                        pagina = 0
+                        actualizar = True
+                        self.audio_manager.reproducir_sonido("cursor")
             
-            self._dibujar_tabla_records(records, "RECORDS TORRE", es_torre=True)
+            self._dibujar_tabla_records(records, titulo, modo == "torre", pagina * por_pagina, self._texto_filtros(filtros), f"PAGINA {pagina + 1}/{paginas}")
             self.reloj.tick(FPS_MENU)
     
-    def _dibujar_tabla_records(self, records : List[Dict], titulo : str, es_torre : bool) :
-        """Dibuja la tabla de records"""
+    def _texto_filtros(self, filtros : Dict) -> str :
+        """Resumen de los filtros activos"""
+        partes = []
+        for filtro, valor in filtros.items() :
+            if valor is None :
+                continue
+            if filtro == "mapa" :
+                valor = next((m["nombre"] for m in self.mapas_data if m["ruta"] == valor), valor)
+            elif filtro == "dias" :
+                valor = f"ultimos {valor} dias"
+            partes.append(str(valor).upper())
+        return " | ".join(partes) if partes else "TODOS"
+    
+    def _dibujar_tabla_records(self, records : List[Dict], titulo : str, es_torre : bool, inicio : int = 0, filtros : str = "", pagina : str = "") :
+        """Dibuja la tabla de records (inicio : posicion del primero en el ranking filtrado)"""
         self.pantalla.fill((10, 10, 30))
         
         titulo_render = self.fuente_grande.render(titulo, True, AMARILLO)
         self.pantalla.blit(titulo_render, (ANCHO // 2 - titulo_render.get_width() // 2, 30))
         
+        if filtros :
+            filtros_render = self.fuente_pequena.render(filtros, True, BLANCO)
+            self.pantalla.blit(filtros_render, (ANCHO // 2 - filtros_render.get_width() // 2, 72))
+        
         if len(records) == 0 :
             texto = self.fuente_media.render("No hay records aun", True, BLANCO)
             self.pantalla.blit(texto, (ANCHO // 2 - texto.get_width() // 2, ALTO // 2))
@@ -615,7 +660,7 @@ class MenuManager :
             
             # Records
             y = 140
-            for i, record in enumerate(records) :
+            for i, record in enumerate(records, inicio) :
                 if i == 0 :
                     color = (255, 215, 0)  # Oro
                 elif i == 1 :
@@ -644,7 +689,13 @@ class MenuManager :
                 
                 y += 50
         
-        instrucciones = self.fuente_pequena.render("ESC o ENTER para volver", True, NARANJA)
+        if pagina :
+            pagina_render = self.fuente_pequena.render(f"< {pagina} >", True, AMARILLO)
+            self.pantalla.blit(pagina_render, (ANCHO // 2 - pagina_render.get_width() // 2, ALTO - 70))
+            texto = "P/R/M/D/F : filtros | ESC : volver" if not es_torre else "P/M/D/F : filtros | ESC : volver"
+        else :
+            texto = "ESC o ENTER para volver"
+        instrucciones = self.fuente_pequena.render(texto, True, NARANJA)
         self.pantalla.blit(instrucciones, (ANCHO // 2 - instrucciones.get_width() // 2, ALTO - 40))
         
         pygame.display.flip()
@@ -0,0 +1,36 @@
+# Reloj de simulacion
+# Fuente de tiempo de las entidades : tiempo real o derivado del numero de frame
+
+import pygame
+from typing import Optional
+from src.utils.config import FPS
+
+
+class RelojSimulacion :
+    """Reloj de la simulacion (en modo determinista el tiempo sale del frame)"""
+    
+    def __init__(self) :
+        """Inicializa el reloj en tiempo real"""
+        self.frame : Optional[int] = None
+    
+    def fijar_frame(self, frame : int) :
+        """Pasa a modo determinista : el tiempo corresponde al frame indicado"""
+        self.frame = frame
+    
+    def usar_tiempo_real(self) :
+        """Vuelve a usar el reloj de pygame"""
+        self.frame = None
+    
+    def ms(self) -> int :
+        """Retorna el tiempo actual de la simulacion en milisegundos"""
+        if self.frame is None :
+            return pygame.time.get_ticks()
+        return self.frame * 1000 // FPS
+
+
+RELOJ = RelojSimulacion()
+
+
+def tiempo_juego() -> int :
+    """Tiempo de la simulacion en milisegundos"""
+    return RELOJ.ms()
\ No newline at end of file
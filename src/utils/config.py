@@ -21,6 +21,7 @@ BLANCO = (255, 255, 255)
 ROJO = (255, 0, 0)
 VERDE = (0, 255, 0)
 AZUL = (0, 0, 255)
+MORADO = (170, 0, 255)
 
 # Colores UI
 COLOR_BARRA_VIDA = (0, 255, 0)
@@ -94,6 +95,39 @@ class CombatConfig :
     REDUCCION_DANO_CUBIERTO = 0.3  # 70% de reduccion
 
 
+# FRAME DATA DE ATAQUES
+
+class FrameDataConfig :
+    """Frame data de los ataques cuerpo a cuerpo (en frames a 60 FPS)"""
+    
+    # Formato : (startup, active, recovery, hitstop, hitboxes)
+    # Cada hitbox : (frames, ancho, alto, offset_x, offset_y)
+    # Cada hitbox de la lista es un impacto nuevo, sus frames suman "active"
+    DEFAULT = {
+        "golpe_j" : (2, 3, 2, 4, [(3, 60, 40, 0, 0)]),
+        "patada_k" : (4, 12, 6, 6, [(6, 60, 40, 0, 0), (6, 60, 40, 0, 0)]),
+    }
+    
+    PERSONAJES = {
+        "goku" : {
+            "golpe_j" : (2, 3, 2, 4, [(3, 60, 40, 0, 0)]),
+            "patada_k" : (6, 18, 6, 6, [(6, 55, 40, 0, 0), (6, 65, 45, 0, -10), (6, 70, 35, 0, 10)]),
+        },
+        "vegeta" : {
+            "golpe_j" : (2, 3, 2, 5, [(3, 60, 40, 0, 0)]),
+            "patada_k" : (4, 10, 4, 6, [(5, 60, 40, 0, 0), (5, 65, 40, 0, -5)]),
+        },
+        "freezer" : {
+            "golpe_j" : (3, 3, 2, 4, [(3, 65, 35, 0, -5)]),
+            "patada_k" : (1, 3, 2, 7, [(3, 70, 40, 0, 0)]),
+        },
+        "gohan" : {
+            "golpe_j" : (2, 3, 1, 3, [(3, 55, 40, 0, 0)]),
+            "patada_k" : (6, 12, 6, 5, [(6, 55, 40, 0, 0), (6, 60, 40, 0, 5)]),
+        },
+    }
+
+
 # PARAMETROS DE TIEMPO
 
 class TimeConfig :
@@ -107,10 +141,6 @@ class TimeConfig :
     DURACION_VS = 4000  # ms
     DURACION_COUNTDOWN = 4500  # ms
     
-    # Golpes
-    TIEMPO_FRAME_GOLPE = 100  # ms
-    TIEMPO_FRAME_PATADA = 100  # ms
-    
     # Proyectiles
     TIEMPO_ANIMACION_BOLA = 150  # ms
     VELOCIDAD_PROYECTIL = 12  # pixeles por frame
@@ -118,6 +148,9 @@ class TimeConfig :
     # Especiales
     DURACION_KAMEHAMEHA = 1000  # ms
     TIEMPO_FRAME_MOVIMIENTO_FINAL = 200  # ms
+    
+    # HUD
+    DURACION_DESTELLO_HUD = 150  # ms
 
 
 # ROUNDS
@@ -129,6 +162,59 @@ class RoundsConfig :
     DURACION_CUENTA_REGRESIVA = 4500  # ms
 
 
+# GEMINI
+
+class GeminiConfig :
+    """Configuracion del cliente HTTP de Gemini"""
+    
+    URL_API = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={}"
+    TIMEOUT = 2  # segundos
+    
+    # Pool de conexiones keep-alive (compartido entre las peleas)
+    TAMANO_POOL = 2
+    REINTENTOS = 2
+    BACKOFF = 0.1  # segundos, se duplica en cada reintento
+    ESTADOS_REINTENTO = (429, 500, 502, 503, 504)
+    
+    # Cache de decisiones por estado cuantizado : pasos mas gruesos y TTL mas largo
+    # dan mas aciertos (menos llamadas), pasos finos y TTL corto decisiones mas precisas
+    CACHE = {
+        "facil" : {"capacidad" : 256, "ttl" : 8000, "paso_distancia" : 80, "paso_porcentaje" : 25},
+        "normal" : {"capacidad" : 256, "ttl" : 4000, "paso_distancia" : 50, "paso_porcentaje" : 20},
+        "dificil" : {"capacidad" : 512, "ttl" : 2000, "paso_distancia" : 30, "paso_porcentaje" : 10},
+    }
+    
+    # Planes condicionales : cada respuesta cubre varios segundos de juego
+    DURACION_PLAN = {"facil" : 6000, "normal" : 4000, "dificil" : 3000}  # ms
+    DURACION_PLAN_MAXIMA = 8000  # ms, tope a la duracion que pida Gemini
+    ANTICIPACION_PLAN = 600  # ms antes de que expire el plan se pide el siguiente
+    MAX_REGLAS_PLAN = 8
+    
+    # Circuit breaker : tras varios fallos o latencia alta se juega con la IA local
+    FALLOS_MAXIMOS = 3
+    PRESUPUESTO_LATENCIA = 1500  # ms, p95 maximo aceptado
+    VENTANA_LATENCIAS = 20  # Ultimas consultas usadas para p50/p95
+    MIN_MUESTRAS_LATENCIA = 5
+    ENFRIAMIENTO = 15000  # ms con el circuito abierto antes de la consulta de prueba
+    
+    # Registro de decisiones para entrenar la politica destilada (python -m src.systems.policy_model); main.py --registrar-dataset
+    REGISTRAR_DATASET = False
+    INTERVALO_MUESTRA = 100  # ms entre muestras
+    MUESTRAS_POR_ESCRITURA = 10  # Muestras que se agrupan en cada escritura del hilo de persistencia
+
+
+# NETPLAY
+
+class NetplayConfig :
+    """Configuracion del netplay con rollback"""
+    
+    PUERTO = 7001
+    RETARDO_ENTRADA = 2  # Frames de retardo de la entrada local
+    MAX_ROLLBACK = 8  # Frames maximos a re-simular
+    PRESUPUESTO_RESIMULACION_MS = 16.0  # Tope de un rollback : la prediccion se acorta para no superarlo
+    MAX_ENTRADAS_PAQUETE = 32  # Entradas sin confirmar reenviadas por paquete
+
+
 # IA
 
 class IAConfig :
@@ -142,7 +228,8 @@ class IAConfig :
         "prob_defensa" : 0.3,
         "prob_especial" : 0.25,
         "distancia_ataque" : 110,
-        "distancia_minima" : 45
+        "distancia_minima" : 45,
+        "decisiones_por_segundo" : 15
     }
     
     # Dificultad NORMAL
@@ -153,7 +240,8 @@ class IAConfig :
         "prob_defensa" : 0.55,
         "prob_especial" : 0.5,
         "distancia_ataque" : 105,
-        "distancia_minima" : 40
+        "distancia_minima" : 40,
+        "decisiones_por_segundo" : 30
     }
     
     # Dificultad DIFICIL
@@ -164,8 +252,26 @@ class IAConfig :
         "prob_defensa" : 0.75,
         "prob_especial" : 0.7,
         "distancia_ataque" : 100,
-        "distancia_minima" : 35
+        "distancia_minima" : 35,
+        "decisiones_por_segundo" : 60  # un tick por frame : la maxima capacidad de reaccion
     }
+    
+    # Dificultad EXPERTO : busqueda hacia adelante sobre la simulacion rapida
+    EXPERTO = {
+        "velocidad" : 9,
+        "tiempo_reaccion" : 100,
+        "prob_ataque" : 1.0,
+        "prob_defensa" : 0.85,
+        "prob_especial" : 0.7,
+        "distancia_ataque" : 100,
+        "distancia_minima" : 35,
+        "horizonte" : 18,  # frames simulados por candidata (300 ms)
+        "presupuesto_ms" : 2.0,  # tiempo maximo de busqueda por decision
+        "decisiones_por_segundo" : 10
+    }
+    
+    # Tiempo maximo de decision por frame entre todas las IAs (el resto se posterga un frame)
+    PRESUPUESTO_US = 2500
 
 
 # RUTAS DE RECURSOS
@@ -200,10 +306,26 @@ class Paths :
     MUSICA_MENU = "Sonidos/Sonido_menu.wav"
     MUSICA_PELEA = "Sonidos/Sonido_pelea_1.wav"
     SONIDO_CURSOR = "Sonidos/Sonido_cursor.wav"
+    SONIDO_GOLPE = "Sonidos/Sonido_1golpe.wav"
+    SONIDO_BLOQUEO = "Sonidos/Sonido_1golpe_aire.wav"
+    SONIDO_ATURDIR = "Sonidos/Sonido_golpe_aturdir.wav"
+    SONIDO_PODER_LIGERO = "Sonidos/Sonido_poder_ligero.wav"
+    SONIDO_KAMEHAMEHA = "Sonidos/Sonido_poder_kamehameha.wav"
     
     # Datos
     RECORDS_1VS1 = "data/records.json"
     RECORDS_TORRE = "data/records_torre.json"
+    RECORDS_DB = "data/records.db"
+    
+    # IA destilada
+    DATASET_IA = "data/dataset_ia.bin"
+    MODELO_IA = "data/modelo_ia.npz"
+    
+    # Registro de partidas (un .npz por pelea)
+    PARTIDAS = "data/partidas/"
+    
+    # Progreso de la torre en curso
+    TORRE_GUARDADA = "data/torre_guardada.json"
 
 
 # CONFIGURACION DE TORRE
@@ -213,6 +335,12 @@ class TowerConfig :
     
     NUMERO_PELEAS = 3
     
+    # Version del archivo de progreso (uno de otra version se ignora)
+    VERSION_GUARDADO = 1
+    
+    # Dificultad con que se archiva una torre que no es experto : la IA sube facil -> normal -> dificil por pelea
+    DIFICULTAD_ESCALONADA = "escalonada"
+    
     # Puntajes
     PUNTOS_POR_PELEA_GANADA = 2000
     PUNTOS_POR_GOLPE = 15
@@ -238,6 +366,36 @@ class RecordsConfig :
     BONUS_TIEMPO_60 = 500   # < 1 minuto
     BONUS_TIEMPO_120 = 300  # < 2 minutos
     BONUS_TIEMPO_180 = 100  # < 3 minutos
+    
+    # Ranking en memoria y nombre de los resultados que no entran (solo van al archivo)
+    TOP_RECORDS = 10
+    NOMBRE_ANONIMO = "---"
+    
+    # Compactacion del journal (WAL) en segundo plano cada tantos records guardados
+    COMPACTAR_CADA = 50
+
+
+# CONFIGURACION DE PERSISTENCIA
+
+class PersistenceConfig :
+    """Configuracion del escritor en segundo plano"""
+    
+    COLA_MAXIMA = 64      # Escrituras en espera antes de frenar a quien encola
+    ESPERA_CIERRE = 5.0   # Segundos para vaciar la cola al salir
+
+
+# REGISTRO DE PARTIDAS
+
+class MatchLogConfig :
+    """Configuracion del registro de partidas para analisis de balance"""
+    
+    REGISTRAR = False  # Opcional : tambien con python main.py --registrar-partidas
+    MAX_FRAMES = 60 * 60 * 10  # 10 minutos a 60 FPS (se reservan al crear la pelea)
+    MAX_EVENTOS = 8192
+    
+    # Analisis (python -m src.systems.match_analytics)
+    ANCHO_BIN_DISTANCIA = 50  # px
+    CELDA_MAPA_CALOR = 40  # px
 
 
 # CONFIGURACION DE SPRITES
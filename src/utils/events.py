@@ -0,0 +1,55 @@
+# Bus de eventos de combate
+# Los sistemas publican lo que ocurre y los interesados se suscriben
+
+from enum import IntEnum
+from typing import Callable, List, NamedTuple
+
+
+class EventoCombate(IntEnum) :
+    """Tipos de eventos de combate"""
+    GOLPE = 0
+    BLOQUEO = 1
+    ATURDIMIENTO = 2
+    KO = 3
+    PROYECTIL = 4
+    ESPECIAL = 5
+    ATAQUE = 6      # Inicio de un golpe o patada (conecte o no)
+
+
+class DatosEvento(NamedTuple) :
+    """Datos de un evento de combate"""
+    tipo : EventoCombate
+    jugador : int       # Jugador que origina el evento (1 o 2)
+    dano : float = 0.0
+    ataque : str = ""
+
+
+CallbackEvento = Callable[[DatosEvento], None]
+
+
+class EventBus :
+    """Bus de eventos tipado y sin colas : despacha al publicar"""
+    
+    def __init__(self) :
+        """Inicializa el bus con una lista de suscriptores por tipo"""
+        self._suscriptores : List[List[CallbackEvento]] = [[] for _ in EventoCombate]
+    
+    def suscribir(self, tipo : EventoCombate, callback : CallbackEvento) :
+        """Registra un callback para un tipo de evento"""
+        if callback not in self._suscriptores[tipo] :
+            self._suscriptores[tipo].append(callback)
+    
+    def desuscribir(self, tipo : EventoCombate, callback : CallbackEvento) :
+        """Elimina un callback registrado"""
+        if callback in self._suscriptores[tipo] :
+            self._suscriptores[tipo].remove(callback)
+    
+    def publicar(self, tipo : EventoCombate, jugador : int, dano : float = 0.0, ataque : str = "") :
+        """Publica un evento a todos sus suscriptores"""
+        suscriptores = self._suscriptores[tipo]
+        if not suscriptores :
+            return
+        
+        evento = DatosEvento(tipo, jugador, dano, ataque)
+        for callback in suscriptores :
+            callback(evento)
\ No newline at end of file
@@ -0,0 +1,16 @@
+# Semillas de la partida
+# Cada controlador usa su propio random.Random derivado de la semilla de la partida
+
+import hashlib
+import random
+
+
+def nueva_semilla() -> int :
+    """Semilla aleatoria para una partida nueva (63 bits : entra en un entero con signo)"""
+    return random.SystemRandom().getrandbits(63)
+
+
+def derivar_semilla(semilla : int, *etiquetas) -> int :
+    """Semilla independiente para un flujo (jugador, entorno, pelea) a partir de la de la partida"""
+    texto = ":".join(str(parte) for parte in (semilla, *etiquetas))
+    return int.from_bytes(hashlib.blake2b(texto.encode(), digest_size=8).digest(), "big") >> 1
\ No newline at end of file
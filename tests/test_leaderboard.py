@@ -0,0 +1,57 @@
+# Pruebas del ranking acotado
+
+import random
+import unittest
+from src.managers.leaderboard import Leaderboard
+
+
+def record(puntaje : int, nombre : str = "AAA") -> dict :
+    """Record minimo para el ranking"""
+    return {"nombre" : nombre, "puntaje" : puntaje}
+
+
+class TestLeaderboard(unittest.TestCase) :
+    """Orden, capacidad y desempates del top K"""
+    
+    def test_coincide_con_ordenar_todo(self) :
+        """Insertar de a uno da los mismos K primeros que ordenar la lista completa (orden estable)"""
+        azar = random.Random(7)
+        ranking = Leaderboard(10)
+        todos = []
+        for i in range(500) :
+            nuevo = record(azar.randrange(50), f"{i}")
+            todos.append(nuevo)
+            ranking.insertar(nuevo)
+        
+        esperado = sorted(todos, key=lambda r : -r["puntaje"])[ :10]
+        self.assertEqual(ranking.top(10), esperado)
+    
+    def test_insertar_retorna_el_desplazado(self) :
+        """Con el ranking lleno sale el ultimo; un puntaje que no califica vuelve tal cual"""
+        ranking = Leaderboard(2)
+        self.assertIsNone(ranking.insertar(record(10, "A")))
+        self.assertIsNone(ranking.insertar(record(20, "B")))
+        self.assertEqual(ranking.insertar(record(15, "C"))["nombre"], "A")
+        
+        bajo = record(5, "D")
+        self.assertIs(ranking.insertar(bajo), bajo)
+        self.assertEqual([r["nombre"] for r in ranking.top(2)], ["B", "C"])
+    
+    def test_empate_con_el_ultimo_no_califica(self) :
+        """El record mas antiguo conserva su lugar ante un empate"""
+        ranking = Leaderboard(2)
+        ranking.cargar([record(30), record(10)])
+        self.assertFalse(ranking.califica(10))
+        self.assertTrue(ranking.califica(11))
+    
+    def test_cargar_recorta_a_la_capacidad(self) :
+        """cargar toma solo los primeros K y reinicia el estado"""
+        ranking = Leaderboard(3)
+        ranking.insertar(record(99))
+        ranking.cargar([record(p) for p in (50, 40, 30, 20, 10)])
+        self.assertEqual([r["puntaje"] for r in ranking.top(10)], [50, 40, 30])
+        self.assertTrue(Leaderboard(3).califica(0))
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,51 @@
+# Pruebas del registro de decisiones de la politica destilada
+# Las muestras pasan por el hilo de persistencia y una muestra final cortada se ignora al cargar
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.managers.persistence_writer import obtener_escritor
+from src.systems.plan_interpreter import ACCIONES, VARIABLES
+from src.systems.policy_model import FORMATO_MUESTRA, RegistroDecisiones, cargar_dataset
+
+
+class TestRegistroDecisiones(unittest.TestCase) :
+    """RegistroDecisiones -> archivo -> cargar_dataset"""
+    
+    def setUp(self) :
+        """Registro en una carpeta temporal (que todavia no existe)"""
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.ruta = os.path.join(carpeta.name, "data", "dataset_ia.bin")
+    
+    def _registrar(self, cantidad : int) -> RegistroDecisiones :
+        """Registra muestras una por intervalo y espera al hilo de persistencia"""
+        registro = RegistroDecisiones(self.ruta, intervalo=100, muestras_por_escritura=4)
+        for i in range(cantidad) :
+            valores = {variable : float(i + j) for j, variable in enumerate(VARIABLES)}
+            registro.registrar(valores, ACCIONES[i % len(ACCIONES)], (i + 1) * 100)
+        registro.cerrar()
+        self.assertTrue(obtener_escritor().vaciar())
+        return registro
+    
+    def test_ida_y_vuelta(self) :
+        """Lotes completos y el resto al cerrar llegan en orden"""
+        registro = self._registrar(10)
+        x, y = cargar_dataset(self.ruta)
+        self.assertEqual(registro.muestras, 10)
+        self.assertEqual(os.path.getsize(self.ruta), 10 * FORMATO_MUESTRA.size)
+        np.testing.assert_array_equal(x[ :, 0], np.arange(10, dtype=np.float32))
+        np.testing.assert_array_equal(y, np.arange(10) % len(ACCIONES))
+    
+    def test_muestra_final_cortada(self) :
+        """Un corte a mitad de una muestra no impide cargar las completas"""
+        self._registrar(3)
+        with open(self.ruta, "ab") as f :
+            f.write(b"\x00" * (FORMATO_MUESTRA.size // 2))
+        x, y = cargar_dataset(self.ruta)
+        self.assertEqual((len(x), len(y)), (3, 3))
+
+
+if __name__ == "__main__" :
+    unittest.main()
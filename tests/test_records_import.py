@@ -0,0 +1,114 @@
+# Pruebas del importador de records heredados
+# Lectura por bloques del JSON, CSV, registros invalidos y omision de duplicados sobre una base temporal
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.managers import records_import
+from src.managers.records_db import RecordsDB
+from src.utils.config import Paths
+
+
+def record_1vs1(nombre : str, puntaje) -> dict :
+    """Record de 1vs1 con el formato de los archivos anteriores"""
+    return {"nombre" : nombre, "puntaje" : puntaje, "rounds_ganados" : 2, "rounds_perdidos" : 1, "golpes_totales" : 30,
+            "dano_causado" : 200, "dano_recibido" : 150, "tiempo_segundos" : 95, "fecha" : "2024-05-01 10 :00 :00"}
+
+
+def record_torre(nombre : str, puntaje : int) -> dict :
+    """Record de torre (se distingue por las peleas ganadas)"""
+    return {"nombre" : nombre, "puntaje" : puntaje, "peleas_ganadas" : 4, "golpes_totales" : 80,
+            "dano_causado" : 900, "dano_recibido" : 400, "tiempo_segundos" : 300, "fecha" : "2024-05-02 11 :30 :00"}
+
+
+class TestRecordsImport(unittest.TestCase) :
+    """importar() y sus lectores sobre archivos temporales"""
+    
+    def setUp(self) :
+        """Carpeta temporal; la base no migra los CSV del repositorio"""
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        for atributo in ("RECORDS_1VS1", "RECORDS_TORRE") :
+            parche = mock.patch.object(Paths, atributo, self._ruta(f"{atributo.lower()}.json"))
+            parche.start()
+            self.addCleanup(parche.stop)
+        
+        self.db = RecordsDB(self._ruta("records.db"))
+        self.addCleanup(self.db.cerrar)
+    
+    def _ruta(self, nombre : str) -> str :
+        """Ruta dentro de la carpeta temporal"""
+        return os.path.join(self.carpeta.name, nombre)
+    
+    def _escribir(self, nombre : str, texto : str) -> str :
+        """Crea un archivo de prueba y retorna su ruta"""
+        ruta = self._ruta(nombre)
+        with open(ruta, "w", encoding="utf-8") as f :
+            f.write(texto)
+        return ruta
+    
+    def test_json_por_bloques(self) :
+        """Con bloques mas chicos que un objeto, el lector da lo mismo que json.load"""
+        records = [record_1vs1(f"J{i}", i * 10) for i in range(50)] + [record_torre("TÖRRE", 999)]
+        ruta = self._escribir("records.json", json.dumps(records, ensure_ascii=False, indent=2))
+        with mock.patch.object(records_import, "TAMANO_BLOQUE", 7) :
+            self.assertEqual(list(records_import.leer_json(ruta)), records)
+    
+    def test_json_por_lineas(self) :
+        """Los .txt de versiones anteriores tienen un objeto por linea"""
+        records = [record_1vs1("A", 10), record_torre("B", 20)]
+        ruta = self._escribir("records.txt", "\n".join(json.dumps(r) for r in records) + "\n")
+        self.assertEqual(list(records_import.leer_records(ruta)), records)
+    
+    def test_json_truncado(self) :
+        """Un archivo cortado a mitad de un objeto es un error, no un fin silencioso"""
+        ruta = self._escribir("records.json", json.dumps([record_1vs1("A", 10), record_1vs1("B", 20)])[ :-20])
+        with self.assertRaises(ValueError) :
+            list(records_import.leer_json(ruta))
+    
+    def test_importar_cuenta_y_omite_duplicados(self) :
+        """Invalidos y repetidos se cuentan aparte; reimportar no agrega nada"""
+        records = [record_1vs1("A", 10), record_1vs1("B", 20), record_1vs1("A", 10),
+                   record_1vs1("C", "mucho"), record_torre("T", 500)]
+        ruta = self._escribir("records.json", json.dumps(records))
+        
+        resultado = records_import.importar(self.db, ruta, tamano_lote=2)
+        self.assertEqual(resultado, {"leidos" : 5, "nuevos" : 3, "invalidos" : 1, "duplicados" : 1})
+        self.assertEqual(self.db.contar("records_1vs1"), 2)
+        self.assertEqual(self.db.contar("records_torre"), 1)
+        self.assertEqual([r["nombre"] for r in self.db.top("records_1vs1", 10)], ["B", "A"])
+        
+        resultado = records_import.importar(self.db, ruta)
+        self.assertEqual(resultado, {"leidos" : 5, "nuevos" : 0, "invalidos" : 1, "duplicados" : 4})
+    
+    def test_importar_csv(self) :
+        """Un CSV con encabezado se importa con los numeros convertidos"""
+        ruta = self._ruta("records.csv")
+        with open(ruta, "w", encoding="utf-8", newline="") as f :
+            escritor = csv.DictWriter(f, fieldnames=list(record_1vs1("", 0)))
+            escritor.writeheader()
+            escritor.writerows([record_1vs1("A", 10), record_1vs1("B", 30)])
+        
+        resultado = records_import.importar(self.db, ruta)
+        self.assertEqual(resultado["nuevos"], 2)
+        mejor = self.db.top("records_1vs1", 1)[0]
+        self.assertEqual((mejor["nombre"], mejor["puntaje"], mejor["rounds_ganados"]), ("B", 30, 2))
+
+    
+    def test_derrotas_fuera_del_ranking(self) :
+        """Las derrotas 1vs1 quedan en la base pero no en el top ni en las consultas del ranking"""
+        derrota = dict(record_1vs1("D", 900), rounds_ganados=1, rounds_perdidos=2)
+        ruta = self._escribir("records.json", json.dumps([record_1vs1("A", 10), derrota]))
+        records_import.importar(self.db, ruta)
+        
+        self.assertEqual(self.db.contar("records_1vs1"), 2)
+        self.assertEqual([r["nombre"] for r in self.db.top("records_1vs1", 10)], ["A"])
+        self.assertEqual([r["nombre"] for r in self.db.consultar("records_1vs1", {})], ["A"])
+        self.assertEqual(self.db.contar_filtrados("records_1vs1", {}), 1)
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,100 @@
+# Pruebas de las instantaneas de la pelea
+# Serializar -> restaurar -> serializar tiene que dar los mismos bytes, y restaurar tiene que repetir la simulacion
+
+import unittest
+from unittest import mock
+import pygame
+from src.core.env import iniciar_pygame_headless
+from src.core.game import GameEngine
+from src.core.netplay import TeclasEntrada
+from src.core.snapshot import VERSION_SNAPSHOT
+from src.managers.resource_manager import ResourceManager
+from src.utils.clock import RELOJ
+from src.utils.config import CONTROLES_JUGADOR1, CONTROLES_JUGADOR2
+
+
+def sprites_de_prueba() :
+    """Manifiesto real de los personajes con superficies vacias (sin depender de los archivos de Assets)"""
+    vacia = lambda ruta, escala=2 : pygame.Surface((64 * escala, 64 * escala), pygame.SRCALPHA)
+    with mock.patch("src.managers.resource_manager.cargar_imagen_con_alpha", vacia), \
+         mock.patch("src.managers.resource_manager.cargar_imagen_con_colorkey", vacia) :
+        recursos = ResourceManager()
+        recursos._cargar_sprites_personajes()
+    return recursos.sprites_personajes
+
+
+class TestSnapshot(unittest.TestCase) :
+    """Ida y vuelta de GameEngine.snapshot() / restore()"""
+    
+    @classmethod
+    def setUpClass(cls) :
+        """Pygame sin ventana y sprites compartidos por todas las pruebas"""
+        iniciar_pygame_headless()
+        cls.sprites = sprites_de_prueba()
+    
+    def setUp(self) :
+        """Pelea sin IA con el reloj de simulacion fijo en el frame 0"""
+        self.motor = GameEngine(pygame.display.get_surface(), pygame.time.Clock(), self.sprites, "", "goku", "vegeta", usar_ia=False)
+        self.motor.audio_manager.efectos_activos = False
+        self.motor.inicializar_jugadores("goku", "vegeta")
+        self.motor.en_introduccion = False
+        self.teclas = (TeclasEntrada(CONTROLES_JUGADOR1), TeclasEntrada(CONTROLES_JUGADOR2))
+        
+        RELOJ.fijar_frame(0)
+        self.motor.rounds_manager.reiniciar()
+        self.motor.tiempo_inicio_combate = 0
+    
+    def tearDown(self) :
+        """Devuelve el reloj al tiempo real"""
+        RELOJ.usar_tiempo_real()
+    
+    def _simular(self, frame : int) :
+        """Un frame con acciones fijas : golpes, bolas, kamehameha y acercamiento"""
+        jugador1, jugador2 = self.motor.jugador1, self.motor.jugador2
+        RELOJ.fijar_frame(frame)
+        if frame % 20 == 0 :
+            jugador1.iniciar_golpe("golpe_j")
+        if frame % 35 == 10 :
+            jugador2.iniciar_golpe("patada_k")
+        if frame % 70 == 5 :
+            jugador2.iniciar_lanzar_bola()
+        if frame == 90 :
+            jugador1.iniciar_kamehameha()
+        if jugador1.x < jugador2.x - 80 :
+            jugador1.x += 2
+        self.motor.simular_frame(*self.teclas)
+    
+    def test_ida_y_vuelta_exacta(self) :
+        """Restaurar una instantanea y volver a serializar da los mismos bytes en todos los frames"""
+        for frame in range(1, 180) :
+            self._simular(frame)
+            datos = self.motor.snapshot()
+            self.motor.restore(datos)
+            self.assertEqual(self.motor.snapshot(), datos, f"frame {frame}")
+    
+    def test_restaurar_repite_la_simulacion(self) :
+        """Desde una instantanea restaurada, las mismas entradas llevan al mismo estado"""
+        for frame in range(1, 80) :
+            self._simular(frame)
+        inicial = self.motor.snapshot()
+        
+        for frame in range(80, 160) :
+            self._simular(frame)
+        esperado = self.motor.snapshot()
+        
+        RELOJ.fijar_frame(79)
+        self.motor.restore(inicial)
+        for frame in range(80, 160) :
+            self._simular(frame)
+        self.assertEqual(self.motor.snapshot(), esperado)
+    
+    def test_version_invalida(self) :
+        """Una instantanea de otra version se rechaza"""
+        datos = bytearray(self.motor.snapshot())
+        datos[3] = VERSION_SNAPSHOT + 1
+        with self.assertRaises(ValueError) :
+            self.motor.restore(bytes(datos))
+
+
+if __name__ == "__main__" :
+    unittest.main()